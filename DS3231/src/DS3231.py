@@ -1,7 +1,7 @@
 import FreeCAD as App
 import Part
-import Import
 import os
+import sys
 
 # Detectar si hay GUI
 GUI = App.GuiUp
@@ -12,15 +12,75 @@ if GUI:
 #   CONFIGURACIÓN
 # ============================
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-BUILD_DIR = os.path.abspath(os.path.join(BASE_DIR, "..", "build"))
+# MODULE_BUILD_DIR: salida alternativa (variantes de gen/sweep.py)
+BUILD_DIR = os.environ.get("MODULE_BUILD_DIR") or os.path.abspath(os.path.join(BASE_DIR, "..", "build"))
 os.makedirs(BUILD_DIR, exist_ok=True)
 
+# Helpers compartidos (gen/)
+sys.path.insert(0, os.path.abspath(os.path.join(BASE_DIR, "..", "..", "gen")))
+from boolean_cut import HoleSet, cut_all
+from mesh_cache import TessCache, write_stl
+from profiling import timed, write_trace
+from colors import paint, save_colors
+from brep_bundle import write_bundle
+from instancing import make_prototype, place
+from board_spec import load_spec, header, header_positions
+from features import FeatureGraph, pad_ring, label_block
+from labels import font_hash
+
 # ============================
 #   PARÁMETROS PCB
 # ============================
-L = 21.0   # largo
-A = 37.0   # ancho
-E = 1.0    # espesor
+# Placa y header declarados en src/board.json (compartido con el footprint)
+SPEC = load_spec(BASE_DIR)
+L = SPEC["board"]["length"]      # largo
+A = SPEC["board"]["width"]       # ancho
+E = SPEC["board"]["thickness"]   # espesor
+
+# ============================
+#   FEATURES
+# ============================
+# Cada builder recibe todas sus entradas como argumentos: la FeatureGraph
+# reutiliza su BREP de build/.features/ mientras esas entradas no cambien.
+
+def build_pcb(L, A, E, drills, corner):
+    """Placa con sus taladros y las dos esquinas superiores recortadas."""
+    holes = HoleSet(E)
+    for x, y, d in drills:
+        holes.drill(x, y, d)
+
+    # triángulos corner x corner en (0, A) y (L, A)
+    for pts in ([(0, A), (corner, A), (0, A - corner)],
+                [(L, A), (L - corner, A), (L, A - corner)]):
+        vs = [App.Vector(x, y, 0) for x, y in pts]
+        holes.add(Part.Face(Part.makePolygon(vs + [vs[0]])).extrude(App.Vector(0, 0, E)))
+
+    # agujeros y recortes de esquina en un solo boolean
+    return holes.cut(Part.makeBox(L, A, E))
+
+
+def build_holder(x, y, z, d, h, cav_d, cav_h):
+    """Portapilas: cilindro con la cavidad de la pila arriba."""
+    r, cav_r = d / 2, cav_d / 2
+    cyl = Part.makeCylinder(r, h)
+    cavity = Part.makeCylinder(cav_r, cav_h, App.Vector(r - cav_r, r - cav_r, h - cav_h))
+    holder = cyl.cut(cavity)
+    holder.translate(App.Vector(x, y, z))
+    return holder
+
+
+def build_housing(x, y, z, length, w, h, hole, pin_xs, pin_y, wall_extra):
+    """Plástico del header con una cavidad rectangular por pin (un solo corte)."""
+    housing = Part.makeBox(length, w, h, App.Vector(x, y, z))
+    # cavidades con coordenadas relativas al housing; el housing creció
+    # hacia ambos lados, así que se resta wall_extra para centrarlas
+    cavities = [Part.makeBox(hole, hole, h, App.Vector(px - hole/2 - x - wall_extra,
+                                                       pin_y - hole/2 - y, 0))
+                for px in pin_xs]
+    return cut_all(housing, cavities)
+
+
+graph = FeatureGraph(BUILD_DIR)
 
 # ============================
 #   DOCUMENTO
@@ -30,16 +90,11 @@ doc = App.newDocument("DS3231_PCB")
 # ============================
 #   PCB (solo el bloque)
 # ============================
-pcb = Part.makeBox(L, A, E)
-
+# la shape (con agujeros y esquinas) se asigna en RECORTE DE ESQUINAS
 pcb_obj = doc.addObject("Part::Feature", "PCB")
-pcb_obj.Shape = pcb
 
 pcb_color = (0.10, 0.18, 0.24)  # Azul oscuro realista
-pcb_obj.addProperty("App::PropertyColor", "Color", "Base", "Object color")
-pcb_obj.Color = pcb_color
-if GUI:
-    pcb_obj.ViewObject.ShapeColor = pcb_color
+paint(pcb_obj, pcb_color)
 
 # ============================
 #   PORTAPILAS (cilindro + cavidad)
@@ -48,80 +103,48 @@ CR_D = 21.0   # diámetro exterior
 CR_H = 5.0    # altura
 
 cr_radius = CR_D / 2
-cr_cyl = Part.makeCylinder(cr_radius, CR_H)
 
 # Cavidad interna
 CAV_D = 20.5
 CAV_H = 3.0
-cav_radius = CAV_D / 2
-
-inner_cyl = Part.makeCylinder(cav_radius, CAV_H)
-inner_cyl.translate(App.Vector(
-    cr_radius - cav_radius,
-    cr_radius - cav_radius,
-    CR_H - CAV_H
-))
-
-cr_with_cavity = cr_cyl.cut(inner_cyl)
 
 # Posicionar portapilas
 cr_x = L/2
 cr_y = A/2 - 2
 cr_z = E
-cr_with_cavity.translate(App.Vector(cr_x, cr_y, cr_z))
+cr_with_cavity = graph.build("CR2032_Holder", build_holder, x=cr_x, y=cr_y, z=cr_z,
+                             d=CR_D, h=CR_H, cav_d=CAV_D, cav_h=CAV_H)
 
 cr_obj = doc.addObject("Part::Feature", "CR2032_Holder")
 cr_obj.Shape = cr_with_cavity
 
 cr_color = (0.05, 0.05, 0.05)
-cr_obj.addProperty("App::PropertyColor", "Color", "Base", "Object color")
-cr_obj.Color = cr_color
-if GUI:
-    cr_obj.ViewObject.ShapeColor = cr_color
+paint(cr_obj, cr_color)
 
 # ============================
 #   HOLES EN EL LADO ESTRECHO
 # ============================
-HOLE_D = 1.0
+HEADER = header(SPEC, "main")
+PIN_XY = header_positions(SPEC, HEADER)
+
+HOLE_D = HEADER["drill"]
 HOLE_R = HOLE_D / 2
-N_HOLES = 6
-EDGE_Y = 2.0
-HOLE_SPACING = 2.5
+N_HOLES = len(PIN_XY)
+EDGE_Y = A - PIN_XY[0][1]
+HOLE_SPACING = HEADER["pitch"]
 
 group_length = (N_HOLES - 1) * HOLE_SPACING
-hx0 = (L / 2) - (group_length / 2)
+hx0 = PIN_XY[0][0]
 hy = A - EDGE_Y
 
-pcb_cut = pcb_obj.Shape
-
-for i in range(N_HOLES):
-    hx = hx0 + i * HOLE_SPACING
-    hole = Part.makeCylinder(HOLE_R, E)
-    hole.translate(App.Vector(hx, hy, 0))
-    pcb_cut = pcb_cut.cut(hole)
-
-pcb_obj.Shape = pcb_cut
-
 # ============================
 #   RECORTE DE ESQUINAS 1×1 mm
 # ============================
 CUT = 1.0
 
-pts_left = [
-    App.Vector(0, A, 0),
-    App.Vector(CUT, A, 0),
-    App.Vector(0, A - CUT, 0)
-]
-cut_left = Part.Face(Part.makePolygon(pts_left + [pts_left[0]])).extrude(App.Vector(0, 0, E))
-
-pts_right = [
-    App.Vector(L, A, 0),
-    App.Vector(L - CUT, A, 0),
-    App.Vector(L, A - CUT, 0)
-]
-cut_right = Part.Face(Part.makePolygon(pts_right + [pts_right[0]])).extrude(App.Vector(0, 0, E))
-
-pcb_obj.Shape = pcb_obj.Shape.cut(cut_left).cut(cut_right)
+# Agujeros y recortes de esquina se aplican juntos en un solo boolean
+drills = [(hx, hy, HOLE_D) for hx, hy in PIN_XY]
+pcb_obj.Shape = graph.build("PCB", build_pcb, L=L, A=A, E=E, drills=drills, corner=CUT)
 
 # ============================
 #   PINES SUELTOS (6 PINES)
@@ -130,6 +153,11 @@ pcb_obj.Shape = pcb_obj.Shape.cut(cut_left).cut(cut_right)
 PIN_SIZE = 0.64        # sección cuadrada
 PIN_LEN  = 11.0        # largo total
 
+# Prototipo único: cada pin es una instancia (App::Link) colocada sobre su agujero
+pin_proto = make_prototype(doc, "Pin_Proto", Part.makeBox(PIN_SIZE, PIN_SIZE, PIN_LEN))
+
+paint(pin_proto, (0.9, 0.85, 0.3))  # doradito
+
 pin_objs = []
 
 for i in range(N_HOLES):
@@ -142,29 +170,14 @@ for i in range(N_HOLES):
     py = hy - PIN_SIZE/2
     pz = - (PIN_LEN - E - 1.5)      # casi todo el pin por debajo de la PCB
 
-    # crear pin
-    pin = Part.makeBox(PIN_SIZE, PIN_SIZE, PIN_LEN)
-    pin.translate(App.Vector(px, py, pz))
-
     # añadir al documento
-    p_obj = doc.addObject("Part::Feature", f"Pin_{i+1}")
-    p_obj.Shape = pin
-    
-    # Color property (siempre)
-    p_obj.addProperty("App::PropertyColor", "Color", "Base", "Object color")
-    p_obj.Color = (0.9, 0.85, 0.3)  # doradito
-    
-    # ViewObject solo si hay GUI
-    if GUI:
-        p_obj.ViewObject.ShapeColor = (0.9, 0.85, 0.3)
-    
+    p_obj = place(doc, pin_proto, f"Pin_{i+1}", App.Vector(px, py, pz))
     pin_objs.append(p_obj)
 
 # ============================
 #   HOUSING REALISTA 1x6 (con paredes laterales más gruesas)
 # ============================
 
-PIN_PITCH = 2.54
 PIN_CLEAR = 0.06
 PIN_HOLE = PIN_SIZE + PIN_CLEAR
 
@@ -173,10 +186,7 @@ HOUSING_W = 2.5       # ancho
 WALL_X_EXTRA = 0.6    # grosor adicional en cada extremo
 
 # Nuevo largo = largo original + extra en ambos lados
-HOUSING_L = WALL_X_EXTRA*2 + (N_HOLES - 1)*PIN_PITCH + PIN_HOLE
-
-# Crear el bloque externo con las paredes más gruesas
-housing = Part.makeBox(HOUSING_L, HOUSING_W, HOUSING_H)
+HOUSING_L = WALL_X_EXTRA*2 + (N_HOLES - 1)*HOLE_SPACING + PIN_HOLE
 
 # Posicionarlo debajo de la PCB (centrado como antes)
 hx_center = hx0 + group_length / 2
@@ -184,43 +194,18 @@ housing_x = hx_center - (HOUSING_L / 2)
 housing_y = hy - (HOUSING_W / 2)
 housing_z = -HOUSING_H
 
-housing.translate(App.Vector(housing_x, housing_y, housing_z))
-
-# ----------------------------
-#   Agujeros internos (rectangulares)
-# ----------------------------
-holes_for_housing = []
-
-for i in range(N_HOLES):
-    # La posición global del pin NO cambia
-    hx_pin = hx0 + i * HOLE_SPACING
-
-    # Pero ahora el housing creció hacia ambos lados,
-    # así que restamos WALL_X_EXTRA para que queden centrados
-    hole_x = hx_pin - PIN_HOLE/2 - housing_x + (-WALL_X_EXTRA)
-    hole_y = hy - PIN_HOLE/2 - housing_y
-
-    hole_box = Part.makeBox(PIN_HOLE, PIN_HOLE, HOUSING_H)
-    hole_box.translate(App.Vector(hole_x, hole_y, 0))
-
-    holes_for_housing.append(hole_box)
-
-# Resta final
-housing_real = housing
-for h in holes_for_housing:
-    housing_real = housing_real.cut(h)
+# Bloque externo con las paredes más gruesas y una cavidad por pin (la
+# posición global del pin NO cambia)
+pin_xs = [hx0 + i * HOLE_SPACING for i in range(N_HOLES)]
+housing_real = graph.build("Pin_Header_Housing", build_housing, x=housing_x, y=housing_y,
+                           z=housing_z, length=HOUSING_L, w=HOUSING_W, h=HOUSING_H,
+                           hole=PIN_HOLE, pin_xs=pin_xs, pin_y=hy, wall_extra=WALL_X_EXTRA)
 
 # Añadir al documento
 housing_obj = doc.addObject("Part::Feature", "Pin_Header_Housing")
 housing_obj.Shape = housing_real
 
-# Color property (siempre)
-housing_obj.addProperty("App::PropertyColor", "Color", "Base", "Object color")
-housing_obj.Color = (0.05, 0.05, 0.05)
-
-# ViewObject solo si hay GUI
-if GUI:
-    housing_obj.ViewObject.ShapeColor = (0.05, 0.05, 0.05)
+paint(housing_obj, (0.05, 0.05, 0.05))
 
 # ============================
 #   ANILLOS DE SOLDADURA (PADS)
@@ -233,33 +218,20 @@ PAD_H  = 0.05
 INNER_D = HOLE_D
 INNER_R = INNER_D / 2
 
+# anillo centrado: outer - inner (un solo boolean para todos los pads)
+pad_proto = make_prototype(doc, "Pad_Proto", graph.build("Pad", pad_ring, r_out=PAD_R,
+                                                         r_in=INNER_R, h=PAD_H))
+
+paint(pad_proto, (0.80, 0.75, 0.65))  # Dorado/cobre
+
 pads_objs = []
 
 for i in range(N_HOLES):
     hx = hx0 + i * HOLE_SPACING
     hy = A - EDGE_Y
 
-    # crear cilindros centrados
-    outer = Part.makeCylinder(PAD_R, PAD_H)
-    inner = Part.makeCylinder(INNER_R, PAD_H)
-
-    # anillo: outer - inner
-    ring = outer.cut(inner)
-
-    # mover el anillo a su posición exacta
-    ring.translate(App.Vector(hx, hy, E))  # sobre la PCB
-
-    pad_obj = doc.addObject("Part::Feature", f"Pad_{i+1}")
-    pad_obj.Shape = ring
-    
-    # Color property (siempre)
-    pad_obj.addProperty("App::PropertyColor", "Color", "Base", "Object color")
-    pad_obj.Color = (0.80, 0.75, 0.65)  # Dorado/cobre
-    
-    # ViewObject solo si hay GUI
-    if GUI:
-        pad_obj.ViewObject.ShapeColor = (0.80, 0.75, 0.65)
-    
+    # colocar el anillo en su posición exacta, sobre la PCB
+    pad_obj = place(doc, pad_proto, f"Pad_{i+1}", App.Vector(hx, hy, E))
     pads_objs.append(pad_obj)
 
 # ============================
@@ -287,23 +259,15 @@ battery.translate(App.Vector(cx - BAT_R, cy - BAT_R, bz))
 bat_obj = doc.addObject("Part::Feature", "Battery_CR2032")
 bat_obj.Shape = battery
 
-# Color property (siempre)
-bat_obj.addProperty("App::PropertyColor", "Color", "Base", "Object color")
-bat_obj.Color = (0.7, 0.7, 0.7)
-
-# ViewObject solo si hay GUI
-if GUI:
-    bat_obj.ViewObject.ShapeColor = (0.7, 0.7, 0.7)
+paint(bat_obj, (0.7, 0.7, 0.7))
 
 # --------------------------------------
 # LABELS sobre la PCB (DS3231 rotados 270° / -90°)
 # --------------------------------------
 
-import Draft
-
 FONT = "/usr/share/fonts/TTF/DejaVuSans.ttf"
 
-PIN_LABELS = ["32K", "SQW", "SCL", "SDA", "VCC", "GND"]
+PIN_LABELS = HEADER["names"]
 
 LABEL_SIZE = 1.3
 LABEL_Z = E
@@ -313,44 +277,20 @@ dx = HOLE_SPACING
 y0 = (A - EDGE_Y) - 2
 dy = 0
 
-for i, text in enumerate(PIN_LABELS):
-
-    pos = App.Vector(
-        x0 + i*dx,
-        y0 + i*dy,
-        LABEL_Z
-    )
-
-    txt = Draft.makeShapeString(
-        String=text,
-        FontFile=FONT,
-        Size=LABEL_SIZE,
-        Tracking=0
-    )
-
-    # rotación 270° CCW = -90°
-    txt.Placement = App.Placement(
-        pos,
-        App.Rotation(App.Vector(0, 0, 1), -90)
-    )
-
-    doc.recompute()
-
-    solid = txt.Shape.extrude(App.Vector(0, 0, 0.03))
-
-    obj = doc.addObject("Part::Feature", f"Label_{text}")
-    obj.Shape = solid
+# Todos los textos se componen con glifos cacheados y se extruyen juntos;
+# rotación 270° CCW = -90°
+texts = [(text, (x0 + i*dx, y0 + i*dy, LABEL_Z), -90) for i, text in enumerate(PIN_LABELS)]
 
-    obj.addProperty("App::PropertyColor", "Color")
-    obj.Color = (0.99, 0.99, 0.99)
+obj = doc.addObject("Part::Feature", "Labels")
+obj.Shape = graph.build("Labels", label_block, font=FONT, size=LABEL_SIZE, height=0.03, texts=texts,
+                        font_sha=font_hash(FONT))
 
-    if GUI:
-        obj.ViewObject.ShapeColor = (0.99, 0.99, 0.99)
+paint(obj, (0.99, 0.99, 0.99))
 
 # ============================
 #   RECOMPUTE Y EXPORT
 # ============================
-doc.recompute()
+timed("recompute", doc.Name, doc.recompute)
 
 # Objetos para exportar
 export_objs = [pcb_obj, cr_obj, housing_obj, bat_obj] + pin_objs + pads_objs
@@ -358,10 +298,14 @@ export_objs = [pcb_obj, cr_obj, housing_obj, bat_obj] + pin_objs + pads_objs
 fcstd_path = os.path.join(BUILD_DIR, "DS3231.FCStd")
 stl_path   = os.path.join(BUILD_DIR, "DS3231.stl")
 
-doc.saveAs(fcstd_path)
-Import.export(export_objs, stl_path)
+timed("saveAs", os.path.basename(fcstd_path), doc.saveAs, fcstd_path)
+save_colors(doc, fcstd_path)
+write_bundle(doc, fcstd_path)
+write_stl(stl_path, export_objs, TessCache.beside(fcstd_path))
+write_trace("DS3231", BUILD_DIR)
 
 print("✔ DS3231 RTC Module generado:")
+print("   Features:", graph.summary())
 print("   FCStd:", fcstd_path)
 print("   STL :", stl_path)
 print(f"   Componentes: PCB, Portapilas, {N_HOLES} pines, {N_HOLES} pads, Batería, Housing")
@@ -1,9 +1,7 @@
 import FreeCAD as App
 import Part
-import Import
 import os
-
-import Draft
+import sys
 
 # ============================
 #   DETECTAR GUI
@@ -12,45 +10,52 @@ GUI = App.GuiUp
 if GUI:
     import FreeCADGui as Gui
 
-# ============================
-#   UTILIDAD: COLOR SEGURO
-# ============================
-def safe_color(obj, rgb):
-    # Asegurar color simple
-    if "Color" not in obj.PropertiesList:
-        obj.addProperty("App::PropertyColor", "Color", "Base", "Object color")
-    obj.Color = tuple(rgb)
-
-    # Asegurar DiffuseColor persistente (VRML la usa)
-    if "DiffuseColor" not in obj.PropertiesList:
-        obj.addProperty("App::PropertyColorList", "DiffuseColor", "Base", "Face colors")
-
-    obj.DiffuseColor = [tuple(rgb)]  # 1 solo color para todo el sólido
-
-    # Pintar GUI si existe
-    if GUI and hasattr(obj, "ViewObject"):
-        obj.ViewObject.ShapeColor = tuple(rgb)
-        obj.ViewObject.DiffuseColor = [tuple(rgb)]
-
-
-
-
 # ============================
 #   CONFIGURACIÓN GENERAL
 # ============================
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-BUILD_DIR = os.path.abspath(os.path.join(BASE_DIR, "..", "build"))
+# MODULE_BUILD_DIR: salida alternativa (variantes de gen/sweep.py)
+BUILD_DIR = os.environ.get("MODULE_BUILD_DIR") or os.path.abspath(os.path.join(BASE_DIR, "..", "build"))
 os.makedirs(BUILD_DIR, exist_ok=True)
 
+# Helpers compartidos (gen/)
+sys.path.insert(0, os.path.abspath(os.path.join(BASE_DIR, "..", "..", "gen")))
+from mesh_cache import TessCache, write_stl
+from profiling import timed, write_trace
+from colors import safe_color, save_colors
+from brep_bundle import write_bundle
+from board_spec import load_spec, header, header_positions
+from features import FeatureGraph, drilled_board, pad_ring, header_housing, label_block
+from labels import font_hash
+
 # ============================
 #   PARÁMETROS PCB (BH1750)
 # ============================
-L = 18.0
-A = 13.0
-E = 1.2
+# Placa y headers declarados en src/board.json (compartido con el footprint)
+SPEC = load_spec(BASE_DIR)
+L = SPEC["board"]["length"]
+A = SPEC["board"]["width"]
+E = SPEC["board"]["thickness"]
 
 pcb_color = (0.082, 0.353, 0.384)
 
+# ============================
+#   FEATURES
+# ============================
+# Cada builder recibe todas sus entradas como argumentos: la FeatureGraph
+# reutiliza su BREP de build/.features/ mientras esas entradas no cambien.
+
+def build_window(x, y, z, w, l, h, fillet):
+    """Ventana óptica del sensor con los cantos redondeados."""
+    window = Part.makeBox(w, l, h, App.Vector(x, y, z))
+    try:
+        return timed("makeFillet", "SensorWindow", window.makeFillet, fillet, window.Edges)
+    except Exception:
+        return window
+
+
+graph = FeatureGraph(BUILD_DIR)
+
 # ============================
 #   DOCUMENTO
 # ============================
@@ -59,26 +64,24 @@ DOC = App.newDocument("BH1750_PCB")
 # ============================
 #   PCB BASE
 # ============================
-pcb = Part.makeBox(L, A, E)
-
+# la shape (con todos los taladros) se asigna en HOLES PARA PERNOS
 pcb_obj = DOC.addObject("Part::Feature", "PCB")
-pcb_obj.Shape = pcb
-pcb_obj.addProperty("App::PropertyColor", "Color", "Base", "Object color")
-pcb_obj.Color = pcb_color
 safe_color(pcb_obj, pcb_color)
 
 # ============================
 #   PARÁMETROS PINES
 # ============================
-N_PINS = 5
+HEADER = header(SPEC, "main")
+PIN_NAMES = HEADER["names"]
+N_PINS = len(PIN_NAMES)
 PIN_SIZE = 0.64
 PIN_LEN  = 11.0
-PIN_PITCH = 2.54
-PIN_NAMES = ["ADDR", "SDA", "SCL", "GND", "VCC"]
+PIN_PITCH = HEADER["pitch"]
 
-EDGE_X = 1.5
+PIN_XY = header_positions(SPEC, HEADER)
+EDGE_X = HEADER["at"]
 GROUP_LEN = (N_PINS - 1) * PIN_PITCH
-py0 = (A - GROUP_LEN) / 2
+py0 = PIN_XY[0][1]
 
 # ============================
 #   METADATOS (PINMETA)
@@ -90,22 +93,12 @@ pinmeta.Names = PIN_NAMES
 # ============================
 #   HOLES (PRIMERO)
 # ============================
-HOLE_DIAM = 0.9
+HOLE_DIAM = HEADER["drill"]
 HOLE_R = HOLE_DIAM / 2
 
-hole_shapes = []
-for i in range(N_PINS):
-    cx = EDGE_X
-    cy = py0 + i * PIN_PITCH
-    hole = Part.makeCylinder(HOLE_R, E)
-    hole.translate(App.Vector(cx, cy, 0))
-    hole_shapes.append(hole)
-
-pcb_cut = pcb_obj.Shape
-for h in hole_shapes:
-    pcb_cut = pcb_cut.cut(h)
-
-pcb_obj.Shape = pcb_cut
+# Se recolectan todos los agujeros (pines + pernos) y se cortan en un solo
+# boolean más abajo, en HOLES PARA PERNOS
+drills = [(cx, cy, HOLE_DIAM) for cx, cy in PIN_XY]
 
 # ============================
 #   ANILLOS DE SOLDADURA (PADS)
@@ -118,18 +111,16 @@ PAD_H  = 0.05         # espesor visual del anillo
 INNER_D = HOLE_DIAM   # mismo diámetro que el hole
 INNER_R = INNER_D / 2
 
+# cilindros concéntricos: un solo anillo, cada pad es una copia
+pad_shape = graph.build("Pad", pad_ring, r_out=PAD_R, r_in=INNER_R, h=PAD_H)
+
 pad_objs = []
 
 for i in range(N_PINS):
     cx = EDGE_X
     cy = py0 + i * PIN_PITCH
 
-    # cilindros concéntricos
-    outer = Part.makeCylinder(PAD_R, PAD_H)
-    inner = Part.makeCylinder(INNER_R, PAD_H)
-
-    # anillo final
-    ring = outer.cut(inner)
+    ring = pad_shape.copy()
 
     # colocar justo arriba de la PCB
     ring.translate(App.Vector(cx, cy, E))
@@ -162,8 +153,6 @@ for i in range(N_PINS):
     p_obj.Shape = pin
 
     # Color
-    p_obj.addProperty("App::PropertyColor", "Color", "Base", "Object color")
-    p_obj.Color = (0.9, 0.85, 0.3)
     safe_color(p_obj, (0.9, 0.85, 0.3))
 
     # ============================
@@ -182,8 +171,6 @@ HOUSING_H = 2
 HOUSING_MARGIN = 0.6
 
 WING_EXTRA = 0.4
-WING_THICK = HOUSING_W
-WING_HEIGHT = HOUSING_H
 
 housing_len = GROUP_LEN + HOUSING_MARGIN
 
@@ -191,16 +178,8 @@ housing_y = py0 + GROUP_LEN / 2 - housing_len / 2
 housing_x = EDGE_X - HOUSING_W / 2
 housing_z = -HOUSING_H
 
-housing_main = Part.makeBox(HOUSING_W, housing_len, HOUSING_H)
-housing_main.translate(App.Vector(housing_x, housing_y, housing_z))
-
-wing1 = Part.makeBox(WING_THICK, WING_EXTRA, WING_HEIGHT)
-wing1.translate(App.Vector(housing_x, housing_y - WING_EXTRA, housing_z))
-
-wing2 = Part.makeBox(WING_THICK, WING_EXTRA, WING_HEIGHT)
-wing2.translate(App.Vector(housing_x, housing_y + housing_len, housing_z))
-
-housing_shape = housing_main.fuse(wing1).fuse(wing2)
+housing_shape = graph.build("HeaderHousing", header_housing, x=housing_x, y=housing_y, z=housing_z,
+                            length=housing_len, w=HOUSING_W, h=HOUSING_H, wing=WING_EXTRA, axis="y")
 
 housing_obj = DOC.addObject("Part::Feature", "HeaderHousing")
 housing_obj.Shape = housing_shape
@@ -215,17 +194,9 @@ MOUNT_R = MOUNT_DIAM / 2
 mx1, my1 = 15.5, 2.5
 mx2, my2 = 15.5, 10.50
 
-mount1 = Part.makeCylinder(MOUNT_R, E)
-mount1.translate(App.Vector(mx1, my1, 0))
-
-mount2 = Part.makeCylinder(MOUNT_R, E)
-mount2.translate(App.Vector(mx2, my2, 0))
-
-pcb_cut2 = pcb_obj.Shape
-pcb_cut2 = pcb_cut2.cut(mount1)
-pcb_cut2 = pcb_cut2.cut(mount2)
+drills += [(mx1, my1, MOUNT_DIAM), (mx2, my2, MOUNT_DIAM)]
 
-pcb_obj.Shape = pcb_cut2
+pcb_obj.Shape = graph.build("PCB", drilled_board, L=L, A=A, E=E, drills=drills)
 
 # ============================
 #   SENSOR BH1750 (TRANSDUCTOR ÓPTICO)
@@ -254,13 +225,8 @@ win_x = L/2 - WIN_W/2 + 1.5
 win_y = A/2 - WIN_L/2
 win_z = scz + S_H - WIN_H + WIN_INSET
 
-window = Part.makeBox(WIN_W, WIN_L, WIN_H)
-window.translate(App.Vector(win_x, win_y, win_z))
-
-try:
-    window = window.makeFillet(0.12, window.Edges)
-except:
-    pass
+window = graph.build("SensorWindow", build_window, x=win_x, y=win_y, z=win_z,
+                     w=WIN_W, l=WIN_L, h=WIN_H, fillet=0.12)
 
 window_obj = DOC.addObject("Part::Feature", "BH1750_Window")
 window_obj.Shape = window
@@ -290,39 +256,19 @@ labels = [
     ("VCC",  "LBL_VCC")
 ]
 
-for i, (text, name) in enumerate(labels):
-
-    pos = App.Vector(
-        x0 + i*dx,
-        y0 + i*dy,
-        LABEL_Z
-    )
-
-    txt = Draft.makeShapeString(
-        String=text,
-        FontFile=FONT,
-        Size=LABEL_SIZE,
-        Tracking=0
-    )
-
-    # posición SIN rotación — coherente con tu petición
-    txt.Placement = App.Placement(
-        pos,
-        App.Rotation()
-    )
-
-    DOC.recompute()
-
-    solid = txt.Shape.extrude(App.Vector(0, 0, 0.03))
+# Todos los textos se componen con glifos cacheados y se extruyen juntos;
+# posición SIN rotación — coherente con tu petición
+texts = [(text, (x0 + i*dx, y0 + i*dy, LABEL_Z), 0) for i, (text, name) in enumerate(labels)]
 
-    obj = DOC.addObject("Part::Feature", name)
-    obj.Shape = solid
-    safe_color(obj, (0.99, 0.99, 0.99))
+obj = DOC.addObject("Part::Feature", "Labels")
+obj.Shape = graph.build("Labels", label_block, font=FONT, size=LABEL_SIZE, height=0.03, texts=texts,
+                        font_sha=font_hash(FONT))
+safe_color(obj, (0.99, 0.99, 0.99))
 
 # ============================
 #   RECOMPUTE
 # ============================
-DOC.recompute()
+timed("recompute", DOC.Name, DOC.recompute)
 
 # ============================
 #   EXPORT
@@ -330,10 +276,14 @@ DOC.recompute()
 fcstd_path = os.path.join(BUILD_DIR, "bh1750.FCStd")
 stl_path  = os.path.join(BUILD_DIR, "bh1750.stl")
 
-DOC.saveAs(fcstd_path)
-Import.export([pcb_obj], stl_path)
+timed("saveAs", os.path.basename(fcstd_path), DOC.saveAs, fcstd_path)
+save_colors(DOC, fcstd_path)
+write_bundle(DOC, fcstd_path)
+write_stl(stl_path, [pcb_obj], TessCache.beside(fcstd_path))
+write_trace("bh1750", BUILD_DIR)
 
 print("✔ BH1750 PCB generado:")
+print("   Features:", graph.summary())
 print("   FCStd:", fcstd_path)
 print("   STL :", stl_path)
 
@@ -1,30 +1,43 @@
 import FreeCAD as App
 import Part
-import Import
 import os
-
-import Draft
+import sys
 
 GUI = App.GuiUp
 if GUI:
     import FreeCADGui as Gui
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-BUILD_DIR = os.path.abspath(os.path.join(BASE_DIR, "..", "build"))
+# MODULE_BUILD_DIR: salida alternativa (variantes de gen/sweep.py)
+BUILD_DIR = os.environ.get("MODULE_BUILD_DIR") or os.path.abspath(os.path.join(BASE_DIR, "..", "build"))
 os.makedirs(BUILD_DIR, exist_ok=True)
 
+# Helpers compartidos (gen/)
+sys.path.insert(0, os.path.abspath(os.path.join(BASE_DIR, "..", "..", "gen")))
+from mesh_cache import TessCache, write_stl
+from profiling import timed, write_trace
+from colors import paint, save_colors
+from brep_bundle import write_bundle
+from board_spec import load_spec, header, header_positions
+from features import FeatureGraph, drilled_board, pad_ring, header_housing, label_block
+from labels import font_hash
+
 # ============================
 #   PARÁMETROS DEL BREAKOUT
 # ============================
-L = 10.0
-A = 13.0
-E = 1.6
+# Placa y header declarados en src/board.json (compartido con el footprint)
+SPEC = load_spec(BASE_DIR)
+L = SPEC["board"]["length"]
+A = SPEC["board"]["width"]
+E = SPEC["board"]["thickness"]
 
 # Pines
-N = 4
-P = 2.54
-D = 1.2
-OFF = 1.4
+HEADER = header(SPEC, "main")
+PIN_NAMES = HEADER["names"]
+N = len(PIN_NAMES)
+P = HEADER["pitch"]
+D = HEADER["drill"]
+OFF = HEADER["at"]
 
 # Sensor metálico
 S_L = 2.0
@@ -51,12 +64,33 @@ def safe_set_view(obj, **kwargs):
             # Ignore individual failures to keep script robust
             pass
 
+# ============================
+#   FEATURES
+# ============================
+# Cada builder recibe todas sus entradas como argumentos: la FeatureGraph
+# reutiliza su BREP de build/.features/ mientras esas entradas no cambien
+# (cambiar AGUJERO_D rehace la PCB y los anillos, no el housing ni los textos).
+
+def build_ring(x, y, r_in, r_out, z, thick, hole_z, name):
+    """Anillo metálico plano alrededor del agujero grande."""
+    disco = Part.makeCylinder(r_out, thick, App.Vector(x, y, z))
+    hueco = Part.makeCylinder(r_in, thick + 0.1, App.Vector(x, y, hole_z))
+    ring = disco.cut(hueco)
+
+    # Validar y limpiar la forma
+    if ring.isNull() or len(ring.Solids) == 0:
+        print(f"⚠ Advertencia: {name} inválido")
+        return ring
+    return timed("removeSplitter", name, ring.removeSplitter)
+
+
+graph = FeatureGraph(BUILD_DIR)
+
 # ============================
 
 doc = App.newDocument("BME280_Breakout")
 
 # --- Metadata de pinout ---
-PIN_NAMES = ["VIN", "GND", "SCL", "SDA"]
 pinmeta = doc.addObject("App::FeaturePython", "PinMeta")
 pinmeta.addProperty("App::PropertyStringList", "Names", "Pinout", "Pin names")
 pinmeta.Names = PIN_NAMES
@@ -65,19 +99,9 @@ pinmeta.Names = PIN_NAMES
 #   CONSTRUCCIÓN COMPLETA
 # ============================
 
-# PCB base
-pcb = Part.makeBox(L, A, E)
-
 # --- Agujeros de pines ---
-total = (N - 1) * P
-start_x = (L - total) / 2.0
-radio_pin = D / 2.0
-
-for i in range(N):
-    x = start_x + i * P
-    y = OFF
-    hole = Part.makeCylinder(radio_pin, E, App.Vector(x, y, 0))
-    pcb = pcb.cut(hole)
+PIN_XY = header_positions(SPEC, HEADER)
+start_x = PIN_XY[0][0]
 
 # --- Agujero grande con borde metálico ---
 radio_aguj = AGUJERO_D / 2.0
@@ -90,29 +114,18 @@ aro_y = A - radio_ext - 0.6
 GROSOR_BORDE = 0.1  # 0.1mm de grosor
 
 # BORDE SUPERIOR (en la cara superior del PCB)
-disco_ext_sup = Part.makeCylinder(radio_ext, GROSOR_BORDE, App.Vector(aro_x, aro_y, E))
-hueco_int_sup = Part.makeCylinder(radio_aguj, GROSOR_BORDE + 0.1, App.Vector(aro_x, aro_y, E - 0.05))
-borde_metalico_sup = disco_ext_sup.cut(hueco_int_sup)
+borde_metalico_sup = graph.build(
+    "BordeMetalicoSuperior", build_ring, x=aro_x, y=aro_y, r_in=radio_aguj, r_out=radio_ext,
+    z=E, thick=GROSOR_BORDE, hole_z=E - 0.05, name="BordeMetalicoSuperior")
 
 # BORDE INFERIOR (en la cara inferior del PCB)
-disco_ext_inf = Part.makeCylinder(radio_ext, GROSOR_BORDE, App.Vector(aro_x, aro_y, -0.1))
-hueco_int_inf = Part.makeCylinder(radio_aguj, GROSOR_BORDE + 0.1, App.Vector(aro_x, aro_y, -0.1))
-borde_metalico_inf = disco_ext_inf.cut(hueco_int_inf)
-
-# Validar y limpiar las formas
-if not borde_metalico_sup.isNull() and len(borde_metalico_sup.Solids) > 0:
-    borde_metalico_sup = borde_metalico_sup.removeSplitter()
-else:
-    print("⚠ Advertencia: Borde metálico superior inválido")
+borde_metalico_inf = graph.build(
+    "BordeMetalicoInferior", build_ring, x=aro_x, y=aro_y, r_in=radio_aguj, r_out=radio_ext,
+    z=-0.1, thick=GROSOR_BORDE, hole_z=-0.1, name="BordeMetalicoInferior")
 
-if not borde_metalico_inf.isNull() and len(borde_metalico_inf.Solids) > 0:
-    borde_metalico_inf = borde_metalico_inf.removeSplitter()
-else:
-    print("⚠ Advertencia: Borde metálico inferior inválido")
-
-# Crear el hueco en la PCB (necesario para cortar la PCB)
-hueco_pcb = Part.makeCylinder(radio_aguj, E, App.Vector(aro_x, aro_y, 0))
-pcb = pcb.cut(hueco_pcb)
+# PCB base: pines + hueco del agujero grande en un solo boolean
+drills = [(x, y, D) for x, y in PIN_XY] + [(aro_x, aro_y, AGUJERO_D)]
+pcb = graph.build("PCB", drilled_board, L=L, A=A, E=E, drills=drills)
 
 # --- Sensor metálico ---
 sensor_x = aro_x + radio_ext + 1.5
@@ -137,7 +150,6 @@ sensor.translate(App.Vector(sensor_x, sensor_y, sensor_z))
 
 PIN_W = 0.64
 PIN_L = 11
-PIN_NAMES = ["VIN", "GND", "SCL", "SDA"]
 
 pins_objs = []
 for i in range(N):
@@ -157,10 +169,7 @@ for i in range(N):
     obj = doc.addObject("Part::Feature", f"Pin_{PIN_NAMES[i]}")
     obj.Shape = pin
 
-    obj.addProperty("App::PropertyColor", "Color")
-    obj.Color = (0.9, 0.85, 0.3)  # doradito
-
-    safe_set_view(obj, ShapeColor=(0.9, 0.85, 0.3))
+    paint(obj, (0.9, 0.85, 0.3))  # doradito
 
     pins_objs.append(obj)
 
@@ -174,24 +183,21 @@ PAD_H = 0.05          # grueso visible del pad
 
 hole_r = D / 2
 
+# un solo anillo; cada pad es una copia trasladada
+pad_shape = graph.build("Pad", pad_ring, r_out=PAD_R, r_in=hole_r, h=PAD_H, clearance=0.02)
+
 pads_objs = []
 for i in range(N):
     x = start_x + i * P
     y = OFF
 
-    outer = Part.makeCylinder(PAD_R, PAD_H)
-    inner = Part.makeCylinder(hole_r, PAD_H + 0.02)
-
-    ring = outer.cut(inner)
+    ring = pad_shape.copy()
     ring.translate(App.Vector(x, y, E))
 
     obj = doc.addObject("Part::Feature", f"Pad_{PIN_NAMES[i]}")
     obj.Shape = ring
 
-    obj.addProperty("App::PropertyColor", "Color")
-    obj.Color = (0.80, 0.75, 0.65)
-
-    safe_set_view(obj, ShapeColor=(0.80, 0.75, 0.65))
+    paint(obj, (0.80, 0.75, 0.65))
 
     pads_objs.append(obj)
 
@@ -214,28 +220,14 @@ hx = start_x + group_len/2 - housing_len/2
 hy = OFF - HOUSING_W + 1
 hz = -HOUSING_H
 
-# --- Cuerpo central ---
-body = Part.makeBox(housing_len, HOUSING_W, HOUSING_H)
-body.translate(App.Vector(hx, hy, hz))
-
-# --- Alas (en eje X) ---
-# Ala izquierda
-wing_left = Part.makeBox(WING_EXTRA, HOUSING_W, HOUSING_H)
-wing_left.translate(App.Vector(hx - WING_EXTRA, hy, hz))
-
-# Ala derecha
-wing_right = Part.makeBox(WING_EXTRA, HOUSING_W, HOUSING_H)
-wing_right.translate(App.Vector(hx + housing_len, hy, hz))
-
-# Unión total
-housing = body.fuse(wing_left).fuse(wing_right)
+# Cuerpo central + alas (en eje X)
+housing = graph.build("HeaderHousing", header_housing, x=hx, y=hy, z=hz, length=housing_len,
+                      w=HOUSING_W, h=HOUSING_H, wing=WING_EXTRA, axis="x")
 
 housing_obj = doc.addObject("Part::Feature", "HeaderHousing")
 housing_obj.Shape = housing
 
-housing_obj.addProperty("App::PropertyColor", "Color")
-housing_obj.Color = (0.05, 0.05, 0.05)
-safe_set_view(housing_obj, ShapeColor=(0.05, 0.05, 0.05))
+paint(housing_obj, (0.05, 0.05, 0.05))
 
 # --------------------------------------
 # LABELS sobre la PCB (orientadas CCW desde origen)
@@ -255,34 +247,15 @@ labels = [
     ("VIN", "Text_VIN")
 ]
 
-for i, (text, name) in enumerate(labels):
-    pos = App.Vector(x0 + i*dx, y0, E)
-
-    txt = Draft.makeShapeString(
-        String=text,
-        FontFile=FONT,
-        Size=1,
-        Tracking=0
-    )
-
-    # placement completo desde origen: posición + rotación CCW 90°
-    txt.Placement = App.Placement(
-        pos,
-        App.Rotation(App.Vector(0,0,1), 90)
-    )
-
-    doc.recompute()
+# Todos los textos se componen con glifos cacheados y se extruyen juntos;
+# placement completo desde origen: posición + rotación CCW 90°
+texts = [(text, (x0 + i*dx, y0, E), 90) for i, (text, name) in enumerate(labels)]
 
-    solid = txt.Shape.extrude(App.Vector(0, 0, 0.01))
+obj = doc.addObject("Part::Feature", "Labels")
+obj.Shape = graph.build("Labels", label_block, font=FONT, size=1, height=0.01, texts=texts,
+                        font_sha=font_hash(FONT))
 
-    obj = doc.addObject("Part::Feature", name)
-    obj.Shape = solid
-
-    obj.addProperty("App::PropertyColor", "Color")
-    obj.Color = (0.99, 0.99, 0.99)
-    safe_set_view(obj, ShapeColor=(0.99, 0.99, 0.99))
-
-doc.recompute()
+paint(obj, (0.99, 0.99, 0.99))
 
 
 # ============================
@@ -299,29 +272,23 @@ borde_sup_obj.Shape = borde_metalico_sup
 borde_inf_obj.Shape = borde_metalico_inf
 sensor_obj.Shape = sensor
 
-# Añadir propiedad de color personalizada para exportación
-for obj in [pcb_obj, borde_sup_obj, borde_inf_obj, sensor_obj]:
-    obj.addProperty("App::PropertyColor", "Color", "Base", "Object color")
-
 # Definir colores
 pcb_color = (0.55, 0.00, 0.45)
 borde_color = (0.65, 0.65, 0.65)
 sensor_color = (0.75, 0.75, 0.75)
 
-# Asignar colores a la propiedad (siempre)
-pcb_obj.Color = pcb_color
-borde_sup_obj.Color = borde_color
-borde_inf_obj.Color = borde_color
-sensor_obj.Color = sensor_color
+# Colores para exportación (propiedad o tabla lateral en modo rápido)
+paint(pcb_obj, pcb_color)
+paint(borde_sup_obj, borde_color)
+paint(borde_inf_obj, borde_color)
+paint(sensor_obj, sensor_color)
 
-# Colores visuales (solo si hay GUI) - ahora con safe_set_view
-safe_set_view(pcb_obj, ShapeColor=pcb_color)
-safe_set_view(borde_sup_obj, ShapeColor=borde_color, DisplayMode="Shaded")
-safe_set_view(borde_inf_obj, ShapeColor=borde_color, DisplayMode="Shaded")
-safe_set_view(sensor_obj, ShapeColor=sensor_color)
+# Modo de visualización (solo si hay GUI)
+safe_set_view(borde_sup_obj, DisplayMode="Shaded")
+safe_set_view(borde_inf_obj, DisplayMode="Shaded")
 
 
-doc.recompute()
+timed("recompute", doc.Name, doc.recompute)
 
 # ============================
 #   EXPORTACIÓN
@@ -330,10 +297,14 @@ doc.recompute()
 fcstd_path = os.path.join(BUILD_DIR, "bme280.FCStd")
 stl_path   = os.path.join(BUILD_DIR, "bme280.stl")
 
-doc.saveAs(fcstd_path)
-Import.export([pcb_obj, borde_sup_obj, borde_inf_obj, sensor_obj], stl_path)
+timed("saveAs", os.path.basename(fcstd_path), doc.saveAs, fcstd_path)
+save_colors(doc, fcstd_path)
+write_bundle(doc, fcstd_path)
+write_stl(stl_path, [pcb_obj, borde_sup_obj, borde_inf_obj, sensor_obj], TessCache.beside(fcstd_path))
+write_trace("bme280", BUILD_DIR)
 
 print("✔ BME280 generado:")
+print("   Features:", graph.summary())
 print("   FCStd:", fcstd_path)
 print("   STL :", stl_path)
 
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# -----------------------------
+#  Benchmark de generadores y etapas de gen/
+# -----------------------------
+# Uso: python3 gen/bench.py [--save-baseline] [modulo ...]
+#   Para cada módulo corre gen/pipeline.py BENCH_REPEAT veces (generador,
+#   holes, footprint, STEP y WRL en un proceso) y toma los tiempos de cada
+#   etapa de pipeline_report.json. Después mide las placas sintéticas de
+#   gen/bench_synth.py (header 1x40, header 2x50, panel de 200 vías).
+#
+#   Resultados: bench_output.txt (tabla) y bench_output.json en la raíz.
+#   Se compara el mejor tiempo de cada entrada con gen/bench_baseline.json:
+#   más de BENCH_TOLERANCE (20 % por defecto) y BENCH_MIN_DELTA segundos
+#   por encima cuenta como regresión y el script sale con código 1.
+#   --save-baseline guarda los resultados actuales como nueva referencia.
+
+GEN_DIR = Path(__file__).resolve().parent
+ROOT_DIR = GEN_DIR.parent
+
+FREECADCMD = os.environ.get("FREECADCMD", "freecadcmd")
+REPEAT = int(os.environ.get("BENCH_REPEAT", "3"))
+TOLERANCE = float(os.environ.get("BENCH_TOLERANCE", "0.20"))
+MIN_DELTA = float(os.environ.get("BENCH_MIN_DELTA", "0.05"))
+
+MODULES = ("bme280", "bh1750", "DS3231", "hd38", "usb_ttl")
+
+BASELINE = GEN_DIR / "bench_baseline.json"
+OUT_TXT = ROOT_DIR / "bench_output.txt"
+OUT_JSON = ROOT_DIR / "bench_output.json"
+
+
+# -----------------------------
+#  Mediciones
+# -----------------------------
+def bench_module(mod):
+    """{"<modulo>/<etapa>": [segundos por repetición]} o None si falla."""
+    runs = {}
+    report = ROOT_DIR / mod / "build" / "pipeline_report.json"
+    for _ in range(REPEAT):
+        proc = subprocess.run([FREECADCMD, str(GEN_DIR / "pipeline.py")], cwd=ROOT_DIR,
+                              env=dict(os.environ, MODULE=mod),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+        if proc.returncode != 0 or not report.exists():
+            return None
+        with report.open() as f:
+            for stage in json.load(f)["stages"]:
+                runs.setdefault(f"{mod}/{stage['stage']}", []).append(stage["seconds"])
+    return runs
+
+
+def bench_synthetic():
+    """Tiempos de las placas sintéticas, con las mismas claves que los módulos."""
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "synth.json"
+        proc = subprocess.run([FREECADCMD, str(GEN_DIR / "bench_synth.py")], cwd=ROOT_DIR,
+                              env=dict(os.environ, BENCH_REPEAT=str(REPEAT), BENCH_SYNTH_OUT=str(out)),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+        if proc.returncode != 0 or not out.exists():
+            return None
+        with out.open() as f:
+            data = json.load(f)
+    return {f"synth:{board}/{stage}": times
+            for board, stages in data.items() for stage, times in stages.items()}
+
+
+def summarize(runs):
+    return {key: {"best": round(min(t), 6), "median": round(statistics.median(t), 6), "runs": len(t)}
+            for key, t in runs.items()}
+
+
+# -----------------------------
+#  Comparación con la referencia
+# -----------------------------
+def load_baseline():
+    if not BASELINE.exists():
+        return {}
+    with BASELINE.open() as f:
+        return json.load(f).get("results", {})
+
+
+def compare(results, baseline):
+    """{clave: (referencia, actual, estado)} con estado ok/REGRESIÓN/mejora/nuevo."""
+    rows = {}
+    for key, r in results.items():
+        ref = baseline.get(key, {}).get("best")
+        best = r["best"]
+        if ref is None:
+            status = "nuevo"
+        elif best > ref * (1 + TOLERANCE) and best - ref > MIN_DELTA:
+            status = "REGRESIÓN"
+        elif best < ref * (1 - TOLERANCE) and ref - best > MIN_DELTA:
+            status = "mejora"
+        else:
+            status = "ok"
+        rows[key] = (ref, best, status)
+    return rows
+
+
+def format_table(results, rows):
+    lines = [
+        f"Benchmark TARS (mejor y mediana de {REPEAT}, tolerancia {TOLERANCE:.0%})",
+        f"  {'entrada':<34} {'mejor':>9} {'mediana':>9} {'referencia':>11} {'cambio':>8}  estado",
+    ]
+    for key, r in results.items():
+        ref, best, status = rows[key]
+        ref_s = f"{ref:.3f}s" if ref is not None else "-"
+        delta = f"{(best - ref) / ref:+.0%}" if ref else "-"
+        lines.append(f"  {key:<34} {best:>8.3f}s {r['median']:>8.3f}s {ref_s:>11} {delta:>8}  {status}")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    args = sys.argv[1:]
+    save = "--save-baseline" in args
+    modules = [a for a in args if not a.startswith("--")] or list(MODULES)
+
+    runs = {}
+    t0 = time.perf_counter()
+    failed = []
+    for mod in modules:
+        print(f">>> {mod} ({REPEAT} repetición(es))")
+        mod_runs = bench_module(mod)
+        if mod_runs is None:
+            print(f"  ❌ {mod}: falló el pipeline (ejecuta 'make {mod}_all' para ver el error)")
+            failed.append(mod)
+            continue
+        runs.update(mod_runs)
+
+    print(">>> Placas sintéticas")
+    synth = bench_synthetic()
+    if synth is None:
+        print("  ❌ falló gen/bench_synth.py (ejecuta 'freecadcmd gen/bench_synth.py')")
+        failed.append("synth")
+    else:
+        runs.update(synth)
+
+    results = summarize(runs)
+    rows = compare(results, load_baseline())
+    table = format_table(results, rows)
+    print(table, end="")
+
+    OUT_TXT.write_text(table)
+    with OUT_JSON.open("w") as f:
+        json.dump({"repeat": REPEAT, "wall": round(time.perf_counter() - t0, 3),
+                   "results": results}, f, indent=1)
+    print(f"✔ Resultados en {OUT_TXT.name} y {OUT_JSON.name}")
+
+    if save:
+        with BASELINE.open("w") as f:
+            json.dump({"repeat": REPEAT, "results": results}, f, indent=1, sort_keys=True)
+        print(f"✔ Referencia guardada en {BASELINE}")
+
+    regressions = [k for k, (_, _, s) in rows.items() if s == "REGRESIÓN"]
+    if regressions:
+        print(f"❌ {len(regressions)} regresión(es): {', '.join(regressions)}")
+    if failed or (regressions and not save):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+
+# -----------------------------
+#  Comparación de tiempos: corte por agujero vs. corte en una pasada
+# -----------------------------
+# Uso: freecadcmd gen/bench_cut.py
+#   (BENCH_CUT_REPEAT=<n> para cambiar el número de repeticiones)
+
+import FreeCAD as App
+import Part
+
+GEN_DIR = os.path.dirname(os.path.abspath(__file__)) if "__file__" in globals() else os.path.abspath("gen")
+sys.path.insert(0, GEN_DIR)
+from boolean_cut import HoleSet, cut_sequential
+
+HOLE_COUNTS = (6, 40, 200)
+REPEAT = int(os.environ.get("BENCH_CUT_REPEAT", "3"))
+
+PITCH = 2.54
+HOLE_DIAM = 1.0
+E = 1.6
+MARGIN = 2.0
+
+
+def make_board(n_holes):
+    """PCB rectangular con n_holes taladros en rejilla de paso 2.54."""
+    cols = min(n_holes, 20)
+    rows = (n_holes + cols - 1) // cols
+
+    L = 2 * MARGIN + (cols - 1) * PITCH
+    A = 2 * MARGIN + (rows - 1) * PITCH
+    board = Part.makeBox(L, A, E)
+
+    holes = HoleSet(E)
+    for i in range(n_holes):
+        r, c = divmod(i, cols)
+        holes.drill(MARGIN + c * PITCH, MARGIN + r * PITCH, HOLE_DIAM)
+    return board, holes
+
+
+def best_of(fn):
+    best = None
+    result = None
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        result = fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, result
+
+
+print(f">>> Corte de agujeros: por agujero vs. una pasada (mejor de {REPEAT})")
+print(f"  {'agujeros':>8}  {'por agujero':>12}  {'una pasada':>12}  {'speedup':>8}")
+
+for n in HOLE_COUNTS:
+    board, holes = make_board(n)
+
+    t_seq, seq = best_of(lambda: cut_sequential(board, holes.tools))
+    t_batch, batch = best_of(lambda: holes.cut(board))
+
+    # Ambos caminos deben producir el mismo sólido
+    if abs(seq.Volume - batch.Volume) > 1e-6 * max(seq.Volume, 1.0):
+        print(f"❌ ERROR: volúmenes distintos con {n} agujeros "
+              f"({seq.Volume:.6f} vs {batch.Volume:.6f})")
+        sys.exit(1)
+
+    print(f"  {n:>8}  {t_seq*1000:>10.1f}ms  {t_batch*1000:>10.1f}ms  {t_seq/t_batch:>7.1f}x")
+
+print("✔ Comparación completa")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# -----------------------------
+#  Benchmark del modo rápido (FAST=1)
+# -----------------------------
+# Uso: python3 gen/bench_fast.py [modulo ...]
+#   Construye cada módulo con freecadcmd en modo rápido y en modo normal y
+#   compara tiempo de pared y tamaño del FCStd. El modo normal va al final
+#   para que build/ quede como lo deja 'make <modulo>'.
+
+GEN_DIR = Path(__file__).resolve().parent
+ROOT_DIR = GEN_DIR.parent
+
+FREECADCMD = os.environ.get("FREECADCMD", "freecadcmd")
+
+
+def build(mod, fast):
+    env = dict(os.environ, FAST="1" if fast else "0")
+    t0 = time.perf_counter()
+    proc = subprocess.run([FREECADCMD, f"{mod}/src/{mod}.py"], cwd=ROOT_DIR, env=env,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+    dt = time.perf_counter() - t0
+    if proc.returncode != 0:
+        return None
+    fcstd = ROOT_DIR / mod / "build" / f"{mod}.FCStd"
+    return dt, fcstd.stat().st_size if fcstd.exists() else 0
+
+
+def main():
+    modules = sys.argv[1:] or sorted(p.parent.name for p in ROOT_DIR.glob("*/src")
+                                     if (p / f"{p.parent.name}.py").exists())
+
+    print(">>> Build normal vs. modo rápido (FAST=1)")
+    print(f"  {'módulo':<10} {'normal':>9} {'rápido':>9} {'ahorro':>8} "
+          f"{'FCStd normal':>13} {'FCStd rápido':>13}")
+
+    failed = False
+    for mod in modules:
+        fast = build(mod, True)
+        normal = build(mod, False)
+        if fast is None or normal is None:
+            print(f"  ❌ {mod}: falló el build (ejecuta 'make {mod}' para ver el error)")
+            failed = True
+            continue
+
+        (t_fast, s_fast), (t_norm, s_norm) = fast, normal
+        print(f"  {mod:<10} {t_norm:>8.2f}s {t_fast:>8.2f}s {t_norm - t_fast:>7.2f}s "
+              f"{s_norm / 1024:>11.1f}KB {s_fast / 1024:>11.1f}KB")
+
+    if failed:
+        sys.exit(1)
+    print("✔ Benchmark completo")
+
+
+if __name__ == "__main__":
+    main()
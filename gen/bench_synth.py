@@ -0,0 +1,114 @@
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# -----------------------------
+#  Placas sintéticas para gen/bench.py
+# -----------------------------
+# Uso: [BENCH_REPEAT=<n>] [BENCH_SYNTH_OUT=<json>] freecadcmd gen/bench_synth.py
+#   Construye placas más grandes que los módulos reales (header 1x40,
+#   header 2x50, panel de 200 vías) y mide cada etapa de gen/ sobre ellas:
+#   corte, extracción de agujeros, footprints, STEP y WRL (mejor de n).
+
+import FreeCAD as App
+import Part
+
+GEN_DIR = Path(__file__).resolve().parent if "__file__" in globals() else Path("gen").resolve()
+sys.path.insert(0, str(GEN_DIR))
+
+from boolean_cut import HoleSet
+from obtain_holes import extract_holes
+from make_footprint import write_footprints
+from export_step import export_step
+from export_wrl import export_wrl
+from colors import safe_color
+
+REPEAT = int(os.environ.get("BENCH_REPEAT", "3"))
+OUT = os.environ.get("BENCH_SYNTH_OUT")
+
+E = 1.6
+MARGIN = 2.0
+
+# nombre → (filas, columnas, paso, diámetro)
+BOARDS = {
+    "header_1x40": (1, 40, 2.54, 1.0),
+    "header_2x50": (2, 50, 2.54, 1.0),
+    "panel_200_vias": (10, 20, 1.27, 0.4),
+}
+
+STAGES = ("cut", "holes", "footprint", "steps", "wrl")
+
+
+def make_board(rows, cols, pitch, diam):
+    """PCB con una rejilla rows x cols de taladros y su HoleSet."""
+    L = 2 * MARGIN + (cols - 1) * pitch
+    A = 2 * MARGIN + (rows - 1) * pitch
+    holes = HoleSet(E)
+    for r in range(rows):
+        for c in range(cols):
+            holes.drill(MARGIN + c * pitch, MARGIN + r * pitch, diam)
+    return Part.makeBox(L, A, E), holes
+
+
+def run_board(name, spec, out_dir):
+    """Una pasada completa sobre la placa 'name': {etapa: segundos}."""
+    times = {}
+    board, holes = make_board(*spec)
+
+    t0 = time.perf_counter()
+    shape = holes.cut(board)
+    times["cut"] = time.perf_counter() - t0
+
+    doc = App.newDocument(f"Bench_{name}")
+    pcb = doc.addObject("Part::Feature", "PCB")
+    pcb.Shape = shape
+    safe_color(pcb, (0.0, 0.45, 0.20))
+    doc.recompute()
+
+    try:
+        t0 = time.perf_counter()
+        data = extract_holes(doc)
+        times["holes"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        write_footprints(name.upper(), data["pins"], out_dir / name, quiet=True)
+        times["footprint"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        export_step(doc, out_dir / f"{name}.step")
+        times["steps"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        export_wrl(doc, out_dir / f"{name}.wrl")
+        times["wrl"] = time.perf_counter() - t0
+    finally:
+        App.closeDocument(doc.Name)
+
+    expected = spec[0] * spec[1]
+    if len(data["pins"]) != expected:
+        raise RuntimeError(f"{name}: {len(data['pins'])} pines extraídos, se esperaban {expected}")
+    return times
+
+
+def main():
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, spec in BOARDS.items():
+            print(f">>> Placa sintética: {name}")
+            runs = [run_board(name, spec, Path(tmp)) for _ in range(REPEAT)]
+            results[name] = {stage: [r[stage] for r in runs] for stage in STAGES}
+
+    for name, stages in results.items():
+        line = "  ".join(f"{s} {min(t) * 1000:.1f}ms" for s, t in stages.items())
+        print(f"  ✔ {name}: {line}")
+
+    if OUT:
+        with open(OUT, "w") as f:
+            json.dump(results, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
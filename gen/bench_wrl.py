@@ -0,0 +1,122 @@
+import io
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# -----------------------------
+#  Benchmark del exportador WRL: línea a línea vs. vectorizado
+# -----------------------------
+# Uso: freecadcmd gen/bench_wrl.py
+#   Mide, para cada módulo con <modulo>/build/<modulo>.FCStd, el tiempo y la
+#   memoria pico de escribir el VRML con el constructor antiguo (un f-string
+#   por vértice/triángulo) y con gen/vrml_writer.py. La teselación se hace
+#   una sola vez fuera de la medición porque es idéntica en ambos caminos.
+
+import FreeCAD
+
+GEN_DIR = Path(__file__).resolve().parent if "__file__" in globals() else Path("gen").resolve()
+ROOT_DIR = GEN_DIR.parent
+sys.path.insert(0, str(GEN_DIR))
+
+from vrml_writer import mesh_from_tessellation, write_vrml
+
+REPEAT = int(os.environ.get("BENCH_WRL_REPEAT", "3"))
+
+
+def legacy_vrml(objects):
+    """Implementación anterior de export_wrl.py (lista de strings)."""
+    vrml_content = ["#VRML V2.0 utf8\n", "# Generated by FreeCAD for KiCad\n\n"]
+    for name, (r, g, b), (vertices, faces) in objects:
+        vrml_content.append(f"# Object: {name}\n")
+        vrml_content.append("Shape {\n")
+        vrml_content.append("  appearance Appearance {\n")
+        vrml_content.append("    material Material {\n")
+        vrml_content.append(f"      diffuseColor {r:.3f} {g:.3f} {b:.3f}\n")
+        vrml_content.append("      specularColor 0.5 0.5 0.5\n")
+        vrml_content.append("      emissiveColor 0.0 0.0 0.0\n")
+        vrml_content.append("      ambientIntensity 0.2\n")
+        vrml_content.append("      transparency 0.0\n")
+        vrml_content.append("      shininess 0.2\n")
+        vrml_content.append("    }\n")
+        vrml_content.append("  }\n")
+        vrml_content.append("  geometry IndexedFaceSet {\n")
+        vrml_content.append("    coord Coordinate {\n")
+        vrml_content.append("      point [\n")
+        for v in vertices:
+            vrml_content.append(f"        {v.x:.6f} {v.y:.6f} {v.z:.6f},\n")
+        vrml_content.append("      ]\n")
+        vrml_content.append("    }\n")
+        vrml_content.append("    coordIndex [\n")
+        for face in faces:
+            vrml_content.append(f"      {face[0]}, {face[1]}, {face[2]}, -1,\n")
+        vrml_content.append("    ]\n")
+        vrml_content.append("    solid FALSE\n")
+        vrml_content.append("  }\n")
+        vrml_content.append("}\n\n")
+    out = io.StringIO()
+    out.writelines(vrml_content)
+    return out.getvalue()
+
+
+def vectorized_vrml(objects):
+    meshes = [mesh_from_tessellation(name, color, tess) for name, color, tess in objects]
+    out = io.StringIO()
+    write_vrml(out, meshes)
+    return out.getvalue()
+
+
+def measure(fn, objects):
+    best = None
+    peak = 0
+    text = ""
+    for _ in range(REPEAT):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        text = fn(objects)
+        dt = time.perf_counter() - t0
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        best = dt if best is None else min(best, dt)
+    return best, peak, text
+
+
+def load_objects(fcstd):
+    doc = FreeCAD.openDocument(str(fcstd))
+    objects = []
+    for obj in doc.Objects:
+        if not hasattr(obj, "Shape") or obj.Shape is None or obj.Shape.isNull():
+            continue
+        color = tuple(obj.Color[:3]) if hasattr(obj, "Color") else (0.8, 0.8, 0.8)
+        objects.append((obj.Name, color, obj.Shape.tessellate(0.1)))
+    FreeCAD.closeDocument(doc.Name)
+    return objects
+
+
+modules = sorted(p.parent.name for p in ROOT_DIR.glob("*/src")
+                 if (ROOT_DIR / p.parent.name / "build" / f"{p.parent.name}.FCStd").exists())
+
+if not modules:
+    print("⚠ No hay FCStd generados. Ejecuta 'make <modulo>' primero.")
+    sys.exit(1)
+
+print(f">>> Exportación WRL: línea a línea vs. vectorizado (mejor de {REPEAT})")
+print(f"  {'módulo':<10} {'vértices':>9} {'tiempo ant.':>11} {'tiempo nuevo':>12} "
+      f"{'mem. ant.':>10} {'mem. nueva':>10}")
+
+for mod in modules:
+    objects = load_objects(ROOT_DIR / mod / "build" / f"{mod}.FCStd")
+    n_verts = sum(len(t[0]) for _, _, t in objects)
+
+    t_old, m_old, txt_old = measure(legacy_vrml, objects)
+    t_new, m_new, txt_new = measure(vectorized_vrml, objects)
+
+    if txt_old != txt_new:
+        print(f"❌ ERROR: la salida de {mod} no coincide con la implementación anterior")
+        sys.exit(1)
+
+    print(f"  {mod:<10} {n_verts:>9} {t_old*1000:>9.1f}ms {t_new*1000:>10.1f}ms "
+          f"{m_old/2**20:>8.1f}MB {m_new/2**20:>8.1f}MB")
+
+print("✔ Benchmark completo (salidas idénticas)")
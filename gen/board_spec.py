@@ -0,0 +1,173 @@
+import json
+import os
+from pathlib import Path
+
+from hole_index import order_pins
+
+# -----------------------------
+#  Especificación declarativa de la placa
+# -----------------------------
+# Cada módulo puede declarar sus parámetros en <modulo>/src/board.json:
+#
+#   {
+#       "module": "bme280",
+#       "board":   {"length": 10.0, "width": 13.0, "thickness": 1.6},
+#       "headers": [
+#           {"name": "main", "names": ["VIN", "GND", "SCL", "SDA"],
+#            "pitch": 2.54, "drill": 1.2, "axis": "x", "at": 1.4}
+#       ]
+#   }
+#
+# Cada header es una fila de agujeros pasantes a lo largo de 'axis' ("x" o
+# "y") con la otra coordenada fija en 'at'. La fila se centra en la placa
+# salvo que se indique 'start' (centro del primer pin). En lugar de 'names'
+# puede darse 'count' para pines sin nombre.
+#
+# 'at' se mide desde el borde inferior/izquierdo; con "from": "end" se mide
+# desde el borde opuesto (x = length - at para axis "y", y = width - at para
+# axis "x"), así el header acompaña al borde cuando cambia L o A.
+#
+# El script 3D del módulo lee este archivo y make_footprint.py también, así
+# que el footprint se genera sin FreeCAD y sin reconstruir el modelo.
+#
+# Sólo usa la librería estándar: se importa tanto desde freecadcmd como
+# desde python3.
+
+SPEC_NAME = "board.json"
+AXES = ("x", "y")
+FROM = ("start", "end")
+
+# Variantes (gen/sweep.py): SPEC_OVERRIDES='{"E": 1.2, "headers.main.pitch": 2.0}'
+# cambia campos del spec al leerlo. Las claves son rutas "board.<campo>" o
+# "headers.<header|*>.<campo>", o uno de estos alias:
+ALIASES = {
+    "L": "board.length",
+    "A": "board.width",
+    "E": "board.thickness",
+    "pitch": "headers.*.pitch",
+    "drill": "headers.*.drill",
+    "HOLE_DIAM": "headers.*.drill",
+}
+
+
+def spec_path(module_dir):
+    """Ruta del spec de un módulo a partir de <modulo>/ o <modulo>/src/."""
+    module_dir = Path(module_dir)
+    if module_dir.name != "src":
+        module_dir = module_dir / "src"
+    return module_dir / SPEC_NAME
+
+
+def load_spec(path):
+    """Lee y valida un board.json; devuelve el dict."""
+    path = Path(path)
+    if path.is_dir():
+        path = spec_path(path)
+    with open(path, "r") as f:
+        spec = json.load(f)
+
+    overrides = os.environ.get("SPEC_OVERRIDES")
+    if overrides:
+        apply_overrides(spec, json.loads(overrides))
+
+    board = spec.get("board")
+    if not board:
+        raise ValueError(f"{path}: falta 'board'")
+    for key in ("length", "width", "thickness"):
+        if key not in board:
+            raise ValueError(f"{path}: falta board.{key}")
+
+    for hdr in spec.setdefault("headers", []):
+        name = hdr.get("name", "?")
+        if hdr.get("axis") not in AXES:
+            raise ValueError(f"{path}: header '{name}': axis debe ser 'x' o 'y'")
+        for key in ("pitch", "drill", "at"):
+            if key not in hdr:
+                raise ValueError(f"{path}: header '{name}': falta '{key}'")
+        if hdr.get("from", "start") not in FROM:
+            raise ValueError(f"{path}: header '{name}': from debe ser 'start' o 'end'")
+        if "names" not in hdr and "count" not in hdr:
+            raise ValueError(f"{path}: header '{name}': falta 'names' o 'count'")
+
+    spec.setdefault("module", path.parent.parent.name)
+    return spec
+
+
+def apply_overrides(spec, overrides):
+    """Aplica {ruta o alias: valor} sobre 'spec' (en el sitio)."""
+    for key, value in overrides.items():
+        parts = ALIASES.get(key, key).split(".")
+        if parts[0] == "board" and len(parts) == 2:
+            spec.setdefault("board", {})[parts[1]] = value
+        elif parts[0] == "headers" and len(parts) == 3:
+            matched = [h for h in spec.get("headers", []) if parts[1] in ("*", h.get("name"))]
+            if not matched:
+                raise ValueError(f"override '{key}': no hay header '{parts[1]}'")
+            for hdr in matched:
+                hdr[parts[2]] = value
+        else:
+            raise ValueError(f"override '{key}': usa board.<campo>, headers.<header>.<campo> "
+                             f"o uno de {', '.join(ALIASES)}")
+    return spec
+
+
+def header(spec, name):
+    for hdr in spec["headers"]:
+        if hdr.get("name") == name:
+            return hdr
+    raise ValueError(f"header '{name}' no existe en el spec de {spec['module']}")
+
+
+def pin_names(hdr):
+    """Nombres de los pines del header (None para los que no tienen)."""
+    names = list(hdr.get("names", []))
+    count = hdr.get("count", len(names))
+    return names + [None] * (count - len(names))
+
+
+def header_at(spec, hdr):
+    """Coordenada fija del header ('at' resuelto contra el borde indicado)."""
+    if hdr.get("from", "start") == "start":
+        return hdr["at"]
+    across = spec["board"]["width"] if hdr["axis"] == "x" else spec["board"]["length"]
+    return across - hdr["at"]
+
+
+def header_positions(spec, hdr):
+    """Centros (x, y) de los agujeros del header, en orden de pin."""
+    if isinstance(hdr, str):
+        hdr = header(spec, hdr)
+    n = len(pin_names(hdr))
+    pitch = hdr["pitch"]
+
+    along = spec["board"]["length"] if hdr["axis"] == "x" else spec["board"]["width"]
+    start = hdr.get("start", (along - (n - 1) * pitch) / 2)
+
+    coords = [start + i * pitch for i in range(n)]
+    at = header_at(spec, hdr)
+    if hdr["axis"] == "x":
+        return [(c, at) for c in coords]
+    return [(at, c) for c in coords]
+
+
+# -----------------------------
+#  Pines para el footprint
+# -----------------------------
+def footprint_pins(spec):
+    """Misma forma que los "pins" de obtain_holes.py: x, y, diameter, name."""
+    pins, names = [], []
+    for hdr in spec["headers"]:
+        for x, y in header_positions(spec, hdr):
+            pins.append({
+                "x": round(x, 3),
+                "y": round(y, 3),
+                "diameter": round(hdr["drill"], 3),
+            })
+        names.extend(pin_names(hdr))
+
+    # misma numeración que la extracción desde el FCStd: por conector y en
+    # zig-zag a lo largo del eje largo; los nombres van en ese orden
+    pins = order_pins(pins)
+    for i, pin in enumerate(pins):
+        pin["name"] = names[i] if i < len(names) else None
+    return pins
@@ -0,0 +1,82 @@
+import FreeCAD as App
+import Part
+
+from profiling import timed
+
+# ============================
+#   CORTE BOOLEANO EN UNA SOLA PASADA
+# ============================
+# Cortar agujero por agujero (pcb = pcb.cut(h)) reconstruye el sólido OCC
+# completo en cada iteración, así que el coste crece de forma cuadrática con
+# el número de agujeros. HoleSet recolecta todas las herramientas (taladros,
+# agujeros de montaje, ranuras, recortes) y las aplica a la placa en un único
+# boolean multi-herramienta.
+
+
+class HoleSet:
+    """Colección de herramientas de corte que se aplican de una vez."""
+
+    def __init__(self, height, z=0.0):
+        # altura y base por defecto de los taladros (normalmente el espesor E)
+        self.height = height
+        self.z = z
+        self.tools = []
+
+    def __len__(self):
+        return len(self.tools)
+
+    def drill(self, x, y, diameter, height=None, z=None):
+        """Taladro cilíndrico pasante centrado en (x, y)."""
+        h = self.height if height is None else height
+        z0 = self.z if z is None else z
+        tool = Part.makeCylinder(diameter / 2.0, h, App.Vector(x, y, z0))
+        self.tools.append(tool)
+        return tool
+
+    # Un agujero de montaje es un taladro más grande; se mantiene el alias
+    # para que los scripts de módulo se lean igual que antes.
+    mount = drill
+
+    def slot(self, x, y, length, width, height=None, z=None):
+        """Ranura/ventana rectangular con esquina inferior en (x, y, z)."""
+        h = self.height if height is None else height
+        z0 = self.z if z is None else z
+        tool = Part.makeBox(length, width, h, App.Vector(x, y, z0))
+        self.tools.append(tool)
+        return tool
+
+    def add(self, shape):
+        """Añade una herramienta arbitraria (recortes de esquina, etc.)."""
+        if shape is not None and not shape.isNull():
+            self.tools.append(shape)
+        return shape
+
+    def compound(self):
+        return Part.makeCompound(self.tools)
+
+    def cut(self, base):
+        """Aplica todas las herramientas a 'base' en un único boolean."""
+        return cut_all(base, self.tools)
+
+
+def cut_all(base, tools):
+    """Resta 'tools' de 'base' con una sola operación booleana.
+
+    Se pasa la lista completa como argumentos del BOP (cut multi-herramienta)
+    en lugar de un compound, porque las herramientas pueden solaparse entre sí
+    y un compound con sólidos solapados no es un argumento válido.
+    """
+    tools = [t for t in tools if t is not None and not t.isNull()]
+    if not tools:
+        return base
+    name = f"{len(tools)} herramienta(s)"
+    if len(tools) == 1:
+        return timed("cut", name, base.cut, tools[0])
+    return timed("cut", name, base.cut, tools)
+
+
+def cut_sequential(base, tools):
+    """Corte agujero por agujero (referencia para comparar tiempos)."""
+    for t in tools:
+        base = base.cut(t)
+    return base
@@ -0,0 +1,173 @@
+import json
+import mmap
+import os
+from pathlib import Path
+
+import FreeCAD as App
+import Part
+
+from instancing import export_objects, is_instance, is_prototype, object_color
+from profiling import span
+
+# ============================
+#   BUNDLE BREP JUNTO AL FCSTD
+# ============================
+# Abrir el FCStd deserializa el documento completo (zip, grafo de objetos,
+# propiedades y todas las shapes). Las etapas que sólo necesitan una o dos
+# shapes (holes → PCB, panel → PCB) leen en cambio:
+#
+#   <nombre>.bundle.brep  las shapes BREP concatenadas, una por objeto
+#   <nombre>.bundle.json  manifiesto: nombre, tipo, color, placement y
+#                         (offset, tamaño) de cada shape dentro del .brep
+#
+# El .brep se abre con mmap y sólo se decodifican los bytes de las shapes
+# pedidas. Las instancias (App::Link) no llevan BREP propio: el manifiesto
+# apunta a su prototipo y guarda el Placement del link.
+#
+# Ambos archivos están en build/ junto al FCStd, así que la cache de
+# artefactos (build_cache.py) los guarda y restaura con el resto.
+
+BUNDLE_VERSION = 1
+
+
+def bundle_paths(fcstd_path):
+    fcstd_path = Path(fcstd_path)
+    return (fcstd_path.with_suffix(".bundle.brep"), fcstd_path.with_suffix(".bundle.json"))
+
+
+def _placement(pl):
+    q = pl.Rotation.Q
+    return {"base": [pl.Base.x, pl.Base.y, pl.Base.z], "rotation": list(q)}
+
+
+def _to_placement(data):
+    return App.Placement(App.Vector(*data["base"]), App.Rotation(*data["rotation"]))
+
+
+# -----------------------------
+#  Escritura (al final de cada build)
+# -----------------------------
+def write_bundle(doc, fcstd_path):
+    """Escribe <fcstd>.bundle.brep y .bundle.json a partir de 'doc'."""
+    brep_path, json_path = bundle_paths(fcstd_path)
+    objs = export_objects(doc)
+    protos = [o for o in doc.Objects if is_prototype(o)]
+    if not objs:
+        return None
+
+    pcb = doc.getObject("PCB") or objs[0]
+    meta = doc.getObject("PinMeta")
+
+    entries = []
+    offset = 0
+    with span("bundle", brep_path.name):
+        tmp = brep_path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp.open("wb") as f:
+            for obj in protos + objs:
+                entry = {"name": obj.Name, "label": obj.Label,
+                         "color": list(object_color(obj))}
+                if is_instance(obj):
+                    entry.update(kind="instance", link=obj.LinkedObject.Name,
+                                 placement=_placement(obj.Placement))
+                else:
+                    blob = obj.Shape.exportBrepToString().encode()
+                    f.write(blob)
+                    entry.update(kind="prototype" if is_prototype(obj) else "shape",
+                                 placement=_placement(obj.Placement),
+                                 offset=offset, size=len(blob))
+                    offset += len(blob)
+                entries.append(entry)
+        os.replace(tmp, brep_path)
+
+        with json_path.open("w") as f:
+            json.dump({
+                "version": BUNDLE_VERSION,
+                "document": doc.Name,
+                "pcb": pcb.Name,
+                "pin_names": list(meta.Names) if meta else [],
+                "objects": entries,
+            }, f, indent=1)
+
+    print(f">>> Bundle BREP: {len(entries)} objeto(s), {offset / 1024:.1f} KB → {brep_path.name}")
+    return json_path
+
+
+# -----------------------------
+#  Lectura selectiva
+# -----------------------------
+class Bundle:
+    """Manifiesto + shapes bajo demanda desde el .bundle.brep (mmap)."""
+
+    def __init__(self, fcstd_path):
+        self.brep_path, self.json_path = bundle_paths(fcstd_path)
+        with self.json_path.open() as f:
+            self.manifest = json.load(f)
+        self.entries = {e["name"]: e for e in self.manifest["objects"]}
+        self._file = self.brep_path.open("rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._shapes = {}
+
+    @classmethod
+    def beside(cls, fcstd_path):
+        """Bundle del FCStd si existe y no es más viejo que él (si no, None)."""
+        fcstd_path = Path(fcstd_path)
+        brep_path, json_path = bundle_paths(fcstd_path)
+        try:
+            stale = min(brep_path.stat().st_mtime, json_path.stat().st_mtime) < fcstd_path.stat().st_mtime
+        except OSError:
+            return None
+        if stale:
+            print(f"⚠ {json_path.name} es más viejo que el FCStd, se abre el documento")
+            return None
+        try:
+            bundle = cls(fcstd_path)
+        except (OSError, ValueError, KeyError):
+            return None
+        if bundle.manifest.get("version") != BUNDLE_VERSION:
+            bundle.close()
+            return None
+        return bundle
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def pcb_name(self):
+        return self.manifest["pcb"]
+
+    @property
+    def pin_names(self):
+        return self.manifest.get("pin_names", [])
+
+    def names(self):
+        """Objetos exportables (sin prototipos), en el orden del documento."""
+        return [e["name"] for e in self.manifest["objects"] if e["kind"] != "prototype"]
+
+    def color(self, name):
+        return tuple(self.entries[name]["color"])
+
+    def placement(self, name):
+        return _to_placement(self.entries[name]["placement"])
+
+    def shape(self, name):
+        """Shape en coordenadas globales; sólo se leen sus bytes del .brep."""
+        if name in self._shapes:
+            return self._shapes[name]
+
+        entry = self.entries[name]
+        if entry["kind"] == "instance":
+            shape = self.shape(entry["link"]).copy()
+            shape.Placement = self.placement(name).multiply(shape.Placement)
+        else:
+            start = entry["offset"]
+            shape = Part.Shape()
+            shape.importBrepFromString(self._map[start:start + entry["size"]].decode())
+        self._shapes[name] = shape
+        return shape
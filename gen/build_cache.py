@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+# -----------------------------
+#  Cache de artefactos direccionada por contenido
+# -----------------------------
+# Uso: python3 gen/build_cache.py key|restore|store|clean <modulo>
+#
+# La clave es un hash de:
+#   - las fuentes del módulo (<modulo>/src/*: script y bloque de parámetros)
+#   - los scripts de generación (gen/*.py)
+#   - la versión de FreeCAD
+#   - las variables de entorno de OUTPUT_ENV, que cambian los artefactos
+#     (FAST, teselación, LOD, fusión por color, soldado, variantes)
+# Los artefactos se guardan en <modulo>/build/.cache/<clave>/ y se restauran
+# sin lanzar FreeCAD cuando nada cambió.
+#
+#   restore → código 0 si hubo acierto (artefactos restaurados), 1 si no
+#   store   → copia los artefactos actuales bajo la clave actual
+#   clean   → borra los artefactos de build/ antes de la corrida que se guarda
+
+GEN_DIR = Path(__file__).resolve().parent
+ROOT_DIR = GEN_DIR.parent
+
+CACHE_DIRNAME = ".cache"
+KEEP_ENTRIES = 3   # entradas antiguas que se conservan por módulo
+
+# Archivos de build/ que no son artefactos (reportes de tiempos, logs, etc.)
+EXCLUDE = {"pipeline_report.json", "profile.json"}
+EXCLUDE_SUFFIXES = (".log",)
+
+# Artefactos que viven en gen/: holes.json, footprints y taladrado
+# (<modulo>-PTH.drl, <modulo>-NPTH.drl, <modulo>_drill.csv)
+GEN_SUFFIXES = (".json", ".kicad_mod", ".drl", ".csv")
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# -----------------------------
+#  Versión de FreeCAD
+# -----------------------------
+def freecad_version():
+    """Versión de freecadcmd, memorizada por ruta y mtime del binario."""
+    env = os.environ.get("FREECAD_VERSION")
+    if env:
+        return env
+
+    exe = shutil.which(os.environ.get("FREECADCMD", "freecadcmd"))
+    if not exe:
+        return "unknown"
+    exe = os.path.realpath(exe)
+    stamp = f"{exe}:{os.stat(exe).st_mtime_ns}"
+
+    memo = ROOT_DIR / CACHE_DIRNAME / "freecad_version.json"
+    try:
+        with memo.open() as f:
+            data = json.load(f)
+        if data.get("stamp") == stamp:
+            return data["version"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    try:
+        out = subprocess.run([exe, "--version"], capture_output=True, text=True, timeout=60)
+        version = (out.stdout or out.stderr).strip().splitlines()[0]
+    except (OSError, subprocess.SubprocessError, IndexError):
+        version = "unknown"
+
+    memo.parent.mkdir(parents=True, exist_ok=True)
+    with memo.open("w") as f:
+        json.dump({"stamp": stamp, "version": version}, f)
+    return version
+
+
+# -----------------------------
+#  Clave
+# -----------------------------
+def source_files(mod):
+    src = sorted(p for p in (ROOT_DIR / mod / "src").rglob("*")
+                 if p.is_file() and "__pycache__" not in p.parts)
+    gen = sorted(GEN_DIR.glob("*.py"))
+    return src + gen
+
+
+# Variables de entorno que cambian el contenido de los artefactos de la
+# pipeline (se hashean todas, vacías incluidas). Las que no los cambian
+# (PROFILE, directorios de cache, TESS_KEEP...) no van: partirían la cache.
+OUTPUT_ENV = (
+    "FAST",                                 # colores en tabla
+    "TESS", "TESS_BUDGET",                  # política de teselación
+    "WRL_FORMAT",                           # etapa wrl de pipeline.py
+    "WRL_LOD", "WRL_LOD_RATIO", "WRL_MERGE",
+    "WELD", "WELD_TOL", "QUANTIZE",         # soldado de vértices
+    "SPEC_OVERRIDES",                       # variantes de board.json
+)
+
+
+def cache_key(mod):
+    h = hashlib.sha256()
+    for path in source_files(mod):
+        h.update(str(path.relative_to(ROOT_DIR)).encode())
+        h.update(b"\0")
+        h.update(sha256_file(path).encode())
+        h.update(b"\0")
+    h.update(freecad_version().encode())
+    for name in sorted(OUTPUT_ENV):
+        h.update(f"\0{name}={os.environ.get(name, '')}".encode())
+    return h.hexdigest()[:20]
+
+
+# -----------------------------
+#  Artefactos
+# -----------------------------
+def build_artifacts(mod):
+    """Archivos de primer nivel de build/ que cuentan como artefactos."""
+    build = ROOT_DIR / mod / "build"
+    if not build.is_dir():
+        return []
+    return [p for p in build.iterdir() if p.is_file() and p.name not in EXCLUDE
+            and p.suffix not in EXCLUDE_SUFFIXES]
+
+
+def artifacts(mod):
+    files = build_artifacts(mod)
+    files += [p for pattern in (f"{mod}_*", f"{mod}-*") for p in GEN_DIR.glob(pattern)
+              if p.is_file() and p.suffix in GEN_SUFFIXES]
+    return sorted(files)
+
+
+def entry_dir(mod, key):
+    return ROOT_DIR / mod / "build" / CACHE_DIRNAME / key
+
+
+def store(mod):
+    key = cache_key(mod)
+    entry = entry_dir(mod, key)
+    files = artifacts(mod)
+    if not files:
+        print(f"⚠ {mod}: no hay artefactos que guardar")
+        return False
+
+    tmp = entry.with_name(entry.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    manifest = []
+    for i, path in enumerate(files):
+        blob = f"{i:03d}_{path.name}"
+        shutil.copy2(path, tmp / blob)
+        manifest.append({
+            "path": str(path.relative_to(ROOT_DIR)),
+            "blob": blob,
+            "sha256": sha256_file(path),
+        })
+
+    with (tmp / "manifest.json").open("w") as f:
+        json.dump({"module": mod, "key": key, "files": manifest}, f, indent=4)
+
+    shutil.rmtree(entry, ignore_errors=True)
+    tmp.rename(entry)
+    prune(mod, keep=key)
+
+    print(f"✔ {mod}: {len(manifest)} artefacto(s) en cache [{key}]")
+    return True
+
+
+def restore(mod):
+    key = cache_key(mod)
+    manifest_path = entry_dir(mod, key) / "manifest.json"
+    if not manifest_path.exists():
+        print(f">>> {mod}: sin cache para [{key}]")
+        return False
+
+    with manifest_path.open() as f:
+        manifest = json.load(f)
+
+    copied = 0
+    for item in manifest["files"]:
+        dst = ROOT_DIR / item["path"]
+        # Si el archivo ya coincide no hace falta copiar
+        if dst.exists() and dst.stat().st_size == (entry_dir(mod, key) / item["blob"]).stat().st_size \
+                and sha256_file(dst) == item["sha256"]:
+            continue
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(entry_dir(mod, key) / item["blob"], dst)
+        copied += 1
+
+    # restos de otra configuración (.x3dz, _lod*.wrl, .glb...) no se mezclan
+    listed = {ROOT_DIR / item["path"] for item in manifest["files"]}
+    stale = [p for p in build_artifacts(mod) if p not in listed]
+    for path in stale:
+        path.unlink()
+
+    print(f"✔ {mod}: sin cambios, artefactos restaurados desde cache [{key}] "
+          f"({copied} copiado(s), {len(manifest['files']) - copied} al día"
+          f"{f', {len(stale)} viejo(s) borrado(s)' if stale else ''})")
+    return True
+
+
+def clean(mod):
+    """Borra los artefactos de build/ antes de una corrida que se va a guardar.
+
+    Así 'store' sólo ve lo que produjo esa corrida y no guarda restos de
+    otra configuración bajo la clave actual.
+    """
+    stale = build_artifacts(mod)
+    for path in stale:
+        path.unlink()
+    if stale:
+        print(f">>> {mod}: {len(stale)} artefacto(s) previo(s) borrado(s) de build/")
+    return True
+
+
+def prune(mod, keep):
+    root = ROOT_DIR / mod / "build" / CACHE_DIRNAME
+    entries = [p for p in root.iterdir() if p.is_dir() and p.name != keep]
+    entries.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in entries[KEEP_ENTRIES - 1:]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def main():
+    if len(sys.argv) != 3 or sys.argv[1] not in ("key", "restore", "store", "clean"):
+        print("Uso: python3 gen/build_cache.py key|restore|store|clean <modulo>")
+        sys.exit(2)
+
+    cmd, mod = sys.argv[1], sys.argv[2]
+    if not (ROOT_DIR / mod / "src").is_dir():
+        print(f"❌ ERROR: No existe {mod}/src")
+        sys.exit(2)
+
+    if cmd == "key":
+        print(cache_key(mod))
+    elif cmd == "restore":
+        sys.exit(0 if restore(mod) else 1)
+    elif cmd == "clean":
+        clean(mod)
+    else:
+        sys.exit(0 if store(mod) else 1)
+
+
+if __name__ == "__main__":
+    main()
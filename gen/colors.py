@@ -0,0 +1,92 @@
+import json
+import os
+from pathlib import Path
+
+# ============================
+#   COLORES Y MODO RÁPIDO
+# ============================
+# Normalmente cada objeto recibe propiedades Color/DiffuseColor (las leen
+# los exportadores) y, con GUI, su ViewObject. En modo rápido (FAST=1, para
+# CI headless) los colores van a una tabla lateral en memoria que se guarda
+# junto al FCStd como <nombre>.colors.json: el documento sólo lleva
+# geometría y no se toca ningún ViewObject.
+#
+# No importa FreeCAD: build_cache.py (python3 normal) también lee FAST.
+
+FAST = os.environ.get("FAST", "") not in ("", "0")
+
+_TABLES = {}   # nombre de documento → {nombre de objeto: (r, g, b)}
+
+
+def _view(obj):
+    # en freecadcmd ViewObject existe pero es None
+    return getattr(obj, "ViewObject", None)
+
+
+def paint(obj, rgb, diffuse=False):
+    """Asigna el color de 'obj' (tabla lateral en modo rápido)."""
+    rgb = tuple(rgb)
+    if FAST:
+        _TABLES.setdefault(obj.Document.Name, {})[obj.Name] = rgb
+        return
+
+    if "Color" not in obj.PropertiesList:
+        obj.addProperty("App::PropertyColor", "Color", "Base", "Object color")
+    obj.Color = rgb
+
+    if diffuse:
+        # DiffuseColor persistente (1 solo color para todo el sólido)
+        if "DiffuseColor" not in obj.PropertiesList:
+            obj.addProperty("App::PropertyColorList", "DiffuseColor", "Base", "Face colors")
+        obj.DiffuseColor = [rgb]
+
+    vo = _view(obj)
+    if vo:
+        vo.ShapeColor = rgb
+        if diffuse:
+            vo.DiffuseColor = [rgb]
+
+
+def safe_color(obj, rgb):
+    """Color + DiffuseColor de un solo tono para todo el sólido."""
+    paint(obj, rgb, diffuse=True)
+
+
+# -----------------------------
+#  Tabla lateral
+# -----------------------------
+def table_path(fcstd_path):
+    return Path(fcstd_path).with_suffix(".colors.json")
+
+
+def save_colors(doc, fcstd_path):
+    """Guarda la tabla de 'doc' junto al FCStd (sólo en modo rápido)."""
+    out = table_path(fcstd_path)
+    table = _TABLES.get(doc.Name)
+    if not table:
+        # build normal: no dejar la tabla de un build rápido anterior
+        if out.exists():
+            out.unlink()
+        return None
+    with open(out, "w") as f:
+        json.dump({name: list(rgb) for name, rgb in sorted(table.items())}, f, indent=1)
+    return out
+
+
+def _table(doc):
+    if doc.Name not in _TABLES:
+        # documento abierto desde disco: buscar la tabla junto a su FCStd
+        table = {}
+        path = table_path(doc.FileName) if getattr(doc, "FileName", "") else None
+        if path is not None and path.exists():
+            with open(path) as f:
+                table = {name: tuple(rgb) for name, rgb in json.load(f).items()}
+        _TABLES[doc.Name] = table
+    return _TABLES[doc.Name]
+
+
+def color_of(obj, default=None):
+    """Color desde la propiedad Color o, si no la tiene, desde la tabla."""
+    if hasattr(obj, "Color"):
+        return tuple(obj.Color[:3])
+    return _table(obj.Document).get(obj.Name, default)
@@ -0,0 +1,174 @@
+import heapq
+
+import numpy as np
+
+from weld import weld
+
+# -----------------------------
+#  Decimado por error cuadrático (Garland-Heckbert) y proxies de caja
+# -----------------------------
+# Cada vértice acumula la cuádrica de los planos de sus triángulos
+# (ponderada por área); colapsar la arista (i, j) cuesta v'ᵀ(Qi+Qj)v' con v'
+# la posición óptima. Se colapsa siempre la arista más barata (heap con
+# sellos de versión para descartar entradas viejas) hasta llegar al número
+# de triángulos pedido. Los bordes abiertos llevan planos de penalización
+# para que no se encojan, y se rechazan colapsos que dan vuelta un
+# triángulo o que pegarían dos hojas de la malla.
+#
+# Sólo NumPy: lo usan export_wrl.py (niveles de detalle) sin dependencias
+# nuevas.
+
+WELD_QUANTUM = 1e-6     # mm; la teselación repite vértices en las costuras (weld.py)
+BOUNDARY_WEIGHT = 100.0
+MIN_FACES = 12          # por debajo de esto no se decima (una caja)
+FLIP_DOT = 0.2          # coseno mínimo entre normal antes/después
+
+# caja: esquinas por bits (x, y, z) y 12 triángulos hacia afuera
+_BOX_FACES = np.array([
+    [0, 2, 1], [1, 2, 3],   # z-
+    [4, 5, 6], [5, 7, 6],   # z+
+    [0, 1, 4], [1, 5, 4],   # y-
+    [2, 6, 3], [3, 6, 7],   # y+
+    [0, 4, 2], [2, 4, 6],   # x-
+    [1, 3, 5], [3, 7, 5],   # x+
+], dtype=np.int64)
+
+
+def box_proxy(vertices):
+    """Caja alineada a los ejes que envuelve 'vertices' (8 vértices, 12 triángulos)."""
+    lo, hi = vertices.min(axis=0), vertices.max(axis=0)
+    bits = np.array([[(k >> a) & 1 for a in range(3)] for k in range(8)], dtype=bool)
+    return np.where(bits, hi, lo), _BOX_FACES.copy()
+
+
+# -----------------------------
+#  Cuádricas
+# -----------------------------
+def _face_planes(vertices, faces):
+    tri = vertices[faces]
+    n = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    length = np.linalg.norm(n, axis=1)
+    unit = np.divide(n, length[:, None], out=np.zeros_like(n), where=length[:, None] > 0)
+    return unit, -(unit * tri[:, 0]).sum(axis=1), length / 2
+
+
+def _quadrics(vertices, faces):
+    normals, d, area = _face_planes(vertices, faces)
+    p = np.concatenate([normals, d[:, None]], axis=1)
+    K = p[:, :, None] * p[:, None, :] * area[:, None, None]
+    Q = np.zeros((len(vertices), 4, 4))
+    for k in range(3):
+        np.add.at(Q, faces[:, k], K)
+
+    # bordes: plano que contiene la arista y es perpendicular al triángulo
+    edges = np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]])
+    owner = np.tile(np.arange(len(faces)), 3)
+    key = np.sort(edges, axis=1)
+    _, inv, counts = np.unique(key, axis=0, return_inverse=True, return_counts=True)
+    border = counts[inv.reshape(-1)] == 1
+    if border.any():
+        a, b = vertices[edges[border, 0]], vertices[edges[border, 1]]
+        m = np.cross(b - a, normals[owner[border]])
+        length = np.linalg.norm(m, axis=1)
+        m = np.divide(m, length[:, None], out=np.zeros_like(m), where=length[:, None] > 0)
+        p = np.concatenate([m, -(m * a).sum(axis=1)[:, None]], axis=1)
+        K = p[:, :, None] * p[:, None, :] * (BOUNDARY_WEIGHT * length ** 2)[:, None, None]
+        np.add.at(Q, edges[border, 0], K)
+        np.add.at(Q, edges[border, 1], K)
+    return Q
+
+
+def _collapse_target(Q, a, b):
+    """(costo, posición) del colapso de la arista a-b con cuádrica Q."""
+    candidates = [a, b, (a + b) / 2]
+    A = Q[:3, :3]
+    if abs(np.linalg.det(A)) > 1e-12:
+        candidates.append(np.linalg.solve(A, -Q[:3, 3]))
+    H = np.ones((len(candidates), 4))
+    H[:, :3] = candidates
+    costs = np.einsum("ki,ij,kj->k", H, Q, H)
+    k = int(costs.argmin())
+    return float(costs[k]), H[k, :3]
+
+
+# -----------------------------
+#  Decimado
+# -----------------------------
+def decimate(vertices, faces, ratio):
+    """Reduce la malla a ~ratio de sus triángulos; devuelve (vertices, faces)."""
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    V, F = weld(vertices, faces, WELD_QUANTUM)
+    target = max(int(len(F) * ratio), MIN_FACES)
+    if len(F) <= target:
+        return V, F
+
+    V = V.copy()
+    F = F.copy()
+    Q = _quadrics(V, F)
+    alive = np.ones(len(F), dtype=bool)
+    dead = np.zeros(len(V), dtype=bool)
+    version = np.zeros(len(V), dtype=np.int64)
+    vf = [set() for _ in range(len(V))]
+    for fi, (a, b, c) in enumerate(F.tolist()):
+        vf[a].add(fi)
+        vf[b].add(fi)
+        vf[c].add(fi)
+
+    heap = []
+
+    def push(i, j):
+        cost, pos = _collapse_target(Q[i] + Q[j], V[i], V[j])
+        heapq.heappush(heap, (cost, i, j, version[i], version[j], pos))
+
+    edges = np.unique(np.sort(np.concatenate([F[:, [0, 1]], F[:, [1, 2]], F[:, [2, 0]]]), axis=1), axis=0)
+    for i, j in edges.tolist():
+        push(i, j)
+
+    def neighbours(i):
+        return set(F[list(vf[i])].ravel().tolist()) - {i}
+
+    def flips(i, j, pos):
+        moved = [fi for v in (i, j) for fi in vf[v] if not (i in F[fi] and j in F[fi])]
+        if not moved:
+            return False
+        tri = F[moved]
+        p = V[tri]
+        before = np.cross(p[:, 1] - p[:, 0], p[:, 2] - p[:, 0])
+        p[(tri == i) | (tri == j)] = pos
+        after = np.cross(p[:, 1] - p[:, 0], p[:, 2] - p[:, 0])
+        nb, na = np.linalg.norm(before, axis=1), np.linalg.norm(after, axis=1)
+        dots = (before * after).sum(axis=1)
+        return bool(((nb > 0) & ((na == 0) | (dots < FLIP_DOT * nb * na))).any())
+
+    n_faces = len(F)
+    while n_faces > target and heap:
+        cost, i, j, vi, vj, pos = heapq.heappop(heap)
+        if dead[i] or dead[j] or version[i] != vi or version[j] != vj:
+            continue
+        shared = vf[i] & vf[j]
+        # condición de enlace: los vecinos comunes son sólo los de los
+        # triángulos de la arista (si no, se pegarían dos hojas)
+        if len(neighbours(i) & neighbours(j)) > len(shared) or flips(i, j, pos):
+            continue
+
+        for fi in shared:
+            alive[fi] = False
+            n_faces -= 1
+            for v in F[fi].tolist():
+                vf[v].discard(fi)
+        for fi in vf[j]:
+            F[fi][F[fi] == j] = i
+            vf[i].add(fi)
+        vf[j] = set()
+        dead[j] = True
+        V[i] = pos
+        Q[i] += Q[j]
+        version[i] += 1
+
+        for k in neighbours(i):
+            push(i, k)
+
+    F = F[alive]
+    used, remap = np.unique(F, return_inverse=True)
+    return V[used], remap.reshape(-1, 3)
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+import csv
+import json
+import math
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+# -----------------------------
+#  Taladros: Excellon + tabla CSV desde holes.json
+# -----------------------------
+# Uso: python3 gen/export_drill.py <holes.json> [basename]
+#   Lee el JSON de obtain_holes.py (o el de un panel de panelize.py) y escribe
+#     <basename>-PTH.drl   pines (metalizados)
+#     <basename>-NPTH.drl  resto de agujeros (sin metalizar)
+#     <basename>_drill.csv tabla de herramientas: diámetro, golpes, recorrido
+#   Sin FreeCAD: sólo la librería estándar.
+#
+# Los golpes de cada herramienta se ordenan para minimizar el recorrido del
+# cabezal: vecino más cercano desde el origen y después 2-opt restringido a
+# los K vecinos de cada punto (rejilla hash, como hole_index.py), así que un
+# panel de miles de taladros se ordena en segundos.
+
+NEIGHBOURS = 8       # candidatos por punto en 2-opt
+MAX_PASSES = 20      # pasadas de 2-opt como máximo
+ORIGIN = (0.0, 0.0)  # posición inicial del cabezal
+
+
+# -----------------------------
+#  Geometría y rejilla
+# -----------------------------
+def dist(p, q):
+    return math.hypot(p[0] - q[0], p[1] - q[1])
+
+
+def path_length(pts, order):
+    return sum(dist(pts[a], pts[b]) for a, b in zip(order, order[1:]))
+
+
+class PointGrid:
+    """Rejilla hash para búsquedas por anillos de celdas alrededor de un punto."""
+
+    def __init__(self, pts):
+        xs = [p[0] for p in pts]
+        ys = [p[1] for p in pts]
+        area = max(max(xs) - min(xs), 1.0) * max(max(ys) - min(ys), 1.0)
+        self.cell = max(math.sqrt(area / len(pts)), 0.1)
+        self.cells = defaultdict(list)
+        for i, p in enumerate(pts):
+            self.cells[self._key(p)].append(i)
+        keys = list(self.cells)
+        self.span = max(max(abs(k[0]) for k in keys), max(abs(k[1]) for k in keys)) + 1
+
+    def _key(self, p):
+        return (math.floor(p[0] / self.cell), math.floor(p[1] / self.cell))
+
+    def ring(self, p, r):
+        """Índices en las celdas a distancia de Chebyshev 'r' de la de 'p'."""
+        cx, cy = self._key(p)
+        if r == 0:
+            yield from self.cells.get((cx, cy), ())
+            return
+        for i in range(cx - r, cx + r + 1):
+            for j in (cy - r, cy + r):
+                yield from self.cells.get((i, j), ())
+        for j in range(cy - r + 1, cy + r):
+            for i in (cx - r, cx + r):
+                yield from self.cells.get((i, j), ())
+
+    def max_ring(self, p):
+        cx, cy = self._key(p)
+        return self.span + max(abs(cx), abs(cy))
+
+    def remove(self, i, p):
+        self.cells[self._key(p)].remove(i)
+
+
+def k_nearest(pts, grid, k):
+    """Para cada punto, sus k vecinos más cercanos (sin él mismo)."""
+    result = []
+    for i, p in enumerate(pts):
+        found = []
+        limit = grid.max_ring(p)
+        for r in range(limit + 1):
+            found += [(dist(p, pts[j]), j) for j in grid.ring(p, r) if j != i]
+            # lo que queda fuera del anillo r está a más de r celdas
+            if len(found) >= k and sorted(found)[k - 1][0] <= r * grid.cell:
+                break
+        result.append([j for _, j in sorted(found)[:k]])
+    return result
+
+
+# -----------------------------
+#  Optimización de recorrido
+# -----------------------------
+def nearest_neighbour(pts, start=ORIGIN):
+    """Orden de visita eligiendo siempre el taladro libre más cercano."""
+    grid = PointGrid(pts)
+    order = []
+    here = start
+    for _ in range(len(pts)):
+        best = None
+        for r in range(grid.max_ring(here) + 1):
+            for j in grid.ring(here, r):
+                d = dist(here, pts[j])
+                if best is None or d < best[0]:
+                    best = (d, j)
+            if best is not None and best[0] <= r * grid.cell:
+                break
+        _, j = best
+        grid.remove(j, pts[j])
+        order.append(j)
+        here = pts[j]
+    return order
+
+
+def two_opt(pts, order, start=ORIGIN, k=NEIGHBOURS, passes=MAX_PASSES):
+    """Mejora un recorrido abierto invirtiendo tramos (2-opt con vecinos)."""
+    if len(order) < 3:
+        return order
+
+    # el origen es el nodo fijo 0 del recorrido
+    nodes = [start] + list(pts)
+    tour = [0] + [i + 1 for i in order]
+    n = len(tour)
+    neigh = k_nearest(nodes, PointGrid(nodes), k)
+    pos = [0] * n
+    for idx, node in enumerate(tour):
+        pos[node] = idx
+
+    def reverse(i, j):
+        tour[i:j + 1] = tour[i:j + 1][::-1]
+        for idx in range(i, j + 1):
+            pos[tour[idx]] = idx
+
+    for _ in range(passes):
+        improved = False
+        for i in range(n - 1):
+            a, b = tour[i], tour[i + 1]
+            d_ab = dist(nodes[a], nodes[b])
+            for c in neigh[a]:
+                j = pos[c]
+                if j > i + 1:
+                    # (a,b) + (c,d) → (a,c) + (b,d): invierte b..c
+                    d = tour[j + 1] if j + 1 < n else None
+                    delta = dist(nodes[a], nodes[c]) - d_ab
+                    if d is not None:
+                        delta += dist(nodes[b], nodes[d]) - dist(nodes[c], nodes[d])
+                    if delta < -1e-9:
+                        reverse(i + 1, j)
+                        improved = True
+                        break
+                elif j < i:
+                    # (c,d) + (a,b) → (c,a) + (d,b): invierte d..a
+                    d = tour[j + 1]
+                    delta = (dist(nodes[c], nodes[a]) + dist(nodes[d], nodes[b])
+                             - dist(nodes[c], nodes[d]) - d_ab)
+                    if delta < -1e-9:
+                        reverse(j + 1, i)
+                        improved = True
+                        break
+        if not improved:
+            break
+
+    return [node - 1 for node in tour[1:]]
+
+
+def optimise(pts):
+    """Orden de golpes y (recorrido original, vecino más cercano, 2-opt)."""
+    nodes = [ORIGIN] + pts
+    before = path_length(nodes, range(len(nodes)))
+    order = nearest_neighbour(pts)
+    nn = path_length(nodes, [0] + [i + 1 for i in order])
+    order = two_opt(pts, order)
+    after = path_length(nodes, [0] + [i + 1 for i in order])
+    return order, (before, nn, after)
+
+
+# -----------------------------
+#  Herramientas
+# -----------------------------
+def tool_groups(holes):
+    """{diámetro: [(x, y), ...]} ordenado por diámetro."""
+    groups = defaultdict(list)
+    for h in holes:
+        groups[round(h["diameter"], 3)].append((h["x"], h["y"]))
+    return dict(sorted(groups.items()))
+
+
+def write_excellon(path, tools, plated):
+    """Excellon métrico con coordenadas decimales absolutas."""
+    with open(path, "w") as f:
+        f.write("M48\n")
+        f.write(f"; DRILL file TARS {'PTH' if plated else 'NPTH'}\n")
+        f.write("; FORMAT={-:-/ absolute / metric / decimal}\n")
+        f.write(f"; #@! TF.FileFunction,{'Plated' if plated else 'NonPlated'},1,2,"
+                f"{'PTH' if plated else 'NPTH'}\n")
+        f.write("FMAT,2\n")
+        f.write("METRIC\n")
+        for t, (diam, _) in enumerate(tools, start=1):
+            f.write(f"T{t}C{diam:.3f}\n")
+        f.write("%\n")
+        f.write("G90\n")
+        f.write("G05\n")
+        for t, (_, hits) in enumerate(tools, start=1):
+            f.write(f"T{t}\n")
+            for x, y in hits:
+                f.write(f"X{x:.3f}Y{y:.3f}\n")
+        f.write("M30\n")
+
+
+def export_drill(data, basename):
+    """Escribe los .drl y la tabla CSV; devuelve las rutas generadas."""
+    basename = Path(basename)
+    basename.parent.mkdir(parents=True, exist_ok=True)
+    rows = []
+    written = []
+
+    for kind, plated, suffix in (("pins", True, "PTH"), ("others", False, "NPTH")):
+        holes = data.get(kind, [])
+        if not holes:
+            continue
+        tools = []
+        for diam, pts in tool_groups(holes).items():
+            order, (before, nn, after) = optimise(pts)
+            tools.append((diam, [pts[i] for i in order]))
+            rows.append({
+                "tool": f"T{len(tools)}", "file": suffix, "diameter_mm": f"{diam:.3f}",
+                "plated": "si" if plated else "no", "hits": len(pts),
+                "travel_mm": f"{after:.2f}", "travel_input_mm": f"{before:.2f}",
+            })
+            print(f"  {suffix:<4} T{len(tools)} Ø{diam:.3f}: {len(pts):>5} golpes, recorrido "
+                  f"{before:.1f} → {nn:.1f} (vecino) → {after:.1f} mm (2-opt)")
+
+        out = basename.with_name(f"{basename.name}-{suffix}.drl")
+        write_excellon(out, tools, plated)
+        written.append(out)
+
+    table = basename.with_name(f"{basename.name}_drill.csv")
+    with open(table, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["tool", "file", "diameter_mm", "plated", "hits",
+                                               "travel_mm", "travel_input_mm"])
+        writer.writeheader()
+        writer.writerows(rows)
+    written.append(table)
+    return written
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Uso: python3 export_drill.py <holes.json> [basename]")
+        sys.exit(1)
+
+    HOLES_JSON = Path(sys.argv[1]).resolve()
+    if not HOLES_JSON.exists():
+        raise FileNotFoundError(f"No existe {HOLES_JSON}")
+
+    if len(sys.argv) >= 3:
+        BASENAME = Path(sys.argv[2]).with_suffix("").resolve()
+    else:
+        # gen/bme280_holes.json → gen/bme280-PTH.drl, gen/bme280_drill.csv
+        BASENAME = HOLES_JSON.with_name(HOLES_JSON.stem.replace("_holes", ""))
+
+    with open(HOLES_JSON, "r") as f:
+        data = json.load(f)
+
+    if not data.get("pins") and not data.get("others"):
+        print("⚠ No hay agujeros en el JSON.")
+        sys.exit(0)
+
+    print(f">>> Taladros de {HOLES_JSON.name}")
+    written = export_drill(data, BASENAME)
+    print("✔ Archivos de taladrado generados:")
+    for path in written:
+        print(f"  → {path}")
+
+
+if __name__ == "__main__":
+    main()
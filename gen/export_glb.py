@@ -0,0 +1,105 @@
+import sys
+import os
+from pathlib import Path
+
+import FreeCAD
+
+GEN_DIR = Path(__file__).resolve().parent if "__file__" in globals() else Path("gen").resolve()
+sys.path.insert(0, str(GEN_DIR))
+
+from gltf_writer import write_glb
+from mesh_cache import TessCache, placement_matrix
+from tess_policy import TessPolicy
+from weld import WELD, print_weld_stats, weld_mesh
+from instancing import export_objects, is_instance, object_color
+from profiling import timed
+
+
+# -----------------------------
+#  Exportar glTF binario (.glb)
+# -----------------------------
+def export_glb(doc, out_glb, policy=None):
+    """Genera un .glb con un buffer empaquetado y mallas deduplicadas."""
+    out_glb = Path(out_glb)
+
+    objs = export_objects(doc)
+    if not objs:
+        print("❌ No hay objetos con shapes válidas para exportar.")
+        return False
+
+    print(f">>> Exportando {len(objs)} objeto(s) a {out_glb}...")
+    out_glb.parent.mkdir(parents=True, exist_ok=True)
+
+    # Misma teselación que el WRL (cache compartida, misma política)
+    cache = TessCache.for_document(doc)
+    policy = policy or TessPolicy.from_env()
+    tols = policy.plan_objects(objs, cache)
+    meshes = []
+    for obj in objs:
+        if is_instance(obj):
+            # App::Link: malla del prototipo + matriz del link
+            verts, faces = cache.get(obj.LinkedObject.Shape, *tols[obj.Name])
+            matrix = placement_matrix(obj.Placement)
+        else:
+            verts, faces = cache.get(obj.Shape, *tols[obj.Name])
+            matrix = None
+        mesh = {"name": obj.Label, "color": object_color(obj), "vertices": verts, "faces": faces}
+        if matrix is not None:
+            mesh["matrix"] = matrix
+        meshes.append(mesh)
+
+    if WELD:
+        print_weld_stats([weld_mesh(m) for m in meshes])
+
+    stats = timed("glb", out_glb.name, write_glb, out_glb, meshes)
+
+    print(f"✔ GLB generado: {out_glb}")
+    print(f"  Tamaño: {stats['bytes']} bytes")
+    print(f"  ✓ {stats['objects']} objeto(s), {stats['geometries']} malla(s) distinta(s); "
+          f"{stats['triangles_written']} de {stats['triangles']} triángulos escritos")
+    print(f"  ✓ {policy.describe()}; {cache.summary()}")
+    return True
+
+
+def main():
+    # -----------------------------
+    #  Parámetros
+    # -----------------------------
+    FCSTD_STR = os.environ.get("FCSTD_FILE")
+    OUT_GLB_STR = os.environ.get("OUT_GLB_FILE")
+
+    if not FCSTD_STR or not OUT_GLB_STR:
+        print("Uso: FCSTD_FILE=<ruta> OUT_GLB_FILE=<ruta> freecadcmd export_glb.py")
+        sys.exit(1)
+
+    FCSTD = Path(FCSTD_STR).resolve()
+    OUT_GLB = Path(OUT_GLB_STR).resolve()
+
+    if not FCSTD.exists():
+        print(f"❌ ERROR: No existe {FCSTD}")
+        sys.exit(1)
+
+    print(f">>> Abriendo documento: {FCSTD}")
+    doc = FreeCAD.openDocument(str(FCSTD))
+
+    try:
+        ok = export_glb(doc, OUT_GLB)
+    except Exception as e:
+        print(f"❌ Error al exportar: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+    if not ok:
+        sys.exit(1)
+
+    try:
+        FreeCAD.closeDocument(doc.Name)
+    except Exception as e:
+        print(f"⚠ No se pudo cerrar documento: {e}")
+
+    print("✔ Exportación completa")
+
+
+if __name__ == "__main__":
+    main()
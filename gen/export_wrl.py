@@ -2,125 +2,214 @@ import sys
 import os
 from pathlib import Path
 
+import FreeCAD
+
+GEN_DIR = Path(__file__).resolve().parent if "__file__" in globals() else Path("gen").resolve()
+sys.path.insert(0, str(GEN_DIR))
+
+from vrml_writer import FORMATS, def_name, mesh_from_tessellation, merge_by_color, write_meshes
+from mesh_cache import TessCache
+from tess_policy import TessPolicy
+from instancing import export_objects, is_instance, object_color
+from colors import FAST
+from profiling import span, timed
+from decimate import box_proxy, decimate
+from weld import WELD, WELD_TOL, QUANTIZE, digits_for, print_weld_stats, weld, weld_mesh
+
+# Un nodo Shape por color en lugar de uno por objeto (WRL_MERGE=1): menos
+# nodos y materiales y menos draw calls en el visor 3D de KiCad
+WRL_MERGE = os.environ.get("WRL_MERGE", "") not in ("", "0")
+
+# Niveles de detalle (WRL_LOD=1): además de <modulo>.wrl se escriben
+#   <modulo>_lod1.wrl  decimado por error cuadrático a WRL_LOD_RATIO
+#   <modulo>_lod2.wrl  una caja por objeto (proxy)
+# con la misma estructura, colores y DEF/USE, así que un ensamblado de placa
+# puede apuntar a _lod1/_lod2 sin más cambios.
+WRL_LOD = os.environ.get("WRL_LOD", "") not in ("", "0")
+WRL_LOD_RATIO = float(os.environ.get("WRL_LOD_RATIO") or 0.25)
+
+LOD_LEVELS = (
+    # nivel, sufijo de archivo
+    ("reduced", "_lod1"),
+    ("proxy", "_lod2"),
+)
+
+
 # -----------------------------
-#  Parámetros
+#  Niveles de detalle
 # -----------------------------
-FCSTD_STR = os.environ.get("FCSTD_FILE")
-OUT_WRL_STR = os.environ.get("OUT_WRL_FILE")
+def lod_meshes(meshes, level, ratio=WRL_LOD_RATIO):
+    """Copia de 'meshes' con la geometría del nivel pedido (USE sin cambios)."""
+    out = []
+    for m in meshes:
+        if m.get("use"):
+            out.append(m)
+            continue
+        with span("lod", f"{level} {m['name']}"):
+            if level == "proxy":
+                verts, faces = box_proxy(m["vertices"])
+            else:
+                verts, faces = decimate(m["vertices"], m["faces"], ratio)
+        out.append(dict(m, vertices=verts, faces=faces))
+    return out
 
-if not FCSTD_STR or not OUT_WRL_STR:
-    print("Uso: FCSTD_FILE=<ruta> OUT_WRL_FILE=<ruta> freecadcmd export_wrl.py")
-    sys.exit(1)
 
-import FreeCAD
+def lod_path(out_wrl, suffix):
+    return out_wrl.with_name(out_wrl.stem + suffix + out_wrl.suffix)
+
+
+def triangles(meshes):
+    return sum(len(m["faces"]) for m in meshes if not m.get("use"))
+
 
 # -----------------------------
-#  Main
+#  Exportar WRL
 # -----------------------------
-FCSTD = Path(FCSTD_STR).resolve()
-OUT_WRL = Path(OUT_WRL_STR).resolve()
-
-if not FCSTD.exists():
-    print(f"❌ ERROR: No existe {FCSTD}")
-    sys.exit(1)
-
-print(f">>> Abriendo documento: {FCSTD}")
-doc = FreeCAD.openDocument(str(FCSTD))
-
-valid_objs = [
-    obj for obj in doc.Objects
-    if hasattr(obj, "Shape") and obj.Shape is not None and not obj.Shape.isNull()
-]
-
-if not valid_objs:
-    print("❌ No hay objetos con shapes válidas para exportar.")
-    sys.exit(1)
-
-print(f">>> Exportando {len(valid_objs)} objeto(s) a {OUT_WRL}...")
-OUT_WRL.parent.mkdir(parents=True, exist_ok=True)
-
-# Asegurar que todos los objetos tienen colores
-for obj in valid_objs:
-    if not hasattr(obj, "Color"):
-        print(f"⚠ {obj.Name} sin color, usando gris por defecto")
-        obj.addProperty("App::PropertyColor", "Color", "Base", "Object color")
-        obj.Color = (0.8, 0.8, 0.8)
-
-# Generar VRML 2.0 manualmente
-try:
-    vrml_content = ["#VRML V2.0 utf8\n", "# Generated by FreeCAD for KiCad\n\n"]
-    
+def export_wrl(doc, out_wrl, fmt="vrml", policy=None, lod=WRL_LOD, merge=WRL_MERGE):
+    """Genera un VRML 2.0 (o X3D con fmt="x3d"/"x3dz") a partir de 'doc'.
+
+    Con 'lod' escribe también los niveles _lod1 (decimado) y _lod2 (cajas);
+    con 'merge', un solo Shape por color.
+    """
+    out_wrl = Path(out_wrl)
+
+    # Sólidos e instancias (App::Link); los prototipos sólo salen vía DEF/USE
+    valid_objs = export_objects(doc)
+
+    if not valid_objs:
+        print("❌ No hay objetos con shapes válidas para exportar.")
+        return False
+
+    print(f">>> Exportando {len(valid_objs)} objeto(s) a {out_wrl}...")
+    out_wrl.parent.mkdir(parents=True, exist_ok=True)
+
+    # Asegurar que todos los objetos tienen colores (propiedad o tabla lateral)
     for obj in valid_objs:
-        # Obtener color del objeto
-        if hasattr(obj, "Color"):
-            r, g, b = obj.Color[0], obj.Color[1], obj.Color[2]
-        else:
-            r, g, b = 0.8, 0.8, 0.8
-        
+        if not is_instance(obj) and object_color(obj, None) is None:
+            print(f"⚠ {obj.Name} sin color, usando gris por defecto")
+            if not FAST:
+                obj.addProperty("App::PropertyColor", "Color", "Base", "Object color")
+                obj.Color = (0.8, 0.8, 0.8)
+
+    # Teselar (o leer de la cache compartida con el STL) y volcar en bloque
+    cache = TessCache.for_document(doc)
+    policy = policy or TessPolicy.from_env()
+    tols = policy.plan_objects(valid_objs, cache)
+    meshes = []
+    defined = set()   # prototipos ya escritos con DEF
+    for obj in valid_objs:
+        # Obtener color del objeto (o de su prototipo)
+        r, g, b = object_color(obj)
+
         print(f"  → {obj.Name}: RGB({r:.2f}, {g:.2f}, {b:.2f})")
-        
+
+        if is_instance(obj):
+            # Instancia: la geometría del prototipo se escribe una vez (DEF) y
+            # el resto de instancias sólo aporta su Transform (USE)
+            proto = obj.LinkedObject
+            rot = obj.Placement.Rotation
+            xf = {
+                "translation": (obj.Placement.Base.x, obj.Placement.Base.y, obj.Placement.Base.z),
+                "rotation": (rot.Axis.x, rot.Axis.y, rot.Axis.z, rot.Angle),
+            }
+            name = def_name(proto.Name)
+            if name in defined:
+                meshes.append({"name": obj.Name, "use": name, "transform": xf})
+                continue
+            defined.add(name)
+            mesh = mesh_from_tessellation(obj.Name, (r, g, b), cache.get(proto.Shape, *tols[obj.Name]))
+            mesh.update({"def": name, "transform": xf})
+            meshes.append(mesh)
+            continue
+
         # Tesselate shape
-        shape = obj.Shape
-        tessellation = shape.tessellate(0.1)  # Precisión 0.1mm
-        vertices = tessellation[0]
-        faces = tessellation[1]
-        
-        # Crear Shape node
-        vrml_content.append(f"# Object: {obj.Name}\n")
-        vrml_content.append("Shape {\n")
-        vrml_content.append("  appearance Appearance {\n")
-        vrml_content.append("    material Material {\n")
-        vrml_content.append(f"      diffuseColor {r:.3f} {g:.3f} {b:.3f}\n")
-        vrml_content.append("      specularColor 0.5 0.5 0.5\n")
-        vrml_content.append("      emissiveColor 0.0 0.0 0.0\n")
-        vrml_content.append("      ambientIntensity 0.2\n")
-        vrml_content.append("      transparency 0.0\n")
-        vrml_content.append("      shininess 0.2\n")
-        vrml_content.append("    }\n")
-        vrml_content.append("  }\n")
-        vrml_content.append("  geometry IndexedFaceSet {\n")
-        
-        # Escribir coordenadas
-        vrml_content.append("    coord Coordinate {\n")
-        vrml_content.append("      point [\n")
-        for v in vertices:
-            vrml_content.append(f"        {v.x:.6f} {v.y:.6f} {v.z:.6f},\n")
-        vrml_content.append("      ]\n")
-        vrml_content.append("    }\n")
-        
-        # Escribir índices de caras
-        vrml_content.append("    coordIndex [\n")
-        for face in faces:
-            vrml_content.append(f"      {face[0]}, {face[1]}, {face[2]}, -1,\n")
-        vrml_content.append("    ]\n")
-        
-        vrml_content.append("    solid FALSE\n")
-        vrml_content.append("  }\n")
-        vrml_content.append("}\n\n")
-    
+        tessellation = cache.get(obj.Shape, *tols[obj.Name])
+        meshes.append(mesh_from_tessellation(obj.Name, (r, g, b), tessellation))
+
+    # Costuras soldadas y degenerados fuera (WELD=1), por objeto
+    digits = 6
+    if WELD:
+        stats = [timed("weld", m["name"], weld_mesh, m) for m in meshes if not m.get("use")]
+        print_weld_stats(stats)
+        digits = digits_for(QUANTIZE)
+
+    if merge:
+        # mismo soldado que por objeto: con WELD=1 también cuantiza a QUANTIZE
+        quantum = QUANTIZE if WELD else None
+        merged = timed("merge", f"{len(meshes)} objeto(s)", merge_by_color, meshes,
+                       lambda v, f: weld(v, f, WELD_TOL, quantum))
+        print(f"  ✓ {len(meshes)} nodo(s) → {len(merged)} por color")
+        meshes = merged
+
     # Escribir archivo
-    with open(OUT_WRL, 'w') as f:
-        f.writelines(vrml_content)
-    
+    out_wrl = timed(fmt, out_wrl.name, write_meshes, out_wrl, meshes, fmt, digits)
+
     # Verificar archivo
-    if OUT_WRL.exists():
-        size = OUT_WRL.stat().st_size
-        print(f"✔ WRL generado: {OUT_WRL}")
-        print(f"  Tamaño: {size} bytes")
-        print(f"  ✓ {len(valid_objs)} objetos con materiales")
-    else:
+    if not out_wrl.exists():
         print("❌ No se creó el archivo WRL")
+        return False
+
+    size = out_wrl.stat().st_size
+    print(f"✔ {fmt.upper()} generado: {out_wrl}")
+    print(f"  Tamaño: {size} bytes")
+    print(f"  ✓ {len(valid_objs)} objetos con materiales ({len(defined)} prototipo(s) instanciado(s))")
+    print(f"  ✓ {policy.describe()}; {cache.summary()}")
+
+    if lod:
+        print(f"  full    : {triangles(meshes):>8} triángulos → {out_wrl.name}")
+        for level, suffix in LOD_LEVELS:
+            lod_list = lod_meshes(meshes, level)
+            path = timed(fmt, f"{level}", write_meshes, lod_path(out_wrl, suffix), lod_list, fmt, digits)
+            print(f"  {level:<8}: {triangles(lod_list):>8} triángulos → {path.name} "
+                  f"({path.stat().st_size} bytes)")
+    return True
+
+
+def main():
+    # -----------------------------
+    #  Parámetros
+    # -----------------------------
+    FCSTD_STR = os.environ.get("FCSTD_FILE")
+    OUT_WRL_STR = os.environ.get("OUT_WRL_FILE")
+    # Formato opcional: vrml (por defecto), x3d o x3dz (X3D comprimido con gzip)
+    WRL_FORMAT = os.environ.get("WRL_FORMAT", "vrml")
+
+    if not FCSTD_STR or not OUT_WRL_STR:
+        print("Uso: FCSTD_FILE=<ruta> OUT_WRL_FILE=<ruta> [WRL_FORMAT=vrml|x3d|x3dz] [WRL_LOD=1] [WRL_MERGE=1] [WELD=1 [QUANTIZE=mm]] freecadcmd export_wrl.py")
+        sys.exit(1)
+
+    if WRL_FORMAT not in FORMATS:
+        print(f"❌ ERROR: formato desconocido '{WRL_FORMAT}' (opciones: {', '.join(FORMATS)})")
+        sys.exit(1)
+
+    FCSTD = Path(FCSTD_STR).resolve()
+    OUT_WRL = Path(OUT_WRL_STR).resolve()
+
+    if not FCSTD.exists():
+        print(f"❌ ERROR: No existe {FCSTD}")
+        sys.exit(1)
+
+    print(f">>> Abriendo documento: {FCSTD}")
+    doc = FreeCAD.openDocument(str(FCSTD))
+
+    try:
+        ok = export_wrl(doc, OUT_WRL, WRL_FORMAT)
+    except Exception as e:
+        print(f"❌ Error al exportar: {e}")
+        import traceback
+        traceback.print_exc()
         sys.exit(1)
-        
-except Exception as e:
-    print(f"❌ Error al exportar: {e}")
-    import traceback
-    traceback.print_exc()
-    sys.exit(1)
-
-try:
-    FreeCAD.closeDocument(doc.Name)
-except Exception as e:
-    print(f"⚠ No se pudo cerrar documento: {e}")
-
-print("✔ Exportación completa")
\ No newline at end of file
+
+    if not ok:
+        sys.exit(1)
+
+    try:
+        FreeCAD.closeDocument(doc.Name)
+    except Exception as e:
+        print(f"⚠ No se pudo cerrar documento: {e}")
+
+    print("✔ Exportación completa")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import dis
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import FreeCAD as App
+import Part
+
+from boolean_cut import HoleSet
+from labels import LabelSet
+from profiling import span, count_shape
+
+# ============================
+#   FEATURES CON CACHE (REGENERACIÓN INCREMENTAL)
+# ============================
+# Cada pieza de un módulo (PCB taladrada, housing, potenciómetro, textos...)
+# se construye con una función 'builder' que sólo recibe entradas explícitas:
+#
+#   graph = FeatureGraph(BUILD_DIR)
+#   pcb = graph.build("PCB", drilled_board, L=L, A=A, E=E, drills=drills)
+#
+# La clave de la feature es el hash de su nombre, las entradas, el código
+# del builder y la versión de FreeCAD. Si otra feature se pasa como entrada
+# cuenta su clave, no su geometría: cambiar POT_X sólo rehace las features
+# que dependen de él y el resto se lee como BREP de
+# <modulo>/build/.features/<nombre>-<clave>.brep.
+#
+# Los builders comunes están al final de este archivo; los propios de cada
+# módulo viven en su script. Los helpers de gen/ que llama un builder
+# (HoleSet, LabelSet...) no entran en la clave: al cambiar uno hay que subir
+# FEATURES_VERSION (o construir con FEATURE_CACHE=0).
+
+FEATURES_VERSION = 1
+FEATURES_DIRNAME = ".features"
+ENABLED = os.environ.get("FEATURE_CACHE", "1") not in ("", "0")
+
+# FEATURE_DIR comparte una cache entre builds con otro BUILD_DIR (variantes
+# de gen/sweep.py); de cada feature se guardan las KEEP_VERSIONS últimas
+FEATURE_DIR = os.environ.get("FEATURE_DIR")
+KEEP_VERSIONS = int(os.environ.get("FEATURE_KEEP", "4"))
+
+
+def _code_digest(h, code):
+    """Código de una función sin números de línea (comentarios no cuentan)."""
+    h.update(code.co_code)
+    h.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            _code_digest(h, const)
+        else:
+            h.update(repr(const).encode())
+
+
+def _global_values(code, env):
+    """Globales con datos (números, textos, listas) que lee el código."""
+    found = set()
+    for ins in dis.get_instructions(code):
+        if ins.opname == "LOAD_GLOBAL":
+            value = env.get(ins.argval)
+            if isinstance(value, (int, float, str, list, tuple, dict)):
+                found.add(ins.argval)
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            found |= _global_values(const, env)
+    return found
+
+
+class FeatureGraph:
+    """Features de un módulo con sus claves y la cache BREP en build/."""
+
+    def __init__(self, build_dir):
+        self.directory = Path(FEATURE_DIR) if FEATURE_DIR else Path(build_dir) / FEATURES_DIRNAME
+        self.keys = {}      # id(shape) → clave de la feature que la produjo
+        self.shapes = []    # mantiene vivas las shapes cuyo id está en 'keys'
+        self.reused = []
+        self.rebuilt = []
+
+    # -----------------------------
+    #  Clave de una feature
+    # -----------------------------
+    def _value(self, value):
+        if isinstance(value, Part.Shape):
+            key = self.keys.get(id(value))
+            if key is None:
+                # shape que no salió del grafo: cuenta su geometría
+                return "brep:" + hashlib.sha256(value.exportBrepToString().encode()).hexdigest()
+            return "feature:" + key
+        if isinstance(value, App.Vector):
+            return [value.x, value.y, value.z]
+        if isinstance(value, dict):
+            return {str(k): self._value(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._value(v) for v in value]
+        return value
+
+    def key(self, name, builder, inputs):
+        # un parámetro leído como global no entraría en la clave
+        hidden = _global_values(builder.__code__, builder.__globals__)
+        if hidden:
+            raise ValueError(f"Feature {name}: pasa {', '.join(sorted(hidden))} como entrada "
+                             f"de {builder.__name__} en lugar de leerlo como global")
+        h = hashlib.sha256()
+        h.update(f"{FEATURES_VERSION}|{name}|{'.'.join(App.Version()[:3])}|".encode())
+        h.update(json.dumps(self._value(inputs), sort_keys=True).encode())
+        _code_digest(h, builder.__code__)
+        return h.hexdigest()[:20]
+
+    # -----------------------------
+    #  Construcción
+    # -----------------------------
+    def build(self, name, builder, /, **inputs):
+        """Shape de la feature 'name': desde la cache o llamando builder(**inputs)."""
+        key = self.key(name, builder, inputs)
+        path = self.directory / f"{name}-{key}.brep"
+
+        shape = self._load(path) if ENABLED else None
+        if shape is not None:
+            self.reused.append(name)
+        else:
+            with span("feature", name) as rec:
+                shape = builder(**inputs)
+                count_shape(rec, shape)
+            self.rebuilt.append(name)
+            if ENABLED:
+                self._store(name, path, shape)
+
+        self.keys[id(shape)] = key
+        self.shapes.append(shape)
+        return shape
+
+    def _load(self, path):
+        if not path.exists():
+            return None
+        try:
+            shape = Part.Shape()
+            shape.read(str(path))
+        except Exception:
+            # borrado o a medio escribir por otro build en paralelo
+            return None
+        os.utime(path)   # la más usada es la última en podarse
+        return shape
+
+    def _store(self, name, path, shape):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{os.getpid()}.{path.name}")
+            shape.exportBrep(str(tmp))
+            os.replace(tmp, path)
+
+            # versiones anteriores de esta feature, de la más nueva a la más vieja
+            old = sorted(self.directory.glob(f"{name}-*.brep"),
+                         key=lambda p: p.stat().st_mtime, reverse=True)
+            for stale in old[KEEP_VERSIONS:]:
+                stale.unlink()
+        except OSError as e:
+            print(f"⚠ No se pudo guardar la feature {name}: {e}")
+
+    def summary(self):
+        text = f"{len(self.reused)} reutilizada(s), {len(self.rebuilt)} recalculada(s)"
+        if self.rebuilt and self.reused:
+            text += f" ({', '.join(self.rebuilt)})"
+        return text
+
+
+# -----------------------------
+#  Builders comunes a los módulos
+# -----------------------------
+def drilled_board(L, A, E, drills):
+    """Placa L x A x E con todos sus taladros (x, y, diámetro) en un solo corte."""
+    holes = HoleSet(E)
+    for x, y, d in drills:
+        holes.drill(x, y, d)
+    return holes.cut(Part.makeBox(L, A, E))
+
+
+def pad_ring(r_out, r_in, h, clearance=0.0):
+    """Anillo de soldadura centrado en el origen ('clearance': hueco más alto)."""
+    return Part.makeCylinder(r_out, h).cut(Part.makeCylinder(r_in, h + clearance))
+
+
+def header_housing(x, y, z, length, w, h, wing, axis):
+    """Plástico del header (largo sobre 'axis') con un ala en cada extremo."""
+    if axis == "x":
+        body = Part.makeBox(length, w, h, App.Vector(x, y, z))
+        w1 = Part.makeBox(wing, w, h, App.Vector(x - wing, y, z))
+        w2 = Part.makeBox(wing, w, h, App.Vector(x + length, y, z))
+    else:
+        body = Part.makeBox(w, length, h, App.Vector(x, y, z))
+        w1 = Part.makeBox(w, wing, h, App.Vector(x, y - wing, z))
+        w2 = Part.makeBox(w, wing, h, App.Vector(x, y + length, z))
+    return body.fuse(w1).fuse(w2)
+
+
+def label_block(font, size, height, texts, font_sha):
+    """Textos [(texto, (x, y, z), ángulo)] extruidos juntos (LabelSet).
+
+    'font_sha' (labels.font_hash(font)) sólo entra en la clave: reemplazar el
+    archivo de fuente en la misma ruta invalida la feature.
+    """
+    silk = LabelSet(font, size, height)
+    for text, pos, angle in texts:
+        silk.add(text, App.Vector(*pos), angle)
+    return silk.shape()
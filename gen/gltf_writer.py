@@ -0,0 +1,163 @@
+import hashlib
+import json
+import struct
+
+import numpy as np
+
+# -----------------------------
+#  Escritor glTF 2.0 binario (.glb)
+# -----------------------------
+# Mismas mallas que vrml_writer.py (dicts con "name", "color", "vertices",
+# "faces") más una clave opcional "matrix": 4x4 de NumPy que lleva la malla
+# de sus coordenadas a las del modelo (instancias App::Link).
+#
+# Un solo buffer binario empaquetado. Cada malla se lleva a un origen local
+# (su esquina mínima) y el desplazamiento pasa al nodo, así que pines, pads
+# y demás piezas idénticas comparten geometría aunque se hayan construido
+# como objetos separados en posiciones distintas: las posiciones e índices
+# se escriben una vez y cada objeto es un nodo con su matriz y su material.
+#
+# Unidades: el modelo está en mm con Z arriba; el nodo raíz lo pasa a
+# metros con Y arriba como pide glTF.
+
+GLB_MAGIC = 0x46546C67   # "glTF"
+CHUNK_JSON = 0x4E4F534A  # "JSON"
+CHUNK_BIN = 0x004E4942   # "BIN\0"
+
+FLOAT, UINT16, UINT32 = 5126, 5123, 5125
+ARRAY_BUFFER, ELEMENT_ARRAY_BUFFER = 34962, 34963
+
+QUANTUM = 1e-5   # mm; redondeo para comparar geometría al deduplicar
+
+# mm, Z arriba → m, Y arriba (por columnas, como pide glTF)
+ROOT_MATRIX = [0.001, 0, 0, 0,
+               0, 0, -0.001, 0,
+               0, 0.001, 0, 0,
+               0, 0, 0, 1]
+
+
+def geometry_key(vertices, faces):
+    h = hashlib.sha1()
+    h.update(np.round(vertices / QUANTUM).astype(np.int64).tobytes())
+    h.update(faces.astype(np.int64).tobytes())
+    return h.hexdigest()
+
+
+class _Buffer:
+    """Buffer binario con bufferViews alineados a 4 bytes."""
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+        self.views = []
+        self.accessors = []
+
+    def add(self, array, component, kind, target, bounds=False):
+        data = array.tobytes()
+        self.views.append({"buffer": 0, "byteOffset": self.size,
+                           "byteLength": len(data), "target": target})
+        self.chunks.append(data)
+        self.size += len(data)
+        pad = -self.size % 4
+        if pad:
+            self.chunks.append(b"\0" * pad)
+            self.size += pad
+
+        acc = {"bufferView": len(self.views) - 1, "componentType": component,
+               "count": len(array), "type": kind}
+        if bounds:
+            acc["min"] = array.min(axis=0).tolist()
+            acc["max"] = array.max(axis=0).tolist()
+        self.accessors.append(acc)
+        return len(self.accessors) - 1
+
+    def bytes(self):
+        return b"".join(self.chunks)
+
+
+def build_gltf(meshes):
+    """Devuelve (json dict, bytes del buffer) y estadísticas de deduplicado."""
+    buf = _Buffer()
+    geometries = {}   # clave de geometría → (accesor POSITION, accesor índices)
+    materials = {}    # color → índice de material
+    gltf_meshes = {}  # (geometría, material) → índice de mesh
+    mesh_list, material_list, nodes = [], [], []
+    stats = {"objects": 0, "geometries": 0, "triangles": 0, "triangles_written": 0}
+
+    for m in meshes:
+        verts = np.asarray(m["vertices"], dtype=np.float64).reshape(-1, 3)
+        faces = np.asarray(m["faces"], dtype=np.int64).reshape(-1, 3)
+        if not len(faces):
+            continue
+        stats["objects"] += 1
+        stats["triangles"] += len(faces)
+
+        origin = verts.min(axis=0)
+        local = verts - origin
+        gkey = geometry_key(local, faces)
+        if gkey not in geometries:
+            index_type = (UINT16, np.uint16) if len(local) < 65536 else (UINT32, np.uint32)
+            pos = buf.add(local.astype(np.float32), FLOAT, "VEC3", ARRAY_BUFFER, bounds=True)
+            idx = buf.add(faces.ravel().astype(index_type[1]), index_type[0], "SCALAR",
+                          ELEMENT_ARRAY_BUFFER)
+            geometries[gkey] = (pos, idx)
+            stats["geometries"] += 1
+            stats["triangles_written"] += len(faces)
+
+        color = tuple(round(float(c), 4) for c in m["color"])
+        if color not in materials:
+            materials[color] = len(material_list)
+            material_list.append({
+                "name": "RGB_%.3f_%.3f_%.3f" % color,
+                "pbrMetallicRoughness": {"baseColorFactor": [*color, 1.0],
+                                         "metallicFactor": 0.0, "roughnessFactor": 0.6},
+                "doubleSided": True,
+            })
+
+        mkey = (gkey, materials[color])
+        if mkey not in gltf_meshes:
+            pos, idx = geometries[gkey]
+            gltf_meshes[mkey] = len(mesh_list)
+            mesh_list.append({"primitives": [{"attributes": {"POSITION": pos}, "indices": idx,
+                                              "material": materials[color]}]})
+
+        matrix = np.array(m.get("matrix", np.eye(4)), dtype=np.float64)
+        offset = np.eye(4)
+        offset[:3, 3] = origin
+        matrix = matrix @ offset
+        nodes.append({"name": m["name"], "mesh": gltf_meshes[mkey],
+                      "matrix": matrix.T.ravel().tolist()})
+
+    root = {"name": "root", "matrix": ROOT_MATRIX, "children": list(range(1, len(nodes) + 1))}
+    binary = buf.bytes()
+    gltf = {
+        "asset": {"version": "2.0", "generator": "FreeCAD breakouts (gen/gltf_writer.py)"},
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [root] + nodes,
+        "meshes": mesh_list,
+        "materials": material_list,
+        "accessors": buf.accessors,
+        "bufferViews": buf.views,
+        "buffers": [{"byteLength": len(binary)}],
+    }
+    return gltf, binary, stats
+
+
+def write_glb(path, meshes):
+    """Escribe 'meshes' en 'path' como GLB y devuelve las estadísticas."""
+    gltf, binary, stats = build_gltf(meshes)
+
+    text = json.dumps(gltf, separators=(",", ":")).encode()
+    text += b" " * (-len(text) % 4)
+    binary += b"\0" * (-len(binary) % 4)
+    total = 12 + 8 + len(text) + 8 + len(binary)
+
+    with open(path, "wb") as f:
+        f.write(struct.pack("<III", GLB_MAGIC, 2, total))
+        f.write(struct.pack("<II", len(text), CHUNK_JSON))
+        f.write(text)
+        f.write(struct.pack("<II", len(binary), CHUNK_BIN))
+        f.write(binary)
+    stats["bytes"] = total
+    return stats
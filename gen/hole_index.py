@@ -0,0 +1,137 @@
+import math
+from collections import defaultdict
+
+# -----------------------------
+#  Índice espacial de agujeros
+# -----------------------------
+# Rejilla hash sobre los centros XY: cada consulta de vecinos mira sólo las
+# 9 celdas alrededor del punto, así que deduplicar y agrupar miles de vías
+# es O(n) en lugar de comparar todos contra todos.
+#
+# Sólo usa la librería estándar (se importa desde freecadcmd y python3).
+
+COAXIAL_TOL = 0.01   # mm: caras con el eje a menos de esto son el mismo agujero
+LINK_DIST = 3.0      # mm: algo más que el pitch de 2.54, une pines de un conector
+ROW_TOL = 0.2        # mm: pines en la misma fila/columna
+
+
+class HoleGrid:
+    """Rejilla de celdas de lado 'cell'; las consultas usan radio <= cell."""
+
+    def __init__(self, cell):
+        self.cell = cell
+        self.cells = defaultdict(list)
+        self.points = []
+
+    def _key(self, x, y):
+        return (math.floor(x / self.cell), math.floor(y / self.cell))
+
+    def add(self, x, y):
+        idx = len(self.points)
+        self.points.append((x, y))
+        self.cells[self._key(x, y)].append(idx)
+        return idx
+
+    def near(self, x, y, radius):
+        """Índices de los puntos a distancia <= radius de (x, y)."""
+        cx, cy = self._key(x, y)
+        r2 = radius * radius
+        for i in (cx - 1, cx, cx + 1):
+            for j in (cy - 1, cy, cy + 1):
+                for idx in self.cells.get((i, j), ()):
+                    px, py = self.points[idx]
+                    if (px - x) ** 2 + (py - y) ** 2 <= r2:
+                        yield idx
+
+
+# -----------------------------
+#  Deduplicación de caras coaxiales
+# -----------------------------
+def dedupe_coaxial(holes, tol=COAXIAL_TOL):
+    """Une las entradas con el mismo eje (caras partidas, anillos, avellanados).
+
+    Se queda con el diámetro menor (el taladro) y la 'z' más baja.
+    """
+    grid = HoleGrid(tol)
+    merged = []
+    for hole in holes:
+        match = next(grid.near(hole["x"], hole["y"], tol), None)
+        if match is None:
+            grid.add(hole["x"], hole["y"])
+            merged.append(dict(hole))
+            continue
+        kept = merged[match]
+        kept["diameter"] = min(kept["diameter"], hole["diameter"])
+        kept["z"] = min(kept["z"], hole["z"])
+    return merged
+
+
+# -----------------------------
+#  Conectores, filas y columnas
+# -----------------------------
+def group_connectors(holes, link=LINK_DIST):
+    """Componentes conexas de agujeros separados como mucho 'link' mm."""
+    grid = HoleGrid(link)
+    for hole in holes:
+        grid.add(hole["x"], hole["y"])
+
+    parent = list(range(len(holes)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, (x, y) in enumerate(grid.points):
+        for j in grid.near(x, y, link):
+            ri, rj = find(i), find(j)
+            if ri != rj:
+                parent[max(ri, rj)] = min(ri, rj)
+
+    groups = defaultdict(list)
+    for i, hole in enumerate(holes):
+        groups[find(i)].append(hole)
+
+    # conectores en orden de lectura: por X y luego por Y de su esquina
+    return sorted(groups.values(),
+                  key=lambda g: (min(h["x"] for h in g), min(h["y"] for h in g)))
+
+
+def _bands(values, tol=ROW_TOL):
+    """Asigna a cada valor el índice de su banda (valores a < tol se juntan)."""
+    order = sorted(set(values))
+    band, last, index = -1, None, {}
+    for v in order:
+        if last is None or v - last > tol:
+            band += 1
+        index[v] = band
+        last = v
+    return [index[v] for v in values], band + 1
+
+
+def number_connector(holes, tol=ROW_TOL):
+    """Ordena un conector y anota "row"/"col" en cada agujero.
+
+    El eje largo del conector es el de numeración: un header 1xN sale en
+    orden a lo largo de la fila y uno 2xN en zig-zag (1 y 2 en la primera
+    columna, 3 y 4 en la segunda...), como los headers de KiCad.
+    """
+    rows, n_rows = _bands([h["y"] for h in holes], tol)
+    cols, n_cols = _bands([h["x"] for h in holes], tol)
+    for hole, r, c in zip(holes, rows, cols):
+        hole["row"], hole["col"] = r, c
+
+    if n_cols >= n_rows:
+        return sorted(holes, key=lambda h: (h["col"], h["row"]))
+    return sorted(holes, key=lambda h: (h["row"], h["col"]))
+
+
+def order_pins(holes, link=LINK_DIST, tol=ROW_TOL):
+    """Agrupa en conectores, numera cada uno y anota "group" en cada pin."""
+    pins = []
+    for g, group in enumerate(group_connectors(holes, link)):
+        for hole in number_connector(group, tol):
+            hole["group"] = g
+            pins.append(hole)
+    return pins
@@ -0,0 +1,72 @@
+import FreeCAD as App
+import Part
+
+from colors import color_of
+
+# ============================
+#   INSTANCIADO DE COMPONENTES REPETIDOS
+# ============================
+# Pines, pads y demás piezas repetidas se construyen una sola vez como
+# prototipo (Part::Feature oculto en el origen) y se colocan N veces con
+# App::Link, que sólo guarda una referencia y un Placement. Los exportadores
+# usan la misma información: STEP emite un sólo sólido con instancias y el
+# VRML escribe el prototipo con DEF y cada instancia con USE.
+
+
+def make_prototype(doc, name, shape):
+    """Crea el prototipo (no se exporta por sí mismo, sólo a través de links)."""
+    proto = doc.addObject("Part::Feature", name)
+    proto.Shape = shape
+    proto.addProperty("App::PropertyBool", "Prototype", "Instancing",
+                      "Geometría base de instancias (no se exporta sola)")
+    proto.Prototype = True
+    proto.Visibility = False
+    return proto
+
+
+def place(doc, proto, name, base, rotation=None):
+    """Coloca una instancia de 'proto' en 'base' (con rotación opcional)."""
+    link = doc.addObject("App::Link", name)
+    link.setLink(proto)
+    link.Placement = App.Placement(base, rotation or App.Rotation())
+    return link
+
+
+# ----------------------------
+#   Consultas para exportadores
+# ----------------------------
+def is_prototype(obj):
+    return bool(getattr(obj, "Prototype", False))
+
+
+def is_instance(obj):
+    return getattr(obj, "TypeId", "") == "App::Link" and obj.LinkedObject is not None
+
+
+def prototype_of(obj):
+    return obj.LinkedObject if is_instance(obj) else None
+
+
+def object_shape(obj):
+    """Shape en coordenadas globales (con el Placement del link aplicado)."""
+    return Part.getShape(obj) if is_instance(obj) else obj.Shape
+
+
+def object_color(obj, default=(0.8, 0.8, 0.8)):
+    src = prototype_of(obj) or obj
+    return color_of(src, default)
+
+
+def export_objects(doc):
+    """Objetos exportables: sólidos normales e instancias, sin prototipos."""
+    objs = []
+    for obj in doc.Objects:
+        if is_prototype(obj):
+            continue
+        if is_instance(obj):
+            shape = obj.LinkedObject.Shape if hasattr(obj.LinkedObject, "Shape") else None
+        else:
+            shape = getattr(obj, "Shape", None)
+        if shape is not None and not shape.isNull():
+            objs.append(obj)
+    return objs
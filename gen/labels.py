@@ -0,0 +1,180 @@
+import atexit
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import FreeCAD as App
+import Part
+
+from profiling import span, timed
+
+# ============================
+#   SERIGRAFÍA EN LOTE
+# ============================
+# Draft.makeShapeString crea un objeto por texto y necesita un recompute del
+# documento por cada uno para tener Shape. LabelSet arma el contorno de cada
+# glifo una sola vez por (fuente, tamaño, carácter), compone todos los textos
+# de la placa a partir de esos glifos y los extruye juntos en un único
+# compound: ni objetos ShapeString intermedios ni recomputes.
+#
+# Los glifos también se guardan en disco (.cache/glyphs/ en la raíz, como
+# BREP + avance) con clave (hash del archivo de fuente, tamaño, carácter):
+# los builds siguientes y los demás módulos no vuelven a pasar por el motor
+# de fuentes. El espaciado (tracking) se aplica al componer, así que no
+# forma parte de la clave. Los glifos nuevos se escriben juntos, una vez por
+# LabelSet.shape() (y al salir), no uno por uno.
+
+GEN_DIR = Path(__file__).resolve().parent if "__file__" in globals() else Path("gen").resolve()
+GLYPH_CACHE_DIR = Path(os.environ.get("GLYPH_CACHE_DIR", GEN_DIR.parent / ".cache" / "glyphs"))
+
+PROBE = "I"   # glifo de referencia para medir el avance de cada carácter
+
+_GLYPHS = {}  # (fuente, tamaño, carácter) → (cara o None, avance)
+_PROBES = {}  # (fuente, tamaño) → x mínima del glifo de referencia
+_DISK = {}    # (fuente, tamaño) → {carácter: {"advance", "brep"}} leído de disco
+_FONT_HASH = {}
+_DIRTY = set()  # (fuente, tamaño) con glifos nuevos sin escribir
+
+
+# -----------------------------
+#  Cache en disco
+# -----------------------------
+def font_hash(font):
+    if font not in _FONT_HASH:
+        with open(font, "rb") as f:
+            _FONT_HASH[font] = hashlib.sha256(f.read()).hexdigest()
+    return _FONT_HASH[font]
+
+
+def _cache_file(font, size):
+    return GLYPH_CACHE_DIR / f"{font_hash(font)[:16]}_{size:g}.json"
+
+
+def _read_cache(path):
+    try:
+        with path.open() as f:
+            return json.load(f).get("glyphs", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def _disk_glyphs(font, size):
+    key = (font, size)
+    if key not in _DISK:
+        _DISK[key] = _read_cache(_cache_file(font, size))
+    return _DISK[key]
+
+
+def _store_glyph(font, size, char, face, advance):
+    entry = {"advance": advance,
+             "brep": face.exportBrepToString() if face is not None else None}
+    _disk_glyphs(font, size)[char] = entry
+    _DIRTY.add((font, size))
+
+
+def flush_glyphs():
+    """Escribe en disco los glifos nuevos (un archivo por fuente y tamaño)."""
+    while _DIRTY:
+        font, size = _DIRTY.pop()
+        # se mezcla con lo que haya escrito otro build en paralelo y se
+        # reemplaza el archivo de forma atómica
+        path = _cache_file(font, size)
+        glyphs = _read_cache(path)
+        glyphs.update(_disk_glyphs(font, size))
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            with tmp.open("w") as f:
+                json.dump({"font": str(font), "size": size, "glyphs": glyphs}, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"⚠ No se pudo guardar la cache de glifos: {e}")
+
+
+atexit.register(flush_glyphs)
+
+
+def _load_glyph(font, size, char):
+    entry = _disk_glyphs(font, size).get(char)
+    if entry is None:
+        return None
+    face = None
+    if entry["brep"] is not None:
+        face = Part.Shape()
+        face.importBrepFromString(entry["brep"])
+    return face, entry["advance"]
+
+
+def _xmin(wires):
+    return min(w.BoundBox.XMin for w in wires)
+
+
+def _probe_x(font, size):
+    key = (font, size)
+    if key not in _PROBES:
+        _PROBES[key] = _xmin(Part.makeWireString(PROBE, font, size, 0)[0])
+    return _PROBES[key]
+
+
+def glyph(font, size, char):
+    """Cara del carácter en el origen (None si no tiene trazo) y su avance."""
+    key = (font, size, char)
+    if key in _GLYPHS:
+        return _GLYPHS[key]
+
+    cached = _load_glyph(font, size, char)
+    if cached is not None:
+        _GLYPHS[key] = cached
+        return cached
+
+    # el carácter seguido del glifo de referencia: cuánto se desplaza la
+    # referencia es el avance del carácter (incluye espacios)
+    with span("glyph", char):
+        chars = Part.makeWireString(char + PROBE, font, size, 0)
+        wires = [w for c in chars[:-1] for w in c]
+        advance = _xmin(chars[-1]) - _probe_x(font, size)
+
+        face = Part.makeFace(wires, "Part::FaceMakerBullseye") if wires else None
+    _GLYPHS[key] = (face, advance)
+    _store_glyph(font, size, char, face, advance)
+    return _GLYPHS[key]
+
+
+class LabelSet:
+    """Textos de una placa que se extruyen juntos en un solo sólido."""
+
+    def __init__(self, font, size, height, tracking=0.0):
+        self.font = font
+        self.size = size
+        self.height = height
+        self.tracking = tracking
+        self.texts = []
+
+    def __len__(self):
+        return len(self.texts)
+
+    def add(self, text, base, angle=0.0):
+        """Texto con origen en 'base', girado 'angle' grados alrededor de Z."""
+        faces = []
+        x = 0.0
+        for char in text:
+            face, advance = glyph(self.font, self.size, char)
+            if face is not None:
+                f = face.copy()
+                f.translate(App.Vector(x, 0, 0))
+                faces.append(f)
+            x += advance + self.tracking
+
+        if not faces:
+            return None
+        label = Part.makeCompound(faces)
+        label.Placement = App.Placement(base, App.Rotation(App.Vector(0, 0, 1), angle))
+        self.texts.append(label)
+        return label
+
+    def shape(self):
+        """Un compound con todos los textos extruidos (una sola extrusión)."""
+        flush_glyphs()
+        return timed("extrude", f"{len(self.texts)} texto(s)",
+                     Part.makeCompound(self.texts).extrude, App.Vector(0, 0, self.height))
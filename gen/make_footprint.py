@@ -1,98 +1,207 @@
 #!/usr/bin/env python3
 import json
+import os
 import sys
 from pathlib import Path
 
-# -----------------------------
-#  Parámetros CLI
-# -----------------------------
-if len(sys.argv) < 2:
-    print("Uso: python3 make_footprint.py <holes.json> [basename]")
-    sys.exit(1)
-
-HOLES_JSON = Path(sys.argv[1]).resolve()
-if not HOLES_JSON.exists():
-    raise FileNotFoundError(f"No existe {HOLES_JSON}")
+from board_spec import load_spec, footprint_pins
 
-# Basename opcional
-if len(sys.argv) >= 3:
-    BASENAME = Path(sys.argv[2]).with_suffix("").resolve()
-else:
-    BASENAME = HOLES_JSON.with_suffix("")
+GEN_DIR = Path(__file__).resolve().parent
+ROOT_DIR = GEN_DIR.parent
 
-# -----------------------------
-#  Leer JSON
-# -----------------------------
-with open(HOLES_JSON, "r") as f:
-    data = json.load(f)
+VARIANTS = ("label", "num")
 
-pins = data.get("pins", [])
-if not pins:
-    print("⚠ No hay pines en el JSON.")
-    sys.exit(0)
 
 # -----------------------------
-#  Funciones generadoras
+#  Escritura en streaming
 # -----------------------------
-def make_label_footprint(module_name, pins):
-    lines = []
-    lines.append(f'(footprint "{module_name}_label" (version 20240115)')
-    lines.append('  (generator "TARS")')
-
-    for idx, p in enumerate(pins, start=1):
-        name = p.get("name") or f"PIN{idx}"
-        x, y, d = p["x"], p["y"], p["diameter"]
-
-        lines.append(
-            f'  (pad "{name}" thru_hole circle '
-            f'(at {x} {y}) (size {d+0.4} {d+0.4}) (drill {d}) '
-            f'(layers "*.Cu" "*.Mask"))'
-        )
+def pad_line(name, p):
+    x, y, d = p["x"], p["y"], p["diameter"]
+    return (
+        f'  (pad "{name}" thru_hole circle '
+        f'(at {x} {y}) (size {d+0.4} {d+0.4}) (drill {d}) '
+        f'(layers "*.Cu" "*.Mask"))'
+    )
 
-    lines.append(")")
-    return "\n".join(lines)
 
-
-def make_num_footprint(module_name, pins):
-    lines = []
-    lines.append(f'(footprint "{module_name}_num" (version 20240115)')
-    lines.append('  (generator "TARS")')
+def stream_footprints(module_name, pins, label_f, num_f):
+    """Escribe las variantes _label y _num en una sola pasada sobre 'pins'."""
+    for f, variant in ((label_f, "label"), (num_f, "num")):
+        f.write(f'(footprint "{module_name}_{variant}" (version 20240115)\n')
+        f.write('  (generator "TARS")')
 
     for idx, p in enumerate(pins, start=1):
-        pad_name = str(idx)
-        x, y, d = p["x"], p["y"], p["diameter"]
-
-        lines.append(
-            f'  (pad "{pad_name}" thru_hole circle '
-            f'(at {x} {y}) (size {d+0.4} {d+0.4}) (drill {d}) '
-            f'(layers "*.Cu" "*.Mask"))'
-        )
+        label_f.write("\n" + pad_line(p.get("name") or f"PIN{idx}", p))
+        num_f.write("\n" + pad_line(str(idx), p))
 
-    lines.append(")")
-    return "\n".join(lines)
+    label_f.write("\n)")
+    num_f.write("\n)")
 
 
 # -----------------------------
-#  Preparar nombres
+#  Guardar ambos footprints
 # -----------------------------
-module_name = HOLES_JSON.stem.replace("_holes", "").upper()
+def footprint_paths(basename):
+    basename = Path(basename)
+    return tuple(basename.with_name(f"{basename.name}_{v}.kicad_mod") for v in VARIANTS)
+
+
+def write_footprints(module_name, pins, basename, quiet=False):
+    """Escribe <basename>_label.kicad_mod y <basename>_num.kicad_mod."""
+    label_out, num_out = footprint_paths(basename)
+    label_out.parent.mkdir(parents=True, exist_ok=True)
 
-LABEL_OUT = BASENAME.with_name(BASENAME.name + "_label.kicad_mod")
-NUM_OUT   = BASENAME.with_name(BASENAME.name + "_num.kicad_mod")
+    with open(label_out, "w") as label_f, open(num_out, "w") as num_f:
+        stream_footprints(module_name, pins, label_f, num_f)
+
+    if not quiet:
+        print("✔ Footprints generados:")
+        print(f"  → {label_out}")
+        print(f"  → {num_out}")
+        print(f"  Pines: {len(pins)}")
+    return label_out, num_out
 
-LABEL_OUT.parent.mkdir(parents=True, exist_ok=True)
-NUM_OUT.parent.mkdir(parents=True, exist_ok=True)
 
 # -----------------------------
-#  Guardar ambos footprints
+#  Modo batch: todos los módulos en un proceso
 # -----------------------------
-with open(LABEL_OUT, "w") as f:
-    f.write(make_label_footprint(module_name, pins))
+def collect_sources():
+    """{modulo: pins} desde board.json (si existe) o gen/<modulo>_holes.json."""
+    sources = {}
+    for holes_json in sorted(GEN_DIR.glob("*_holes.json")):
+        mod = holes_json.name[:-len("_holes.json")]
+        with open(holes_json, "r") as f:
+            sources[mod] = json.load(f).get("pins", [])
+
+    for spec in sorted(ROOT_DIR.glob("*/src/board.json")):
+        mod = spec.parent.parent.name
+        sources[mod] = footprint_pins(load_spec(spec))
+
+    return dict(sorted(sources.items()))
+
+
+def fsync_dir(directory):
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_batch(pretty=None):
+    """Footprints de todos los módulos; con 'pretty', como librería KiCad."""
+    sources = collect_sources()
+    if pretty:
+        out_dir = Path(pretty).resolve()
+        out_dir.mkdir(parents=True, exist_ok=True)
+    else:
+        out_dir = GEN_DIR
+
+    written = 0
+    for mod, pins in sources.items():
+        if not pins:
+            print(f"⚠ {mod}: sin pines, se omite")
+            continue
+        # en la librería el nombre de archivo debe coincidir con el footprint
+        basename = out_dir / (mod.upper() if pretty else f"{mod}_auto")
+        write_footprints(mod.upper(), pins, basename, quiet=True)
+        print(f"  → {mod}: {len(pins)} pines")
+        written += 1
+
+    # un solo fsync del directorio para todas las entradas nuevas
+    fsync_dir(out_dir)
+
+    print(f"✔ {written * len(VARIANTS)} footprint(s) de {written} módulo(s) en {out_dir}")
+    return written
+
+
+def usage():
+    print("Uso: python3 make_footprint.py <holes.json> [basename]")
+    print("  O: python3 make_footprint.py --spec <modulo>/src/board.json [basename]")
+    print("  O: python3 make_footprint.py --batch [--pretty <libreria>.pretty]")
+    sys.exit(1)
 
-with open(NUM_OUT, "w") as f:
-    f.write(make_num_footprint(module_name, pins))
 
-print("✔ Footprints generados:")
-print(f"  → {LABEL_OUT}")
-print(f"  → {NUM_OUT}")
-print(f"  Pines: {len(pins)}")
+def main():
+    # -----------------------------
+    #  Parámetros CLI
+    # -----------------------------
+    if len(sys.argv) < 2:
+        usage()
+
+    if sys.argv[1] == "--spec":
+        main_spec(sys.argv[2:])
+        return
+
+    if sys.argv[1] == "--batch":
+        args = sys.argv[2:]
+        pretty = None
+        if "--pretty" in args:
+            i = args.index("--pretty") + 1
+            if i >= len(args):
+                print("❌ ERROR: --pretty requiere la ruta de la librería")
+                usage()
+            pretty = args[i]
+        if not write_batch(pretty):
+            print("⚠ No se encontró ningún módulo con pines.")
+        return
+
+    HOLES_JSON = Path(sys.argv[1]).resolve()
+    if not HOLES_JSON.exists():
+        raise FileNotFoundError(f"No existe {HOLES_JSON}")
+
+    # Basename opcional
+    if len(sys.argv) >= 3:
+        BASENAME = Path(sys.argv[2]).with_suffix("").resolve()
+    else:
+        BASENAME = HOLES_JSON.with_suffix("")
+
+    # -----------------------------
+    #  Leer JSON
+    # -----------------------------
+    with open(HOLES_JSON, "r") as f:
+        data = json.load(f)
+
+    pins = data.get("pins", [])
+    if not pins:
+        print("⚠ No hay pines en el JSON.")
+        sys.exit(0)
+
+    # -----------------------------
+    #  Preparar nombres
+    # -----------------------------
+    module_name = HOLES_JSON.stem.replace("_holes", "").upper()
+
+    write_footprints(module_name, pins, BASENAME)
+
+
+def main_spec(args):
+    # -----------------------------
+    #  Footprint directo desde board.json (sin FreeCAD)
+    # -----------------------------
+    if not args:
+        print("❌ ERROR: Se requiere la ruta del board.json")
+        sys.exit(1)
+
+    SPEC_JSON = Path(args[0]).resolve()
+    if not SPEC_JSON.exists():
+        raise FileNotFoundError(f"No existe {SPEC_JSON}")
+
+    spec = load_spec(SPEC_JSON)
+    module = spec["module"]
+
+    if len(args) >= 2:
+        BASENAME = Path(args[1]).with_suffix("").resolve()
+    else:
+        BASENAME = GEN_DIR / f"{module}_auto"
+
+    pins = footprint_pins(spec)
+    if not pins:
+        print("⚠ No hay pines en el spec.")
+        sys.exit(0)
+
+    write_footprints(module.upper(), pins, BASENAME)
+
+
+if __name__ == "__main__":
+    main()
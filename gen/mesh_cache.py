@@ -0,0 +1,209 @@
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+
+from profiling import span
+from weld import WELD, QUANTIZE, weld
+
+# -----------------------------
+#  Cache de teselación compartida (STL, WRL, glTF...)
+# -----------------------------
+# Cada sólido se malla una sola vez por build: la malla se guarda en memoria
+# y en <modulo>/build/<modulo>.tess/<clave>.npz, junto al FCStd, y todas las
+# exportaciones que producen mallas leen de aquí en lugar de llamar de nuevo
+# a shape.tessellate().
+#
+# La clave es una firma geométrica de la shape (tipo, caja, volumen, área,
+# vértices y tipo/área de cada cara) más la tolerancia. No se usa el BREP
+# completo porque éste incluye la triangulación cuando ya existe y la clave
+# cambiaría después de teselar.
+
+DEFAULT_DEFLECTION = 0.1   # mm, la misma que usaba export_wrl.py
+
+# Cada cambio de geometría o de tolerancia deja mallas nuevas: se conservan
+# las TESS_KEEP más recientes por directorio (un acierto cuenta como uso),
+# nunca las usadas en este proceso.
+KEEP_MESHES = int(os.environ.get("TESS_KEEP", "256"))
+
+_SHARED = {}   # directorio → TessCache compartida en el proceso
+
+
+def shape_key(shape, deflection, angular=None):
+    h = hashlib.sha1()
+    bb = shape.BoundBox
+    tol = f"{deflection:.6g}" if angular is None else f"{deflection:.6g}/{angular:.6g}"
+    h.update(f"{tol}|{shape.ShapeType}|".encode())
+    h.update(("%.6f " * 6 % (bb.XMin, bb.YMin, bb.ZMin, bb.XMax, bb.YMax, bb.ZMax)).encode())
+    h.update(f"|{shape.Volume:.6f}|{shape.Area:.6f}|".encode())
+    for v in shape.Vertexes:
+        p = v.Point
+        h.update(b"%.6f %.6f %.6f;" % (p.x, p.y, p.z))
+    for f in shape.Faces:
+        h.update(f"{f.Surface.__class__.__name__}:{f.Area:.6f};".encode())
+    return h.hexdigest()
+
+
+def tessellate(shape, deflection, angular=None):
+    if angular is None:
+        return shape.tessellate(deflection)
+    import MeshPart   # sólo dentro de FreeCAD
+    mesh = MeshPart.meshFromShape(Shape=shape, LinearDeflection=deflection,
+                                  AngularDeflection=angular, Relative=False)
+    points, facets = mesh.Topology
+    return [(p.x, p.y, p.z) for p in points], facets
+
+
+class TessCache:
+    """Teselaciones por (firma de shape, tolerancia), en memoria y en disco."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory) if directory else None
+        self.memory = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def beside(cls, fcstd_path):
+        """Cache persistida junto a un FCStd: <nombre>.FCStd → <nombre>.tess/
+
+        Se comparte una instancia por directorio, así que dentro de un mismo
+        proceso (gen/pipeline.py) el STL del módulo y el WRL reutilizan las
+        mallas en memoria sin releer el disco.
+        """
+        directory = Path(fcstd_path).resolve().with_suffix(".tess")
+        if directory not in _SHARED:
+            _SHARED[directory] = cls(directory)
+        return _SHARED[directory]
+
+    @classmethod
+    def for_document(cls, doc):
+        # Documentos sin guardar: sólo cache en memoria
+        return cls.beside(doc.FileName) if doc.FileName else cls(None)
+
+    def get(self, shape, deflection=DEFAULT_DEFLECTION, angular=None):
+        """Devuelve (vertices (N,3) float, faces (M,3) int) de 'shape'.
+
+        Sin 'angular' se usa shape.tessellate(deflection) (desviación angular
+        por defecto de OCC); con 'angular' (radianes), MeshPart con ambas.
+        """
+        key = shape_key(shape, deflection, angular)
+
+        mesh = self.memory.get(key)
+        if mesh is None and self.directory is not None:
+            path = self.directory / f"{key}.npz"
+            if path.exists():
+                with np.load(path) as data:
+                    mesh = (data["vertices"], data["faces"])
+                self.memory[key] = mesh
+                os.utime(path)   # la más usada es la última en podarse
+
+        if mesh is not None:
+            self.hits += 1
+            return mesh
+
+        self.misses += 1
+        with span("tessellate", f"{len(shape.Faces)} caras"):
+            verts, faces = tessellate(shape, deflection, angular)
+        mesh = (
+            np.asarray(verts, dtype=np.float64).reshape(-1, 3),
+            np.asarray(faces, dtype=np.int64).reshape(-1, 3),
+        )
+        self.memory[key] = mesh
+        self._save(key, mesh)
+        return mesh
+
+    def _save(self, key, mesh):
+        if self.directory is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / f"{key}.tmp.npz"
+        np.savez(tmp, vertices=mesh[0], faces=mesh[1])
+        os.replace(tmp, self.directory / f"{key}.npz")
+        self.prune()
+
+    def prune(self, keep=KEEP_MESHES):
+        """Borra las mallas más viejas del directorio más allá de 'keep'."""
+        if self.directory is None:
+            return 0
+        live = {f"{key}.npz" for key in self.memory}
+        try:
+            old = sorted((p for p in self.directory.glob("*.npz")
+                          if p.name not in live and not p.name.endswith(".tmp.npz")),
+                         key=lambda p: p.stat().st_mtime, reverse=True)
+            keep = max(0, keep - len(live))
+            for stale in old[keep:]:
+                stale.unlink()
+            return len(old[keep:])
+        except OSError as e:
+            print(f"⚠ No se pudo podar la cache de teselación: {e}")
+            return 0
+
+    def summary(self):
+        return f"teselación: {self.misses} nueva(s), {self.hits} desde cache"
+
+
+# -----------------------------
+#  Mallas por objeto (instancias incluidas)
+# -----------------------------
+def placement_matrix(placement):
+    """Matriz 4x4 de NumPy a partir de un App.Placement."""
+    return np.array(placement.toMatrix().A, dtype=np.float64).reshape(4, 4)
+
+
+def transform(vertices, matrix):
+    return vertices @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def object_mesh(obj, cache, deflection=DEFAULT_DEFLECTION):
+    """Malla en coordenadas globales; los App::Link reutilizan la del prototipo."""
+    if getattr(obj, "TypeId", "") == "App::Link" and obj.LinkedObject is not None:
+        verts, faces = cache.get(obj.LinkedObject.Shape, deflection)
+        return transform(verts, placement_matrix(obj.Placement)), faces
+    return cache.get(obj.Shape, deflection)
+
+
+# -----------------------------
+#  STL binario desde la cache
+# -----------------------------
+STL_DTYPE = np.dtype([
+    ("normal", "<f4", (3,)),
+    ("v", "<f4", (3, 3)),
+    ("attr", "<u2"),
+])
+
+
+def write_stl(path, objs, cache, deflection=DEFAULT_DEFLECTION):
+    """Escribe un STL binario con las shapes de 'objs' leyendo de 'cache'."""
+    with span("stl", Path(path).name) as rec:
+        n = _write_stl(path, objs, cache, deflection)
+        rec["triangles"] = n
+    return n
+
+
+def _write_stl(path, objs, cache, deflection):
+    tris = []
+    for obj in objs:
+        verts, faces = object_mesh(obj, cache, deflection)
+        if WELD:
+            # el STL no indexa vértices: sólo ganan los degenerados descartados
+            verts, faces = weld(verts, faces, quantum=QUANTIZE)
+        if len(faces):
+            tris.append(verts[faces])
+    tris = np.concatenate(tris) if tris else np.zeros((0, 3, 3))
+
+    normals = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+
+    records = np.zeros(len(tris), dtype=STL_DTYPE)
+    records["normal"] = normals
+    records["v"] = tris
+
+    header = b"Binary STL generated by FreeCAD breakouts".ljust(80, b" ")
+    with open(path, "wb") as f:
+        f.write(header)
+        f.write(np.uint32(len(records)).tobytes())
+        f.write(records.tobytes())
+    return len(records)
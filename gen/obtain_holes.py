@@ -5,123 +5,158 @@ import os
 import sys
 from pathlib import Path
 
-# -----------------------------
-#  Parámetros desde variables de entorno o línea de comandos
-# -----------------------------
-# freecadcmd procesa todos los argumentos como archivos de proyecto,
-# así que usamos variables de entorno como método principal
-
-FCSTD_STR = os.environ.get("FCSTD_FILE")
-OUT_STR = os.environ.get("OUT_FILE")
-
-# Si no hay variables de entorno, intentar con sys.argv (para compatibilidad)
-if not FCSTD_STR and len(sys.argv) >= 2:
-    # Filtrar argumentos que no sean el script actual
-    args = [a for a in sys.argv[1:] if a != __file__ and not a.endswith('.py')]
-    if args:
-        FCSTD_STR = args[0]
-        if len(args) >= 2:
-            OUT_STR = args[1]
-
-if not FCSTD_STR:
-    print("Uso: FCSTD_FILE=<ruta> OUT_FILE=<ruta> freecadcmd obtain_holes.py")
-    print("  O: freecadcmd -c \"import os; os.environ['FCSTD_FILE']='<ruta>'; exec(open('gen/obtain_holes.py').read())\"")
-    sys.exit(1)
-
-FCSTD = Path(FCSTD_STR).resolve()
-if not FCSTD.exists():
-    raise FileNotFoundError(f"No existe {FCSTD}")
-
-# Archivo de salida (opcional)
-if OUT_STR:
-    OUT = Path(OUT_STR).resolve()
-else:
-    # Por defecto: gen/<nombre_modulo>_holes.json
-    BASE = Path(__file__).resolve().parent
-    ROOT = BASE.parent
-    # Extraer nombre del módulo desde la ruta del FCStd
-    # Ej: bme280/build/bme280.FCStd -> bme280
-    module_name = FCSTD.parent.parent.name
-    OUT = ROOT / "gen" / f"{module_name}_holes.json"
+GEN_DIR = Path(__file__).resolve().parent if "__file__" in globals() else Path("gen").resolve()
+sys.path.insert(0, str(GEN_DIR))
+
+from hole_index import dedupe_coaxial, order_pins
+from brep_bundle import Bundle
+
+MAX_PIN_DIAM = 2.0  # regla electrónica estándar
+
 
 # -----------------------------
-#  Cargar documento
+#  Buscar la PCB
 # -----------------------------
-doc = App.openDocument(str(FCSTD))
-
-# Buscar objeto "PCB" o el primer objeto con Shape
-pcb = doc.getObject("PCB")
-if pcb is None:
-    # Si no hay "PCB", buscar el primer objeto con Shape
-    for obj in doc.Objects:
-        if hasattr(obj, "Shape") and obj.Shape is not None:
-            pcb = obj
-            print(f">>> Objeto 'PCB' no encontrado, usando '{obj.Name}' en su lugar.")
-            break
-    
-if pcb is None or not hasattr(pcb, "Shape") or pcb.Shape is None:
-    raise RuntimeError("No se encontró ningún objeto con Shape en el archivo FCStd.")
-
-shape = pcb.Shape
-
-pins = []
-other = []
+def find_pcb(doc):
+    # Buscar objeto "PCB" o el primer objeto con Shape
+    pcb = doc.getObject("PCB")
+    if pcb is None:
+        # Si no hay "PCB", buscar el primer objeto con Shape
+        for obj in doc.Objects:
+            if hasattr(obj, "Shape") and obj.Shape is not None:
+                pcb = obj
+                print(f">>> Objeto 'PCB' no encontrado, usando '{obj.Name}' en su lugar.")
+                break
+
+    if pcb is None or not hasattr(pcb, "Shape") or pcb.Shape is None:
+        raise RuntimeError("No se encontró ningún objeto con Shape en el archivo FCStd.")
+
+    return pcb
 
-MAX_PIN_DIAM = 2.0  # regla electrónica estándar
 
 # -----------------------------
 #  Extraer cilindros
 # -----------------------------
-for face in shape.Faces:
-    surf = face.Surface
-    if surf.__class__.__name__ != "Cylinder":
-        continue
-
-    r = surf.Radius
-    d = round(2*r, 3)
-    cx, cy, cz = surf.Center.x, surf.Center.y, surf.Center.z
-
-    hole = {
-        "x": round(cx, 3),
-        "y": round(cy, 3),
-        "z": round(cz, 3),
-        "diameter": d
-    }
+def extract_holes(doc):
+    """Devuelve {"pins": [...], "others": [...]} a partir de la PCB de 'doc'."""
+    # Nombres desde metadata
+    meta = doc.getObject("PinMeta")
+    return holes_from_shape(find_pcb(doc).Shape, list(meta.Names) if meta else [])
+
+
+def extract_holes_bundle(bundle):
+    """Como extract_holes, leyendo sólo la PCB del bundle BREP."""
+    return holes_from_shape(bundle.shape(bundle.pcb_name), bundle.pin_names)
+
+
+def holes_from_shape(shape, names):
+    # Una entrada por cara cilíndrica vertical (puede haber varias por agujero)
+    faces = []
+    for face in shape.Faces:
+        surf = face.Surface
+        if surf.__class__.__name__ != "Cylinder":
+            continue
+        if abs(surf.Axis.z) < 0.999:
+            continue  # cantos redondeados, ejes horizontales...
+
+        faces.append({
+            "x": round(surf.Center.x, 3),
+            "y": round(surf.Center.y, 3),
+            "z": round(surf.Center.z, 3),
+            "diameter": round(2 * surf.Radius, 3)
+        })
+
+    # Caras coaxiales (cilindros partidos, anillos) → un solo agujero
+    holes = dedupe_coaxial(faces)
 
     # Clasificación automática
-    if d <= MAX_PIN_DIAM:
-        pins.append(hole)
-    else:
-        other.append(hole)
+    pins = [h for h in holes if h["diameter"] <= MAX_PIN_DIAM]
+    other = [h for h in holes if h["diameter"] > MAX_PIN_DIAM]
 
-# ordenar pines por X (header estándar)
-pins.sort(key=lambda h: h["x"])
+    # Conectores por cercanía y numeración por filas/columnas
+    pins = order_pins(pins)
 
-# -----------------------------
-#  Nombres desde metadata
-# -----------------------------
-meta = doc.getObject("PinMeta")
-names = list(meta.Names) if meta else []
+    for i, hole in enumerate(pins):
+        hole["name"] = names[i] if i < len(names) else None
+
+    return {"pins": pins, "others": other}
 
-for i, hole in enumerate(pins):
-    hole["name"] = names[i] if i < len(names) else None
 
 # -----------------------------
 #  Exportar
 # -----------------------------
-OUT.parent.mkdir(parents=True, exist_ok=True)
-
-with OUT.open("w") as f:
-    json.dump({"pins": pins, "others": other}, f, indent=4)
-
-# Mensaje informativo
-total_holes = len(pins) + len(other)
-if total_holes == 0:
-    print("⚠ Este sólido no tiene agujeros.")
-    print(f"  → {OUT}")
-    print("  (Archivo JSON generado con listas vacías)")
-else:
-    print("✔ Agujeros procesados:")
-    print(f"  → {OUT}")
-    print(f"  Pins:   {len(pins)}")
-    print(f"  Otros:  {len(other)}")
+def write_holes(data, out):
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+
+    with out.open("w") as f:
+        json.dump(data, f, indent=4)
+
+    # Mensaje informativo
+    pins, other = data["pins"], data["others"]
+    total_holes = len(pins) + len(other)
+    if total_holes == 0:
+        print("⚠ Este sólido no tiene agujeros.")
+        print(f"  → {out}")
+        print("  (Archivo JSON generado con listas vacías)")
+    else:
+        print("✔ Agujeros procesados:")
+        print(f"  → {out}")
+        print(f"  Pins:   {len(pins)}")
+        print(f"  Otros:  {len(other)}")
+
+
+def main():
+    # -----------------------------
+    #  Parámetros desde variables de entorno o línea de comandos
+    # -----------------------------
+    # freecadcmd procesa todos los argumentos como archivos de proyecto,
+    # así que usamos variables de entorno como método principal
+
+    FCSTD_STR = os.environ.get("FCSTD_FILE")
+    OUT_STR = os.environ.get("OUT_FILE")
+
+    # Si no hay variables de entorno, intentar con sys.argv (para compatibilidad)
+    if not FCSTD_STR and len(sys.argv) >= 2:
+        # Filtrar argumentos que no sean el script actual
+        args = [a for a in sys.argv[1:] if a != globals().get("__file__") and not a.endswith('.py')]
+        if args:
+            FCSTD_STR = args[0]
+            if len(args) >= 2:
+                OUT_STR = args[1]
+
+    if not FCSTD_STR:
+        print("Uso: FCSTD_FILE=<ruta> OUT_FILE=<ruta> freecadcmd obtain_holes.py")
+        print("  O: freecadcmd -c \"import os; os.environ['FCSTD_FILE']='<ruta>'; exec(open('gen/obtain_holes.py').read())\"")
+        sys.exit(1)
+
+    FCSTD = Path(FCSTD_STR).resolve()
+    if not FCSTD.exists():
+        raise FileNotFoundError(f"No existe {FCSTD}")
+
+    # Archivo de salida (opcional)
+    if OUT_STR:
+        OUT = Path(OUT_STR).resolve()
+    else:
+        # Por defecto: gen/<nombre_modulo>_holes.json
+        # Extraer nombre del módulo desde la ruta del FCStd
+        # Ej: bme280/build/bme280.FCStd -> bme280
+        ROOT = FCSTD.parent.parent.parent
+        module_name = FCSTD.parent.parent.name
+        OUT = ROOT / "gen" / f"{module_name}_holes.json"
+
+    # -----------------------------
+    #  Cargar sólo la PCB (bundle BREP) o, si no hay, el documento
+    # -----------------------------
+    bundle = Bundle.beside(FCSTD)
+    if bundle is not None:
+        with bundle:
+            data = extract_holes_bundle(bundle)
+    else:
+        data = extract_holes(App.openDocument(str(FCSTD)))
+
+    write_holes(data, OUT)
+
+
+if __name__ == "__main__":
+    main()
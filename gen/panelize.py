@@ -0,0 +1,243 @@
+import os
+import sys
+import json
+import time
+from pathlib import Path
+
+# -----------------------------
+#  Panelizado N×M de un módulo
+# -----------------------------
+# Uso: MODULE=<modulo> [PANEL=10x10] [PANEL_GAP=2.0] [PANEL_RAIL=5.0] freecadcmd gen/panelize.py
+#
+# Toma la PCB de <modulo>/build/<modulo>.FCStd y arma un panel de
+# fabricación: N×M placas separadas por un canal de fresado, raíles arriba y
+# abajo con agujeros de utillaje y fiduciales, y pestañas con mouse-bites que
+# unen cada placa con sus vecinas y con los raíles.
+#
+#   - Las placas son App::Link de un único prototipo (la PCB del módulo ya
+#     lleva sus taladros): 100 placas no son 100 sólidos copiados.
+#   - Raíles y pestañas forman un solo compound y todos sus taladros
+#     (mouse-bites y utillaje) se cortan en un único boolean (HoleSet).
+#
+# Salida en <modulo>/build/panel/ (fuera de los artefactos cacheados del
+# módulo): FCStd, STEP, STL y <panel>_holes.json con los taladros de todas
+# las placas y del marco, en el mismo formato que obtain_holes.py, más sus
+# Excellon (<panel>-PTH.drl / -NPTH.drl) y la tabla <panel>_drill.csv.
+
+import FreeCAD as App
+import Part
+
+GEN_DIR = Path(__file__).resolve().parent if "__file__" in globals() else Path("gen").resolve()
+ROOT_DIR = GEN_DIR.parent
+sys.path.insert(0, str(GEN_DIR))
+
+from boolean_cut import HoleSet
+from colors import safe_color, save_colors, color_of
+from instancing import make_prototype, place, export_objects
+from obtain_holes import find_pcb, extract_holes, extract_holes_bundle
+from brep_bundle import Bundle
+from export_step import export_step
+from export_drill import export_drill
+from mesh_cache import TessCache, write_stl
+
+PCB_COLOR = (0.0, 0.45, 0.20)
+COPPER = (0.85, 0.65, 0.20)
+
+TAB_W = 3.0         # ancho de cada pestaña a lo largo del borde
+BITE_D = 0.5        # diámetro de los mouse-bites
+BITE_PITCH = 0.8    # paso entre mouse-bites
+TOOLING_D = 3.0     # agujeros de utillaje en los raíles (NPTH)
+FIDUCIAL_D = 1.0    # fiduciales de cobre (sin máscara)
+FIDUCIAL_H = 0.035
+
+
+def parse_panel(text):
+    nx, ny = (int(v) for v in text.lower().split("x"))
+    if nx < 1 or ny < 1:
+        raise ValueError(f"Panel inválido: {text}")
+    return nx, ny
+
+
+def bite_row(holes, start, end, fixed, along_x, out):
+    """Fila de mouse-bites centrada en [start, end] sobre la línea 'fixed'."""
+    n = int((end - start - BITE_D) / BITE_PITCH) + 1
+    first = (start + end) / 2 - (n - 1) * BITE_PITCH / 2
+    for k in range(n):
+        pos = first + k * BITE_PITCH
+        x, y = (pos, fixed) if along_x else (fixed, pos)
+        holes.drill(x, y, BITE_D)
+        out.append((x, y, BITE_D))
+
+
+class Panel:
+    """Geometría del panel a partir de la caja de la PCB del módulo."""
+
+    def __init__(self, bb, nx, ny, gap, rail):
+        self.bb = bb
+        self.nx, self.ny = nx, ny
+        self.gap, self.rail = gap, rail
+        self.w, self.h = bb.XLength, bb.YLength
+        self.z, self.e = bb.ZMin, bb.ZLength
+
+        self.width = nx * self.w + (nx - 1) * gap
+        self.height = 2 * rail + 2 * gap + ny * self.h + (ny - 1) * gap
+
+    def tile_origin(self, i, j):
+        """Esquina inferior izquierda de la placa (i, j)."""
+        return (i * (self.w + self.gap), self.rail + self.gap + j * (self.h + self.gap))
+
+    def tile_offset(self, i, j):
+        """Traslación que lleva la PCB original a la posición (i, j)."""
+        x, y = self.tile_origin(i, j)
+        return App.Vector(x - self.bb.XMin, y - self.bb.YMin, 0)
+
+    def frame(self):
+        """Raíles + pestañas (compound) y taladros del marco en un HoleSet."""
+        solids = []
+        holes = HoleSet(self.e, self.z)
+        drills = []
+
+        # Raíles inferior y superior
+        top = self.height - self.rail
+        for y0 in (0.0, top):
+            solids.append(Part.makeBox(self.width, self.rail, self.e, App.Vector(0, y0, self.z)))
+
+        # Utillaje y fiduciales: asimétricos para que el panel no entre girado
+        tool_x = min(3.5, self.width * 0.15)
+        fid_x = min(7.5, self.width * 0.35)
+        for y0 in (0.0, top):
+            for x in (tool_x, self.width - tool_x):
+                holes.mount(x, y0 + self.rail / 2, TOOLING_D)
+                drills.append((x, y0 + self.rail / 2, TOOLING_D))
+        fiducials = [(fid_x, self.rail / 2), (self.width - fid_x, self.rail / 2),
+                     (fid_x, top + self.rail / 2)]
+
+        # Pestañas entre columnas (canales verticales)
+        for j in range(self.ny):
+            _, y = self.tile_origin(0, j)
+            yc = y + self.h / 2
+            for i in range(self.nx - 1):
+                x0 = self.tile_origin(i, j)[0] + self.w
+                solids.append(Part.makeBox(self.gap, TAB_W, self.e,
+                                           App.Vector(x0, yc - TAB_W / 2, self.z)))
+                for edge in (x0 + BITE_D / 2, x0 + self.gap - BITE_D / 2):
+                    bite_row(holes, yc - TAB_W / 2, yc + TAB_W / 2, edge, False, drills)
+
+        # Pestañas entre filas y hacia los raíles (canales horizontales)
+        for j in range(self.ny + 1):
+            y0 = self.rail + j * (self.h + self.gap)
+            for i in range(self.nx):
+                xc = self.tile_origin(i, 0)[0] + self.w / 2
+                solids.append(Part.makeBox(TAB_W, self.gap, self.e,
+                                           App.Vector(xc - TAB_W / 2, y0, self.z)))
+                for edge in (y0 + BITE_D / 2, y0 + self.gap - BITE_D / 2):
+                    bite_row(holes, xc - TAB_W / 2, xc + TAB_W / 2, edge, True, drills)
+
+        return Part.makeCompound(solids), holes, drills, fiducials
+
+
+def hole_record(x, y, z, d, **extra):
+    return dict({"x": round(x, 3), "y": round(y, 3), "z": round(z, 3), "diameter": round(d, 3)}, **extra)
+
+
+def main():
+    mod = os.environ.get("MODULE")
+    if not mod:
+        print("Uso: MODULE=<modulo> [PANEL=10x10] [PANEL_GAP=2.0] [PANEL_RAIL=5.0] freecadcmd gen/panelize.py")
+        sys.exit(1)
+
+    nx, ny = parse_panel(os.environ.get("PANEL", "10x10"))
+    gap = float(os.environ.get("PANEL_GAP", "2.0"))
+    rail = float(os.environ.get("PANEL_RAIL", "5.0"))
+
+    fcstd = ROOT_DIR / mod / "build" / f"{mod}.FCStd"
+    if not fcstd.exists():
+        print(f"❌ ERROR: No existe {fcstd}")
+        print(f"   Ejecuta 'make {mod}' primero para generar el archivo FCStd.")
+        sys.exit(1)
+
+    t0 = time.perf_counter()
+    bundle = Bundle.beside(fcstd)
+    if bundle is not None:
+        # sólo la PCB, sin deserializar el documento
+        with bundle:
+            tile_shape = bundle.shape(bundle.pcb_name).copy()
+            tile_color = bundle.color(bundle.pcb_name)
+            tile_holes = extract_holes_bundle(bundle)
+    else:
+        src = App.openDocument(str(fcstd))
+        pcb = find_pcb(src)
+        tile_shape = pcb.Shape.copy()
+        tile_color = color_of(pcb, PCB_COLOR)
+        tile_holes = extract_holes(src)
+        App.closeDocument(src.Name)
+
+    panel = Panel(tile_shape.BoundBox, nx, ny, gap, rail)
+    name = f"{mod}_panel_{nx}x{ny}"
+    out_dir = ROOT_DIR / mod / "build" / "panel"
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f">>> Panel {nx}x{ny} de {mod}: {panel.width:.2f} x {panel.height:.2f} mm")
+    doc = App.newDocument(name.replace("-", "_"))
+
+    # Placas: un prototipo + N×M instancias
+    proto = make_prototype(doc, "Tile_Proto", tile_shape)
+    safe_color(proto, tile_color)
+    tiles = []
+    for j in range(ny):
+        for i in range(nx):
+            tiles.append(place(doc, proto, f"Tile_{i}_{j}", panel.tile_offset(i, j)))
+
+    # Marco: un boolean para todos los taladros de raíles y pestañas
+    frame_shape, frame_holes, frame_drills, fiducials = panel.frame()
+    frame = doc.addObject("Part::Feature", "Frame")
+    frame.Shape = frame_holes.cut(frame_shape)
+    safe_color(frame, tile_color)
+
+    fid = doc.addObject("Part::Feature", "Fiducials")
+    fid.Shape = Part.makeCompound([
+        Part.makeCylinder(FIDUCIAL_D / 2, FIDUCIAL_H, App.Vector(x, y, panel.z + panel.e))
+        for x, y in fiducials
+    ])
+    safe_color(fid, COPPER)
+
+    doc.recompute()
+
+    # Taladros combinados: los de cada placa desplazados + los del marco
+    drill = {"pins": [], "others": []}
+    for j in range(ny):
+        for i in range(nx):
+            off = panel.tile_offset(i, j)
+            for kind in ("pins", "others"):
+                for h in tile_holes[kind]:
+                    drill[kind].append(hole_record(h["x"] + off.x, h["y"] + off.y, h["z"], h["diameter"],
+                                                   tile=[i, j]))
+    # mouse-bites y agujeros de herramienta no son metalizados: siempre NPTH
+    for x, y, d in frame_drills:
+        drill["others"].append(hole_record(x, y, panel.z + panel.e / 2, d, tile=None))
+
+    # -----------------------------
+    #  Exportación
+    # -----------------------------
+    fcstd_path = out_dir / f"{name}.FCStd"
+    doc.saveAs(str(fcstd_path))
+    save_colors(doc, fcstd_path)
+
+    export_step(doc, out_dir / f"{name}.step")
+    n_tris = write_stl(out_dir / f"{name}.stl", export_objects(doc), TessCache.beside(fcstd_path))
+
+    holes_path = out_dir / f"{name}_holes.json"
+    with holes_path.open("w") as f:
+        json.dump(drill, f, indent=1)
+    export_drill(drill, out_dir / name)
+
+    print(f"✔ Panel {name} generado en {time.perf_counter() - t0:.2f} s:")
+    print(f"   FCStd: {fcstd_path}")
+    print(f"   STEP : {out_dir / (name + '.step')}")
+    print(f"   STL  : {out_dir / (name + '.stl')} ({n_tris} triángulos)")
+    print(f"   Taladros: {holes_path} ({len(drill['pins'])} pines, {len(drill['others'])} otros NPTH con mouse-bites)")
+    print(f"   {len(tiles)} placa(s) instanciada(s), {len(frame_holes)} taladro(s) del marco en un boolean")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import os
+import sys
+import time
+import json
+import runpy
+from pathlib import Path
+
+# -----------------------------
+#  Pipeline completa de un módulo en un solo proceso
+# -----------------------------
+# Uso: MODULE=<modulo> [STAGES=holes,footprint,steps,wrl] freecadcmd gen/pipeline.py
+#   (etapas opcionales, sólo si se piden en STAGES: glb)
+#   [WRL_FORMAT=vrml|x3d|x3dz] elige el formato de la etapa wrl
+#
+# Construye el documento una sola vez ejecutando <modulo>/src/<modulo>.py en
+# este mismo intérprete y después corre extracción de agujeros, footprints,
+# STEP y WRL sobre el documento en memoria. Así 'make <modulo>_all' paga el
+# arranque de FreeCAD y la carga del documento una vez en lugar de cuatro.
+
+import FreeCAD as App
+
+GEN_DIR = Path(__file__).resolve().parent if "__file__" in globals() else Path("gen").resolve()
+ROOT_DIR = GEN_DIR.parent
+sys.path.insert(0, str(GEN_DIR))
+
+from obtain_holes import extract_holes, write_holes
+from make_footprint import write_footprints
+from board_spec import load_spec, spec_path, footprint_pins
+from export_step import export_step
+from export_wrl import export_wrl
+from vrml_writer import FORMATS
+from export_glb import export_glb
+from profiling import write_trace
+
+STAGES = ("holes", "footprint", "steps", "wrl")
+OPTIONAL_STAGES = ("glb",)
+
+
+# -----------------------------
+#  Etapas
+# -----------------------------
+def generate(mod):
+    """Ejecuta el script del módulo y devuelve el documento que creó."""
+    script = ROOT_DIR / mod / "src" / f"{mod}.py"
+    if not script.exists():
+        raise FileNotFoundError(f"No existe {script}")
+
+    before = set(App.listDocuments())
+    runpy.run_path(str(script), run_name="__main__")
+
+    created = [name for name in App.listDocuments() if name not in before]
+    if created:
+        return App.getDocument(created[-1])
+    if App.ActiveDocument is None:
+        raise RuntimeError(f"{script} no creó ningún documento")
+    return App.ActiveDocument
+
+
+def run_pipeline(mod, stages=STAGES):
+    """Devuelve una lista de (etapa, segundos, ok)."""
+    timings = []
+    holes_json = GEN_DIR / f"{mod}_holes.json"
+    build_dir = ROOT_DIR / mod / "build"
+    state = {}
+
+    def stage_generate():
+        state["doc"] = generate(mod)
+        return True
+
+    def stage_holes():
+        state["holes"] = extract_holes(state["doc"])
+        write_holes(state["holes"], holes_json)
+        return True
+
+    def stage_footprint():
+        spec = spec_path(ROOT_DIR / mod)
+        if spec.exists():
+            # el spec declara los pines: no hace falta leerlos del modelo
+            pins = footprint_pins(load_spec(spec))
+        else:
+            data = state.get("holes")
+            if data is None:
+                with open(holes_json) as f:
+                    data = json.load(f)
+            pins = data.get("pins", [])
+        if not pins:
+            print("⚠ No hay pines en el JSON.")
+            return True
+        write_footprints(mod.upper(), pins, GEN_DIR / f"{mod}_auto")
+        return True
+
+    def stage_steps():
+        return export_step(state["doc"], build_dir / f"{mod}.step")
+
+    def stage_wrl():
+        # mismo formato opcional que export_wrl.py: vrml (por defecto), x3d o x3dz
+        fmt = os.environ.get("WRL_FORMAT", "vrml")
+        if fmt not in FORMATS:
+            print(f"❌ ERROR: formato desconocido '{fmt}' (opciones: {', '.join(FORMATS)})")
+            return False
+        return export_wrl(state["doc"], build_dir / f"{mod}.wrl", fmt)
+
+    def stage_glb():
+        return export_glb(state["doc"], build_dir / f"{mod}.glb")
+
+    runners = {
+        "generate": stage_generate,
+        "holes": stage_holes,
+        "footprint": stage_footprint,
+        "steps": stage_steps,
+        "wrl": stage_wrl,
+        "glb": stage_glb,
+    }
+
+    for name in ("generate",) + tuple(stages):
+        print(f">>> [{mod}] etapa: {name}")
+        t0 = time.perf_counter()
+        try:
+            ok = runners[name]()
+        except Exception as e:
+            print(f"❌ ERROR en '{name}': {e}")
+            ok = False
+        timings.append((name, time.perf_counter() - t0, bool(ok)))
+        if not ok:
+            break
+
+    return timings
+
+
+# -----------------------------
+#  Reporte
+# -----------------------------
+def print_report(mod, timings):
+    total = sum(t for _, t, _ in timings)
+    print("━" * 50)
+    print(f"  Tiempos de pipeline: {mod}")
+    print("━" * 50)
+    for name, t, ok in timings:
+        mark = "✔" if ok else "❌"
+        print(f"  {mark} {name:<10} {t:>8.3f} s")
+    print(f"    {'total':<10} {total:>8.3f} s")
+
+
+def write_report(mod, timings):
+    out = ROOT_DIR / mod / "build" / "pipeline_report.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with out.open("w") as f:
+        json.dump({
+            "module": mod,
+            "stages": [{"stage": n, "seconds": round(t, 6), "ok": ok} for n, t, ok in timings],
+        }, f, indent=4)
+    return out
+
+
+def main():
+    mod = os.environ.get("MODULE")
+    if not mod:
+        print("Uso: MODULE=<modulo> [STAGES=holes,footprint,steps,wrl] freecadcmd gen/pipeline.py")
+        sys.exit(1)
+
+    stages = os.environ.get("STAGES")
+    stages = [s.strip() for s in stages.split(",") if s.strip()] if stages else list(STAGES)
+    unknown = [s for s in stages if s not in STAGES + OPTIONAL_STAGES]
+    if unknown:
+        print(f"❌ ERROR: etapas desconocidas: {', '.join(unknown)}")
+        sys.exit(1)
+
+    timings = run_pipeline(mod, stages)
+    print_report(mod, timings)
+    write_report(mod, timings)
+    # con PROFILE=1 la traza incluye también STEP y WRL
+    write_trace(mod, ROOT_DIR / mod / "build")
+
+    if not all(ok for _, _, ok in timings) or len(timings) != len(stages) + 1:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+import json
+import sys
+from pathlib import Path
+
+# -----------------------------
+#  Visor de perfiles de build (PROFILE=1)
+# -----------------------------
+# Uso: python3 gen/profile_view.py [-n N] [modulo ...]
+#   Lee <modulo>/build/profile.json (lo escribe gen/profiling.py al construir
+#   con PROFILE=1), agrupa los registros por (etapa, objeto) y muestra los N
+#   puntos más caros de cada módulo con su parte del tiempo total.
+
+GEN_DIR = Path(__file__).resolve().parent
+ROOT_DIR = GEN_DIR.parent
+
+TRACE_NAME = "profile.json"
+TOP_N = 10
+
+
+def load_trace(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def hot_spots(trace):
+    """[(etapa, objeto, segundos, llamadas, caras)] de mayor a menor tiempo."""
+    groups = {}
+    for rec in trace.get("spans", []):
+        key = (rec["stage"], rec.get("name", ""))
+        g = groups.setdefault(key, [0.0, 0, 0])
+        g[0] += rec["seconds"]
+        g[1] += 1
+        g[2] = max(g[2], rec.get("faces", 0))
+    spots = [(stage, name, t, n, faces) for (stage, name), (t, n, faces) in groups.items()]
+    return sorted(spots, key=lambda s: s[2], reverse=True)
+
+
+def print_module(trace, top):
+    total = trace.get("total") or 0.0
+    spots = hot_spots(trace)
+    print("━" * 72)
+    print(f"  {trace.get('module', '?')}: {total:.3f} s en total, {len(trace.get('spans', []))} registro(s)")
+    print("━" * 72)
+    print(f"  {'etapa':<16} {'objeto':<24} {'tiempo':>9} {'%':>6} {'veces':>6} {'caras':>6}")
+    for stage, name, t, n, faces in spots[:top]:
+        pct = 100.0 * t / total if total else 0.0
+        print(f"  {stage:<16} {name[:24]:<24} {t:>8.3f}s {pct:>5.1f}% {n:>6} {faces or '-':>6}")
+    if len(spots) > top:
+        rest = sum(s[2] for s in spots[top:])
+        print(f"  ... {len(spots) - top} más ({rest:.3f} s)")
+
+
+def main():
+    args = sys.argv[1:]
+    top = TOP_N
+    if "-n" in args:
+        i = args.index("-n")
+        top = int(args[i + 1])
+        del args[i:i + 2]
+
+    if args:
+        paths = [ROOT_DIR / mod / "build" / TRACE_NAME for mod in args]
+    else:
+        paths = sorted(ROOT_DIR.glob(f"*/build/{TRACE_NAME}"))
+
+    found = False
+    for path in paths:
+        if not path.exists():
+            print(f"⚠ No existe {path} (construye el módulo con PROFILE=1)")
+            continue
+        print_module(load_trace(path), top)
+        found = True
+
+    if not found:
+        print("❌ No hay perfiles. Ejemplo: make bme280_all PROFILE=1 NO_CACHE=1")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# ============================
+#   PERFILADO DE BUILDS (opcional)
+# ============================
+# Con PROFILE=1 cada operación envuelta con span()/timed() deja un registro
+#   {"stage": "cut", "name": "PCB", "seconds": 0.012, "solids": 1, "faces": 38}
+# y al final del build se vuelca la traza en <modulo>/build/profile.json.
+# gen/profile_view.py la lee y ordena los puntos calientes.
+#
+# Sin PROFILE no se mide nada: span() no hace trabajo y timed() sólo llama.
+
+PROFILE = os.environ.get("PROFILE", "") not in ("", "0")
+TRACE_NAME = "profile.json"
+
+_TRACE = []
+_T0 = time.perf_counter()
+
+
+def count_shape(rec, shape):
+    """Anota en 'rec' los sólidos y caras de 'shape' (si es una shape)."""
+    if hasattr(shape, "Solids") and hasattr(shape, "Faces"):
+        rec["solids"] = len(shape.Solids)
+        rec["faces"] = len(shape.Faces)
+
+
+@contextmanager
+def span(stage, name=""):
+    """Mide el bloque; el dict que devuelve admite datos extra (p. ej. caras)."""
+    if not PROFILE:
+        yield {}
+        return
+    rec = {"stage": stage, "name": name, "start": time.perf_counter() - _T0}
+    t0 = time.perf_counter()
+    try:
+        yield rec
+    finally:
+        rec["seconds"] = time.perf_counter() - t0
+        _TRACE.append(rec)
+
+
+def timed(stage, name, fn, *args, **kwargs):
+    """Llama a fn(*args, **kwargs) midiendo tiempo y sólidos/caras del resultado."""
+    if not PROFILE:
+        return fn(*args, **kwargs)
+    with span(stage, name) as rec:
+        result = fn(*args, **kwargs)
+        count_shape(rec, result)
+    return result
+
+
+def write_trace(module, build_dir):
+    """Vuelca la traza acumulada en <build_dir>/profile.json (sólo con PROFILE)."""
+    if not PROFILE:
+        return None
+    out = Path(build_dir) / TRACE_NAME
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with out.open("w") as f:
+        json.dump({
+            "module": module,
+            "total": time.perf_counter() - _T0,
+            "spans": [dict(r, seconds=round(r["seconds"], 6), start=round(r["start"], 6))
+                      for r in _TRACE],
+        }, f, indent=1)
+    print(f">>> Perfil: {len(_TRACE)} registro(s) en {out}")
+    return out
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+# -----------------------------
+#  Orquestador paralelo de módulos
+# -----------------------------
+# Uso: python3 gen/scheduler.py [-j N] [--stages holes,footprint,steps,wrl] [modulo ...]
+#
+# Conoce las mismas dependencias que el makefile:
+#   %_holes: %    %_footprint: %_holes    %_steps: %    %_wrl: %
+# (con <modulo>/src/board.json el footprint no depende de nada)
+# y reparte las etapas de todos los módulos entre N procesos freecadcmd
+# simultáneos (por defecto, uno por núcleo). Cada etapa ya es un proceso
+# externo, así que los workers sólo lanzan y esperan subprocesos.
+
+GEN_DIR = Path(__file__).resolve().parent
+ROOT_DIR = GEN_DIR.parent
+sys.path.insert(0, str(GEN_DIR))
+
+import build_cache
+from board_spec import spec_path
+
+FREECADCMD = os.environ.get("FREECADCMD", "freecadcmd")
+
+STAGES = ("holes", "footprint", "steps", "wrl")
+
+# etapa → etapa de la que depende (la generación del FCStd es "build")
+DEPENDS = {
+    "build": None,
+    "holes": "build",
+    "footprint": "holes",
+    "steps": "build",
+    "wrl": "build",
+}
+
+
+def discover_modules():
+    # Igual que MODULE_DIRS en el makefile: carpetas con src/<modulo>.py
+    return sorted(p.parent.name for p in ROOT_DIR.glob("*/src")
+                  if (p / f"{p.parent.name}.py").exists())
+
+
+def has_spec(mod):
+    return spec_path(ROOT_DIR / mod).exists()
+
+
+# -----------------------------
+#  Comandos de cada etapa
+# -----------------------------
+def exec_gen(script):
+    return [FREECADCMD, "-c", f"exec(open('gen/{script}').read())"]
+
+
+def stage_command(mod, stage):
+    fcstd = f"{mod}/build/{mod}.FCStd"
+    if stage == "build":
+        return [FREECADCMD, f"{mod}/src/{mod}.py"], {}
+    if stage == "holes":
+        return exec_gen("obtain_holes.py"), {"FCSTD_FILE": fcstd, "OUT_FILE": f"gen/{mod}_holes.json"}
+    if stage == "footprint":
+        if has_spec(mod):
+            return [sys.executable, "gen/make_footprint.py", "--spec",
+                    f"{mod}/src/board.json", f"gen/{mod}_auto.kicad_mod"], {}
+        return [sys.executable, "gen/make_footprint.py",
+                f"gen/{mod}_holes.json", f"gen/{mod}_auto.kicad_mod"], {}
+    if stage == "steps":
+        return exec_gen("export_step.py"), {"FCSTD_FILE": fcstd, "OUT_STEP_FILE": f"{mod}/build/{mod}.step"}
+    if stage == "wrl":
+        return exec_gen("export_wrl.py"), {"FCSTD_FILE": fcstd, "OUT_WRL_FILE": f"{mod}/build/{mod}.wrl"}
+    raise ValueError(stage)
+
+
+def run_job(job):
+    mod, stage = job
+    cmd, extra_env = stage_command(mod, stage)
+    env = dict(os.environ, **extra_env)
+    log_path = ROOT_DIR / mod / "build" / f"{stage}.log"
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+
+    t0 = time.perf_counter()
+    with log_path.open("w") as log:
+        proc = subprocess.run(cmd, cwd=ROOT_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    return proc.returncode == 0, time.perf_counter() - t0, t0
+
+
+# -----------------------------
+#  Scheduler
+# -----------------------------
+def build_graph(modules, stages):
+    jobs = {}
+    for mod in modules:
+        for stage in ("build",) + tuple(stages):
+            dep = DEPENDS[stage]
+            # footprint sin holes en la lista: depende de un holes.json existente
+            if dep is not None and dep not in stages and dep != "build":
+                dep = None
+            # con board.json el footprint no necesita el modelo: arranca ya
+            if stage == "footprint" and has_spec(mod):
+                dep = None
+            jobs[(mod, stage)] = (mod, dep) if dep else None
+    return jobs
+
+
+def schedule(jobs, workers):
+    results = {}          # job → (ok, seconds, start)
+    pending = dict(jobs)
+    running = {}
+    failed_mods = set()
+    t_start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            for job, dep in list(pending.items()):
+                if job[0] in failed_mods:
+                    results[job] = (None, 0.0, 0.0)
+                    del pending[job]
+                elif dep is None or dep in results:
+                    running[pool.submit(run_job, job)] = job
+                    del pending[job]
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                job = running.pop(fut)
+                ok, dt, t0 = fut.result()
+                results[job] = (ok, dt, t0 - t_start)
+                mark = "✔" if ok else "❌"
+                print(f"  {mark} {job[0]:<10} {job[1]:<10} {dt:>8.2f} s")
+                if not ok:
+                    failed_mods.add(job[0])
+                    print(f"    (ver {job[0]}/build/{job[1]}.log)")
+
+    return results, time.perf_counter() - t_start
+
+
+def critical_path(jobs, results):
+    """Cadena de dependencias más larga (suma de duraciones)."""
+    finish = {}
+
+    def longest(job):
+        if job in finish:
+            return finish[job]
+        dep = jobs[job]
+        prev = longest(dep) if dep else (0.0, [])
+        dt = results[job][1]
+        finish[job] = (prev[0] + dt, prev[1] + [job])
+        return finish[job]
+
+    best = (0.0, [])
+    for job in jobs:
+        if results.get(job, (None,))[0]:
+            cand = longest(job)
+            if cand[0] > best[0]:
+                best = cand
+    return best
+
+
+def report(jobs, results, wall, workers):
+    ran = {j: r for j, r in results.items() if r[0] is not None}
+    serial = sum(r[1] for r in ran.values())
+    cp_len, cp_jobs = critical_path(jobs, results)
+
+    print("━" * 60)
+    print("  Resumen")
+    print("━" * 60)
+    print(f"  Workers:              {workers}")
+    print(f"  Etapas ejecutadas:    {len(ran)}")
+    print(f"  Tiempo serial (suma): {serial:8.2f} s")
+    print(f"  Tiempo real:          {wall:8.2f} s")
+    if wall > 0:
+        print(f"  Speedup:              {serial / wall:8.2f}x")
+    print(f"  Ruta crítica:         {cp_len:8.2f} s")
+    for mod, stage in cp_jobs:
+        print(f"    → {mod}/{stage:<10} {results[(mod, stage)][1]:>8.2f} s")
+
+    skipped = [j for j, r in results.items() if r[0] is None]
+    if skipped:
+        print(f"  Omitidas por fallo previo: {', '.join(f'{m}/{s}' for m, s in skipped)}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Construcción paralela de todos los módulos")
+    ap.add_argument("modules", nargs="*", help="módulos a construir (por defecto, todos)")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--stages", default=",".join(STAGES))
+    ap.add_argument("--no-cache", action="store_true", help="ignorar la cache de artefactos")
+    args = ap.parse_args()
+
+    modules = args.modules or discover_modules()
+    stages = [s for s in args.stages.split(",") if s]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        print(f"❌ ERROR: etapas desconocidas: {', '.join(unknown)}")
+        sys.exit(2)
+
+    # Módulos sin cambios se restauran desde la cache y no se programan
+    # (sólo con la pipeline completa, para no guardar entradas parciales)
+    use_cache = not args.no_cache and set(stages) == set(STAGES)
+    if use_cache:
+        modules = [m for m in modules if not build_cache.restore(m)]
+        # lo que se guarde después debe ser sólo lo de esta corrida
+        for mod in modules:
+            build_cache.clean(mod)
+
+    if not modules:
+        print("✔ Nada que construir.")
+        return
+
+    jobs = build_graph(modules, stages)
+    print(f">>> {len(jobs)} etapa(s) de {len(modules)} módulo(s) con {args.jobs} worker(s)")
+    results, wall = schedule(jobs, args.jobs)
+    report(jobs, results, wall, args.jobs)
+
+    failed = {j[0] for j, r in results.items() if not r[0]}
+    if use_cache:
+        for mod in modules:
+            if mod not in failed:
+                build_cache.store(mod)
+
+    if failed:
+        print(f"❌ Fallaron: {', '.join(sorted(failed))}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+import csv
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# -----------------------------
+#  Barrido de parámetros (variantes de un módulo)
+# -----------------------------
+# Uso: python3 gen/sweep.py [-j N] <modulo> PARAM=v1,v2,... [PARAM=...]
+#   p. ej.  python3 gen/sweep.py bme280 pitch=2.0,2.54 E=1.0,1.2,1.6
+#
+# PARAM es cualquier clave de SPEC_OVERRIDES (ver board_spec.py): E, L, A,
+# pitch, drill/HOLE_DIAM o rutas como headers.main.pitch. Se construye el
+# producto cartesiano de los valores; cada variante es un freecadcmd
+# (gen/sweep_variant.py) y corren N a la vez, como en scheduler.py.
+#
+# Las variantes escriben en <modulo>/build/sweep/<variante>/ y comparten la
+# cache de features del módulo (<modulo>/build/.features/): lo que no
+# depende de los parámetros barridos (housing, textos...) se construye una
+# sola vez. Cada feature conserva tantas versiones como variantes haya, para
+# que un barrido repetido tampoco reconstruya nada. Resumen en <modulo>/build/sweep/summary.json y summary.csv.
+
+GEN_DIR = Path(__file__).resolve().parent
+ROOT_DIR = GEN_DIR.parent
+
+FREECADCMD = os.environ.get("FREECADCMD", "freecadcmd")
+
+
+def parse_grid(args):
+    """['E=1.0,1.6', 'pitch=2.54'] → {'E': [1.0, 1.6], 'pitch': [2.54]}"""
+    grid = {}
+    for arg in args:
+        if "=" not in arg:
+            raise ValueError(f"parámetro sin valores: {arg} (usa PARAM=v1,v2)")
+        key, values = arg.split("=", 1)
+        grid[key] = [float(v) for v in values.split(",") if v.strip()]
+    return grid
+
+
+def variants(grid):
+    keys = list(grid)
+    for combo in itertools.product(*(grid[k] for k in keys)):
+        params = dict(zip(keys, combo))
+        name = "_".join(f"{k.split('.')[-1]}{v:g}" for k, v in params.items())
+        yield name, params
+
+
+def run_variant(mod, name, params, out_dir, keep):
+    vdir = out_dir / name
+    if vdir.exists():
+        shutil.rmtree(vdir)
+    vdir.mkdir(parents=True)
+    result_json = vdir / "result.json"
+
+    env = dict(os.environ, MODULE=mod, SPEC_OVERRIDES=json.dumps(params),
+               MODULE_BUILD_DIR=str(vdir), SWEEP_OUT=str(result_json),
+               FEATURE_DIR=str(ROOT_DIR / mod / "build" / ".features"),
+               FEATURE_KEEP=str(keep))
+    t0 = time.perf_counter()
+    with (vdir / "build.log").open("w") as log:
+        proc = subprocess.run([FREECADCMD, str(GEN_DIR / "sweep_variant.py")], cwd=ROOT_DIR,
+                              env=env, stdout=log, stderr=subprocess.STDOUT)
+    wall = time.perf_counter() - t0
+
+    result = {"variant": name, "params": params, "ok": False, "wall": round(wall, 3)}
+    if proc.returncode == 0 and result_json.exists():
+        with result_json.open() as f:
+            result.update(json.load(f))
+        result["ok"] = True
+    return result
+
+
+def print_summary(results):
+    print(f"  {'variante':<28} {'tiempo':>8} {'volumen':>10} {'caja (mm)':>22} "
+          f"{'agujeros':>8} {'features':>9}")
+    for r in results:
+        if not r["ok"]:
+            print(f"  ❌ {r['variant']:<26} falló (ver build.log)")
+            continue
+        bbox = " x ".join(f"{v:.2f}" for v in r["bbox"])
+        feats = r.get("features")
+        reused = f"{len(feats['reused'])}/{len(feats['reused']) + len(feats['rebuilt'])}" if feats else "-"
+        print(f"  {r['variant']:<28} {r['seconds']:>7.2f}s {r['volume']:>10.2f} {bbox:>22} "
+              f"{len(r['holes']):>8} {reused:>9}")
+
+
+def write_summary(results, out_dir):
+    with (out_dir / "summary.json").open("w") as f:
+        json.dump(results, f, indent=1)
+
+    with (out_dir / "summary.csv").open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["variant", "params", "ok", "seconds", "volume", "pcb_volume",
+                         "bbox_x", "bbox_y", "bbox_z", "holes", "hole_list"])
+        for r in results:
+            if not r["ok"]:
+                writer.writerow([r["variant"], json.dumps(r["params"]), False])
+                continue
+            holes = " ".join(f"{h['x']:g},{h['y']:g},Ø{h['diameter']:g}" for h in r["holes"])
+            writer.writerow([r["variant"], json.dumps(r["params"]), True, r["seconds"], r["volume"],
+                             r["pcb_volume"], *r["bbox"], len(r["holes"]), holes])
+
+
+def main():
+    args = sys.argv[1:]
+    jobs = os.cpu_count() or 1
+    if "-j" in args:
+        i = args.index("-j")
+        jobs = int(args[i + 1])
+        del args[i:i + 2]
+
+    if len(args) < 2:
+        print("Uso: python3 gen/sweep.py [-j N] <modulo> PARAM=v1,v2,... [PARAM=...]")
+        sys.exit(1)
+
+    mod, grid = args[0], parse_grid(args[1:])
+    if not (ROOT_DIR / mod / "src" / f"{mod}.py").exists():
+        print(f"❌ ERROR: No existe {mod}/src/{mod}.py")
+        sys.exit(1)
+
+    todo = list(variants(grid))
+    out_dir = ROOT_DIR / mod / "build" / "sweep"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    print(f">>> Barrido de {mod}: {len(todo)} variante(s) con {min(jobs, len(todo))} worker(s)")
+
+    keep = max(int(os.environ.get("FEATURE_KEEP") or 4), len(todo))
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(lambda v: run_variant(mod, v[0], v[1], out_dir, keep), todo))
+    wall = time.perf_counter() - t0
+
+    print_summary(results)
+    write_summary(results, out_dir)
+    print(f"✔ {sum(r['ok'] for r in results)}/{len(results)} variante(s) en {wall:.2f} s → "
+          f"{out_dir / 'summary.csv'}")
+
+    if not all(r["ok"] for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
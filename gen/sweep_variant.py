@@ -0,0 +1,69 @@
+import json
+import os
+import runpy
+import sys
+import time
+from pathlib import Path
+
+# -----------------------------
+#  Una variante de gen/sweep.py
+# -----------------------------
+# Uso: MODULE=<modulo> SPEC_OVERRIDES=<json> MODULE_BUILD_DIR=<dir> SWEEP_OUT=<json> \
+#      freecadcmd gen/sweep_variant.py
+#
+# Ejecuta el script del módulo en este intérprete (como pipeline.py) con el
+# spec modificado y la salida en MODULE_BUILD_DIR, y resume el documento:
+# volumen, caja envolvente, agujeros, tiempo y features reutilizadas.
+
+import FreeCAD as App
+
+GEN_DIR = Path(__file__).resolve().parent if "__file__" in globals() else Path("gen").resolve()
+ROOT_DIR = GEN_DIR.parent
+sys.path.insert(0, str(GEN_DIR))
+
+from instancing import export_objects, object_shape
+from obtain_holes import find_pcb, extract_holes
+
+
+def summarize(doc):
+    shapes = [object_shape(obj) for obj in export_objects(doc)]
+    bb = App.BoundBox()
+    for shape in shapes:
+        bb.add(shape.BoundBox)
+
+    data = extract_holes(doc)
+    holes = [{"x": h["x"], "y": h["y"], "diameter": h["diameter"]}
+             for h in data["pins"] + data["others"]]
+    return {
+        "volume": round(sum(s.Volume for s in shapes), 4),
+        "pcb_volume": round(find_pcb(doc).Shape.Volume, 4),
+        "bbox": [round(bb.XLength, 3), round(bb.YLength, 3), round(bb.ZLength, 3)],
+        "holes": holes,
+    }
+
+
+def main():
+    mod = os.environ["MODULE"]
+    out = Path(os.environ["SWEEP_OUT"])
+    script = ROOT_DIR / mod / "src" / f"{mod}.py"
+
+    before = set(App.listDocuments())
+    t0 = time.perf_counter()
+    env = runpy.run_path(str(script), run_name="__main__")
+    seconds = time.perf_counter() - t0
+
+    created = [name for name in App.listDocuments() if name not in before]
+    doc = App.getDocument(created[-1]) if created else App.ActiveDocument
+
+    result = summarize(doc)
+    result["seconds"] = round(seconds, 3)
+    graph = env.get("graph")
+    if graph is not None:
+        result["features"] = {"reused": graph.reused, "rebuilt": graph.rebuilt}
+
+    with out.open("w") as f:
+        json.dump(result, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
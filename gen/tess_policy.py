@@ -0,0 +1,134 @@
+import math
+import os
+
+# ============================
+#   TOLERANCIA DE TESELACIÓN POR OBJETO
+# ============================
+# Con TESS=fixed (por defecto) todo se tesela con shape.tessellate(0.1),
+# como siempre. Con TESS=adaptive cada shape recibe su propia pareja
+# (desviación lineal, desviación angular):
+#
+#   lineal  = LIN_REL × diagonal de la caja, limitada a [LIN_MIN, LIN_MAX]
+#             y a DETAIL_REL × el detalle más fino de la shape (radio del
+#             arco más chico o tamaño de las curvas BSpline: glifos)
+#   angular = de ANG_COARSE (piezas de ~1 mm: pines QFN) a ANG_FINE (piezas
+#             de ~50 mm: portapilas, PCB), interpolado en escala log
+#
+# TESS_BUDGET=N (implica adaptive) limita los triángulos de toda la placa:
+# se tesela, se cuentan los triángulos (cada instancia cuenta) y, si se
+# pasa, se relajan todas las tolerancias en proporción y se repite.
+
+LIN_REL = 0.005
+LIN_MIN = 0.005      # mm
+LIN_MAX = 0.25       # mm
+DETAIL_REL = 0.05
+
+ANG_COARSE = 0.8     # rad, piezas de SIZE_SMALL o menos
+ANG_FINE = 0.25      # rad, piezas de SIZE_LARGE o más
+ANG_MAX = 1.2        # rad, tope al relajar por presupuesto
+SIZE_SMALL = 1.0     # mm
+SIZE_LARGE = 50.0    # mm
+
+BUDGET_ITERS = 4
+
+FIXED_DEFLECTION = 0.1
+
+
+def _clamp(v, lo, hi):
+    return max(lo, min(hi, v))
+
+
+def finest_detail(shape):
+    """Radio del arco más chico o semitamaño de la curva libre más chica (None si sólo hay rectas)."""
+    detail = None
+    for edge in shape.Edges:
+        kind = edge.Curve.__class__.__name__
+        if kind == "Circle":
+            size = edge.Curve.Radius
+        elif kind == "Ellipse":
+            size = edge.Curve.MinorRadius
+        elif kind in ("BSplineCurve", "BezierCurve"):
+            size = edge.BoundBox.DiagonalLength / 2
+        else:
+            continue
+        if size > 0 and (detail is None or size < detail):
+            detail = size
+    return detail
+
+
+def adaptive_tolerance(shape):
+    """(lineal, angular) para 'shape' según su caja y su curvatura."""
+    size = shape.BoundBox.DiagonalLength
+    linear = _clamp(LIN_REL * size, LIN_MIN, LIN_MAX)
+    detail = finest_detail(shape)
+    if detail is not None:
+        linear = max(LIN_MIN, min(linear, DETAIL_REL * detail))
+
+    t = _clamp(math.log(max(size, SIZE_SMALL) / SIZE_SMALL) / math.log(SIZE_LARGE / SIZE_SMALL), 0.0, 1.0)
+    angular = ANG_COARSE + (ANG_FINE - ANG_COARSE) * t
+    return linear, angular
+
+
+class TessPolicy:
+    """Elige la tolerancia de cada shape de un documento antes de teselar."""
+
+    def __init__(self, mode="fixed", budget=None):
+        self.mode = "adaptive" if budget else mode
+        self.budget = budget
+        self.triangles = 0
+
+    @classmethod
+    def from_env(cls):
+        budget = int(os.environ.get("TESS_BUDGET") or 0) or None
+        return cls(os.environ.get("TESS", "fixed"), budget)
+
+    def plan(self, shapes, cache, weights=None):
+        """Tolerancias [(lineal, angular o None)] para 'shapes', alineadas.
+
+        'weights' es cuántas veces aparece cada shape en la placa (instancias).
+        """
+        if self.mode != "adaptive":
+            return [(FIXED_DEFLECTION, None)] * len(shapes)
+
+        weights = weights or [1] * len(shapes)
+        tols = [adaptive_tolerance(s) for s in shapes]
+        if not self.budget:
+            return tols
+
+        for _ in range(BUDGET_ITERS):
+            self.triangles = sum(w * len(cache.get(s, *tol)[1])
+                                 for s, w, tol in zip(shapes, weights, tols))
+            if self.triangles <= self.budget:
+                return tols
+            # en curvas los triángulos crecen ~ 1/tolerancia: relajar en proporción
+            factor = self.triangles / self.budget
+            tols = [(min(lin * factor, s.BoundBox.DiagonalLength / 10), min(ang * factor, ANG_MAX))
+                    for s, (lin, ang) in zip(shapes, tols)]
+
+        self.triangles = sum(w * len(cache.get(s, *tol)[1])
+                             for s, w, tol in zip(shapes, weights, tols))
+        if self.triangles > self.budget:
+            print(f"⚠ Presupuesto de {self.budget} triángulos no alcanzable: "
+                  f"{self.triangles} (caras planas no se simplifican)")
+        return tols
+
+    def plan_objects(self, objs, cache):
+        """{nombre de objeto: tolerancia}; las instancias usan la de su prototipo."""
+        sources = [o.LinkedObject if getattr(o, "TypeId", "") == "App::Link" and o.LinkedObject is not None
+                   else o for o in objs]
+        counts = {}
+        for src in sources:
+            counts[src.Name] = counts.get(src.Name, 0) + 1
+        unique = {src.Name: src for src in sources}
+
+        names = list(unique)
+        tols = self.plan([unique[n].Shape for n in names], cache, [counts[n] for n in names])
+        by_source = dict(zip(names, tols))
+        return {obj.Name: by_source[src.Name] for obj, src in zip(objs, sources)}
+
+    def describe(self):
+        if self.mode != "adaptive":
+            return f"teselación fija ({FIXED_DEFLECTION} mm)"
+        if self.budget:
+            return f"teselación adaptativa, {self.triangles}/{self.budget} triángulos"
+        return "teselación adaptativa"
@@ -0,0 +1,232 @@
+import gzip
+import re
+from xml.sax.saxutils import quoteattr
+
+import numpy as np
+
+# -----------------------------
+#  Escritor VRML/X3D vectorizado
+# -----------------------------
+# Recibe mallas ya teseladas como arrays de NumPy y formatea vértices e
+# índices en bloque (una sola operación de formato por bloque de filas)
+# en lugar de un f-string por vértice y por triángulo.
+#
+# Cada malla es un dict:
+#   {"name": str, "color": (r, g, b), "vertices": (N, 3) float, "faces": (M, 3) int}
+#
+# Instancias (ver gen/instancing.py), claves opcionales:
+#   "def":       nombre DEF del prototipo; la geometría se escribe una vez
+#   "use":       nombre DEF a reutilizar (sin vertices/faces)
+#   "transform": {"translation": (x, y, z), "rotation": (ax, ay, az, ángulo)}
+#
+# merge_by_color() junta en una sola malla todo lo que comparte color (un
+# Shape / IndexedFaceSet por material en lugar de uno por objeto).
+
+CHUNK = 65536   # filas por bloque de formato (acota la memoria pico)
+
+MATERIAL = (
+    "      specularColor 0.5 0.5 0.5\n"
+    "      emissiveColor 0.0 0.0 0.0\n"
+    "      ambientIntensity 0.2\n"
+    "      transparency 0.0\n"
+    "      shininess 0.2\n"
+)
+
+
+def mesh_from_tessellation(name, color, tessellation):
+    """Convierte la salida de Shape.tessellate() en un dict de malla."""
+    verts, faces = tessellation[0], tessellation[1]
+    return {
+        "name": name,
+        "color": tuple(color),
+        "vertices": np.asarray(verts, dtype=np.float64).reshape(-1, 3),
+        "faces": np.asarray(faces, dtype=np.int64).reshape(-1, 3),
+    }
+
+
+def rotation_matrix(axis, angle):
+    """Matriz 3x3 de una rotación eje-ángulo (como el campo rotation de VRML)."""
+    axis = np.asarray(axis, dtype=np.float64)
+    norm = np.linalg.norm(axis)
+    if norm == 0 or angle == 0:
+        return np.eye(3)
+    x, y, z = axis / norm
+    K = np.array([[0, -z, y], [z, 0, -x], [-y, x, 0]])
+    return np.eye(3) + np.sin(angle) * K + (1 - np.cos(angle)) * K @ K
+
+
+def _world_vertices(m, geometry):
+    xf = m.get("transform")
+    if not xf:
+        return geometry["vertices"]
+    rot = xf["rotation"]
+    R = rotation_matrix(rot[:3], rot[3])
+    return geometry["vertices"] @ R.T + np.asarray(xf["translation"], dtype=np.float64)
+
+
+def merge_by_color(meshes, weld):
+    """Una malla por color: instancias expandidas, vértices soldados con 'weld'.
+
+    'weld(vertices, faces)' devuelve (vertices, faces) sin duplicados.
+    """
+    defs = {m["def"]: m for m in meshes if m.get("def")}
+    groups = {}
+    for m in meshes:
+        geometry = defs[m["use"]] if m.get("use") else m
+        if not len(geometry["faces"]):
+            continue
+        key = tuple(round(float(c), 3) for c in geometry["color"])
+        groups.setdefault(key, []).append((_world_vertices(m, geometry), geometry["faces"]))
+
+    merged = []
+    for color, parts in groups.items():
+        offsets = np.cumsum([0] + [len(v) for v, _ in parts[:-1]])
+        verts = np.concatenate([v for v, _ in parts])
+        faces = np.concatenate([f + o for (_, f), o in zip(parts, offsets)])
+        verts, faces = weld(verts, faces)
+        merged.append({
+            "name": "RGB_%.3f_%.3f_%.3f (%d objeto(s))" % (*color, len(parts)),
+            "color": color,
+            "vertices": verts,
+            "faces": faces,
+        })
+    return merged
+
+
+def def_name(name):
+    """Identificador válido para DEF/USE a partir de un nombre de objeto."""
+    ident = re.sub(r"[^A-Za-z0-9_]", "_", name)
+    return ident if ident and not ident[0].isdigit() else "_" + ident
+
+
+def _write_rows(f, fmt, arr):
+    """Escribe 'arr' fila a fila con 'fmt' formateando bloques completos."""
+    for start in range(0, len(arr), CHUNK):
+        block = arr[start:start + CHUNK]
+        f.write((fmt * len(block)) % tuple(block.ravel().tolist()))
+
+
+# -----------------------------
+#  VRML 2.0 (texto)
+# -----------------------------
+def write_vrml(f, meshes, digits=6):
+    """Escribe las mallas en el stream de texto 'f' como VRML 2.0."""
+    f.write("#VRML V2.0 utf8\n")
+    f.write("# Generated by FreeCAD for KiCad\n\n")
+
+    for m in meshes:
+        f.write(f"# Object: {m['name']}\n")
+
+        xf = m.get("transform")
+        if xf:
+            t, rot = xf["translation"], xf["rotation"]
+            f.write("Transform {\n")
+            f.write(f"  translation {t[0]:.6f} {t[1]:.6f} {t[2]:.6f}\n")
+            f.write(f"  rotation {rot[0]:.6f} {rot[1]:.6f} {rot[2]:.6f} {rot[3]:.6f}\n")
+            f.write("  children [\n")
+
+        if m.get("use"):
+            f.write(f"USE {m['use']}\n")
+        else:
+            _vrml_shape(f, m, digits)
+
+        if xf:
+            f.write("  ]\n")
+            f.write("}\n")
+        f.write("\n")
+
+
+def _vrml_shape(f, m, digits):
+    r, g, b = m["color"]
+    prefix = f"DEF {m['def']} " if m.get("def") else ""
+    f.write(prefix + "Shape {\n")
+    f.write("  appearance Appearance {\n")
+    f.write("    material Material {\n")
+    f.write(f"      diffuseColor {r:.3f} {g:.3f} {b:.3f}\n")
+    f.write(MATERIAL)
+    f.write("    }\n")
+    f.write("  }\n")
+    f.write("  geometry IndexedFaceSet {\n")
+
+    f.write("    coord Coordinate {\n")
+    f.write("      point [\n")
+    _write_rows(f, "        %%.%df %%.%df %%.%df,\n" % ((digits,) * 3), m["vertices"])
+    f.write("      ]\n")
+    f.write("    }\n")
+
+    f.write("    coordIndex [\n")
+    _write_rows(f, "      %d, %d, %d, -1,\n", m["faces"])
+    f.write("    ]\n")
+
+    f.write("    solid FALSE\n")
+    f.write("  }\n")
+    f.write("}\n")
+
+
+# -----------------------------
+#  X3D (XML, opcionalmente comprimido)
+# -----------------------------
+def write_x3d(f, meshes, digits=6):
+    """Escribe las mallas en el stream de texto 'f' como X3D (XML)."""
+    f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    f.write('<X3D profile="Interchange" version="3.3">\n')
+    f.write("  <Scene>\n")
+
+    for m in meshes:
+        xf = m.get("transform")
+        if xf:
+            t, rot = xf["translation"], xf["rotation"]
+            f.write(f'    <Transform translation="{t[0]:.6f} {t[1]:.6f} {t[2]:.6f}" '
+                    f'rotation="{rot[0]:.6f} {rot[1]:.6f} {rot[2]:.6f} {rot[3]:.6f}">\n')
+
+        if m.get("use"):
+            f.write(f"    <Shape USE={quoteattr(m['use'])}/>\n")
+        else:
+            _x3d_shape(f, m, digits)
+
+        if xf:
+            f.write("    </Transform>\n")
+
+    f.write("  </Scene>\n")
+    f.write("</X3D>\n")
+
+
+def _x3d_shape(f, m, digits):
+    r, g, b = m["color"]
+    f.write(f"    <Shape DEF={quoteattr(m.get('def') or m['name'])}>\n")
+    f.write("      <Appearance>\n")
+    f.write(f'        <Material diffuseColor="{r:.3f} {g:.3f} {b:.3f}" '
+            'specularColor="0.5 0.5 0.5" ambientIntensity="0.2" shininess="0.2"/>\n')
+    f.write("      </Appearance>\n")
+    f.write('      <IndexedTriangleSet solid="false" index="')
+    _write_rows(f, "%d %d %d ", m["faces"])
+    f.write('">\n')
+    f.write('        <Coordinate point="')
+    _write_rows(f, "%%.%df %%.%df %%.%df " % ((digits,) * 3), m["vertices"])
+    f.write('"/>\n')
+    f.write("      </IndexedTriangleSet>\n")
+    f.write("    </Shape>\n")
+
+
+FORMATS = {
+    # formato → (sufijo, escritor, comprimido)
+    "vrml": (".wrl", write_vrml, False),
+    "x3d":  (".x3d", write_x3d, False),
+    "x3dz": (".x3dz", write_x3d, True),
+}
+
+
+def write_meshes(path, meshes, fmt="vrml", digits=6):
+    """Escribe 'meshes' en 'path' con el formato pedido y devuelve la ruta final.
+
+    'digits' son los decimales de las coordenadas (menos si están cuantizadas).
+    """
+    suffix, writer, compressed = FORMATS[fmt]
+    path = path.with_suffix(suffix)
+    if compressed:
+        with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as f:
+            writer(f, meshes, digits)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            writer(f, meshes, digits)
+    return path
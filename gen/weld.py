@@ -0,0 +1,115 @@
+import math
+import os
+
+import numpy as np
+
+# -----------------------------
+#  Soldado de vértices después de teselar
+# -----------------------------
+# shape.tessellate() devuelve cada cara con sus propios vértices, así que
+# las costuras entre caras repiten puntos. weld() los une con una grilla
+# hash de celda WELD_TOL: los vértices de una misma celda se agrupan en
+# bloque (np.unique) y después cada celda se compara sólo con sus vecinas
+# para no separar puntos que caen a ambos lados de un borde de celda.
+# Luego se quitan los triángulos degenerados (índices repetidos o área
+# nula) y los vértices que quedaron sin usar.
+#
+# QUANTIZE=q (mm) redondea además las coordenadas a múltiplos de q; los
+# escritores de texto (WRL/X3D) imprimen entonces sólo los decimales útiles.
+#
+# WELD=1 lo activa en los exportadores (WRL, GLB y STL del módulo).
+
+WELD = os.environ.get("WELD", "") not in ("", "0")
+WELD_TOL = float(os.environ.get("WELD_TOL") or 1e-4)      # mm
+QUANTIZE = float(os.environ.get("QUANTIZE") or 0) or None  # mm
+
+# mitad de las 26 celdas vecinas: cada par de celdas se compara una vez
+_HALF_NEIGHBOURS = [(dx, dy, dz)
+                    for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+                    if (dx, dy, dz) > (0, 0, 0)]
+
+
+def digits_for(quantum):
+    """Decimales necesarios para escribir coordenadas cuantizadas a 'quantum'."""
+    if not quantum:
+        return 6
+    return max(0, min(6, math.ceil(-math.log10(quantum) - 1e-9)))
+
+
+def _cluster_cells(reps, cells, tol):
+    """Raíz de cada celda tras unir celdas vecinas con representantes a <= tol."""
+    index = {c: k for k, c in enumerate(map(tuple, cells.tolist()))}
+    parent = list(range(len(cells)))
+
+    def find(k):
+        while parent[k] != k:
+            parent[k] = parent[parent[k]]
+            k = parent[k]
+        return k
+
+    tol2 = tol * tol
+    for k, (x, y, z) in enumerate(cells.tolist()):
+        for dx, dy, dz in _HALF_NEIGHBOURS:
+            m = index.get((x + dx, y + dy, z + dz))
+            if m is None:
+                continue
+            d = reps[k] - reps[m]
+            if d @ d <= tol2:
+                a, b = find(k), find(m)
+                if a != b:
+                    parent[max(a, b)] = min(a, b)
+    return np.array([find(k) for k in range(len(cells))], dtype=np.int64)
+
+
+def weld(vertices, faces, tol=WELD_TOL, quantum=None):
+    """Devuelve (vertices, faces) soldados, sin degenerados ni vértices sueltos."""
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    if not len(vertices):
+        return vertices, faces
+
+    cells = np.floor(vertices / tol).astype(np.int64)
+    cells, first, inverse = np.unique(cells, axis=0, return_index=True, return_inverse=True)
+    roots = _cluster_cells(vertices[first], cells, tol)
+    _, root_first, root_id = np.unique(roots, return_index=True, return_inverse=True)
+
+    verts = vertices[first][root_first]
+    faces = root_id[inverse.reshape(-1)][faces]
+    if quantum:
+        verts = np.round(verts / quantum) * quantum + 0.0   # sin "-0"
+
+    # degenerados: índices repetidos o área nula (también tras cuantizar)
+    ok = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])
+    faces = faces[ok]
+    tri = verts[faces]
+    area2 = np.linalg.norm(np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0]), axis=1)
+    faces = faces[area2 > tol * tol]
+
+    used, remap = np.unique(faces, return_inverse=True)
+    return verts[used], remap.reshape(-1, 3)
+
+
+def weld_mesh(mesh, tol=WELD_TOL, quantum=QUANTIZE):
+    """Suelda un dict de malla (vrml_writer) en sitio y devuelve los conteos."""
+    before = (len(mesh["vertices"]), len(mesh["faces"]))
+    mesh["vertices"], mesh["faces"] = weld(mesh["vertices"], mesh["faces"], tol, quantum)
+    return {"name": mesh["name"], "vertices": (before[0], len(mesh["vertices"])),
+            "triangles": (before[1], len(mesh["faces"]))}
+
+
+def print_weld_stats(stats):
+    """Vértices/triángulos antes → después por objeto y total."""
+    print("  Soldado de vértices:")
+    tv = [0, 0]
+    tt = [0, 0]
+    for s in stats:
+        (v0, v1), (t0, t1) = s["vertices"], s["triangles"]
+        tv[0] += v0
+        tv[1] += v1
+        tt[0] += t0
+        tt[1] += t1
+        dropped = f", {t0 - t1} triángulo(s) degenerado(s)" if t0 != t1 else ""
+        print(f"    → {s['name']}: {v0} → {v1} vértices{dropped}")
+    if tv[0]:
+        print(f"    total: {tv[0]} → {tv[1]} vértices ({100 * (1 - tv[1] / tv[0]):.0f}% menos), "
+              f"{tt[0]} → {tt[1]} triángulos")
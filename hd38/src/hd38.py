@@ -1,7 +1,7 @@
 import FreeCAD as App
 import Part
-import Import
 import os
+import sys
 
 # ============================
 #   DETECTAR GUI
@@ -10,38 +10,84 @@ GUI = App.GuiUp
 if GUI:
     import FreeCADGui as Gui
 
-# ============================
-#   UTILIDAD: COLOR SEGURO
-# ============================
-def safe_color(obj, rgb):
-    if "Color" not in obj.PropertiesList:
-        obj.addProperty("App::PropertyColor", "Color", "Base", "Object color")
-    obj.Color = tuple(rgb)
-
-    if "DiffuseColor" not in obj.PropertiesList:
-        obj.addProperty("App::PropertyColorList", "DiffuseColor", "Base", "Face colors")
-    obj.DiffuseColor = [tuple(rgb)]
-
-    if GUI and hasattr(obj, "ViewObject"):
-        obj.ViewObject.ShapeColor = tuple(rgb)
-        obj.ViewObject.DiffuseColor = [tuple(rgb)]
-
 # ============================
 #   CONFIG GENERAL
 # ============================
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-BUILD_DIR = os.path.abspath(os.path.join(BASE_DIR, "..", "build"))
+# MODULE_BUILD_DIR: salida alternativa (variantes de gen/sweep.py)
+BUILD_DIR = os.environ.get("MODULE_BUILD_DIR") or os.path.abspath(os.path.join(BASE_DIR, "..", "build"))
 os.makedirs(BUILD_DIR, exist_ok=True)
 
+# Helpers compartidos (gen/)
+sys.path.insert(0, os.path.abspath(os.path.join(BASE_DIR, "..", "..", "gen")))
+from mesh_cache import TessCache, write_stl
+from profiling import timed, write_trace
+from colors import safe_color, save_colors
+from brep_bundle import write_bundle
+from board_spec import load_spec, header, header_positions
+from instancing import make_prototype, place
+from features import FeatureGraph, drilled_board, pad_ring, header_housing
+
 # ============================
 #   PARÁMETROS PCB HD-38
 # ============================
-L = 30.0
-A = 15.0
-E = 1.2
+# Placa y headers declarados en src/board.json (compartido con el footprint)
+SPEC = load_spec(BASE_DIR)
+L = SPEC["board"]["length"]
+A = SPEC["board"]["width"]
+E = SPEC["board"]["thickness"]
 
 pcb_color = (0.03, 0.03, 0.03)
 
+# ============================
+#   FEATURES
+# ============================
+# Cada builder recibe todas sus entradas como argumentos: la FeatureGraph
+# reutiliza su BREP de build/.features/ mientras esas entradas no cambien
+# (mover POT_X sólo rehace el potenciómetro y su "X").
+
+def build_pot_x(cx, cy, top_z, axle_r, slot_w, slot_l, depth):
+    """Volumen de la "X" del perillero: cavidad + dos ranuras cruzadas."""
+    z = top_z - depth
+    base_hole = Part.makeCylinder(axle_r, depth, App.Vector(cx, cy, z))
+    slot_ns = Part.makeBox(slot_l, slot_w, depth, App.Vector(cx - slot_l/2, cy - slot_w/2, z))
+    slot_ew = Part.makeBox(slot_w, slot_l, depth, App.Vector(cx - slot_w/2, cy - slot_l/2, z))
+    return base_hole.fuse(slot_ns).fuse(slot_ew)
+
+
+def build_pot(x, y, z, w, l, h, x_cut):
+    """Cuerpo del potenciómetro con la "X" tallada arriba."""
+    return Part.makeBox(w, l, h, App.Vector(x, y, z)).cut(x_cut)
+
+
+def build_fill(x_cut, z, thick):
+    """Lámina fina en el fondo de la "X" (relleno blanco)."""
+    return x_cut.common(Part.makeBox(100, 100, thick, App.Vector(0, 0, z)))
+
+
+def build_l_pin(thick, vertical, horizontal):
+    """Pin en L: tramo vertical y tramo horizontal hacia +X (origen en la base)."""
+    v = Part.makeBox(thick, thick, vertical)
+    h = Part.makeBox(horizontal, thick, thick, App.Vector(thick - 0.65, 0, vertical - thick/2))
+    return v.fuse(h)
+
+
+def build_jst_xh(x, y, z, l, w, h, wall, slot_w, slot_h, slot_d):
+    """Housing JST-XH con cavidad, boca hacia +X y pestañas laterales."""
+    body = Part.makeBox(l, w, h, App.Vector(x, y, z))
+    # cavidad interna (vacío que se abre hacia +X)
+    inner = Part.makeBox(l - wall, w - 2*wall, h - 1.2, App.Vector(x + wall, y + wall, z + 1.2))
+    # boca frontal (abierta hacia los pines)
+    slot = Part.makeBox(slot_d, slot_w, slot_h,
+                        App.Vector(x + l - slot_d, y + (w - slot_w)/2, z + (h - slot_h)/2))
+    # pestañas laterales (izquierda/derecha en Y)
+    tab_left = Part.makeBox(1.0, 1.6, 2.0, App.Vector(x + 2.0, y - 1.6, z + 2.0))
+    tab_right = Part.makeBox(1.0, 1.6, 2.0, App.Vector(x + 2.0, y + w, z + 2.0))
+    return body.cut(inner).cut(slot).fuse(tab_left).fuse(tab_right)
+
+
+graph = FeatureGraph(BUILD_DIR)
+
 # ============================
 #   DOCUMENTO
 # ============================
@@ -50,24 +96,25 @@ DOC = App.newDocument("HD38_PCB")
 # ============================
 #   PCB BASE
 # ============================
-pcb = Part.makeBox(L, A, E)
+# la shape (con todos los taladros) se asigna más abajo, cuando se conocen
 pcb_obj = DOC.addObject("Part::Feature", "PCB")
-pcb_obj.Shape = pcb
 safe_color(pcb_obj, pcb_color)
 
 # ============================
 #   PINES PRINCIPALES
 # ============================
-PIN_NAMES = ["+", "-", "DO", "AO"]
+HEADER = header(SPEC, "main")
+PIN_NAMES = HEADER["names"]
 N_PINS = len(PIN_NAMES)
 
 PIN_SIZE = 0.64
 PIN_LEN  = 11.0
-PIN_PITCH = 2.54
+PIN_PITCH = HEADER["pitch"]
 
-EDGE_X = 3
+PIN_XY = header_positions(SPEC, HEADER)
+EDGE_X = HEADER["at"]
 GROUP_LEN = (N_PINS - 1) * PIN_PITCH
-py0 = (A - GROUP_LEN) / 2
+py0 = PIN_XY[0][1]
 
 pinmeta = DOC.addObject("App::FeaturePython", "PinMeta")
 pinmeta.addProperty("App::PropertyStringList", "Names", "Pinout", "Pin names")
@@ -76,16 +123,11 @@ pinmeta.Names = PIN_NAMES
 # ============================
 #   HOLES
 # ============================
-HOLE_DIAM = 0.9
+HOLE_DIAM = HEADER["drill"]
 HOLE_R = HOLE_DIAM / 2
 
-hole_shapes = []
-for i in range(N_PINS):
-    cx = EDGE_X
-    cy = py0 + i * PIN_PITCH
-    h = Part.makeCylinder(HOLE_R, E)
-    h.translate(App.Vector(cx, cy, 0))
-    pcb_obj.Shape = pcb_obj.Shape.cut(h)
+# Se recolectan todos los agujeros y se cortan al final en un solo boolean
+drills = [(cx, cy, HOLE_DIAM) for cx, cy in PIN_XY]
 
 # ============================
 #   PADS
@@ -95,22 +137,25 @@ PAD_R = PAD_OD / 2
 PAD_H = 0.05
 INNER_R = HOLE_R
 
+# anillo prototipo (centrado en el origen); cada pad es una instancia
+ring = graph.build("Pad", pad_ring, r_out=PAD_R, r_in=INNER_R, h=PAD_H)
+
+pad_proto = make_prototype(DOC, "Pad_Proto", ring)
+safe_color(pad_proto, (0.80, 0.75, 0.65))
+
 for i in range(N_PINS):
     cx = EDGE_X
     cy = py0 + i * PIN_PITCH
 
-    o = Part.makeCylinder(PAD_R, PAD_H)
-    ii = Part.makeCylinder(INNER_R, PAD_H)
-    ring = o.cut(ii)
-    ring.translate(App.Vector(cx, cy, E))
-
-    pad = DOC.addObject("Part::Feature", f"Pad_{PIN_NAMES[i]}")
-    pad.Shape = ring
-    safe_color(pad, (0.80, 0.75, 0.65))
+    place(DOC, pad_proto, f"Pad_{PIN_NAMES[i]}", App.Vector(cx, cy, E))
 
 # ============================
 #   PINES 3D (rectos)
 # ============================
+# sin dimensiones negativas
+pin_proto = make_prototype(DOC, "Pin_Proto", Part.makeBox(PIN_SIZE, PIN_SIZE, PIN_LEN))
+safe_color(pin_proto, (0.9, 0.85, 0.3))
+
 for i in range(N_PINS):
     hx = EDGE_X
     hy = py0 + i * PIN_PITCH
@@ -119,13 +164,7 @@ for i in range(N_PINS):
     py = hy - PIN_SIZE / 2
     pz = -(PIN_LEN - E - 1.5)
 
-    # sin dimensiones negativas
-    pin = Part.makeBox(PIN_SIZE, PIN_SIZE, PIN_LEN)
-    pin.translate(App.Vector(px, py, pz))
-
-    po = DOC.addObject("Part::Feature", f"Pin_{PIN_NAMES[i]}")
-    po.Shape = pin
-    safe_color(po, (0.9, 0.85, 0.3))
+    po = place(DOC, pin_proto, f"Pin_{PIN_NAMES[i]}", App.Vector(px, py, pz))
 
     po.addProperty("App::PropertyString", "PinName", "PinData", "Pin name")
     po.PinName = PIN_NAMES[i]
@@ -137,24 +176,14 @@ HOUSING_W = 2
 HOUSING_H = 2
 HOUSING_MARGIN = 0.6
 WING_EXTRA = 0.4
-WING_THICK = HOUSING_W
-WING_HEIGHT = HOUSING_H
 
 housing_len = GROUP_LEN + HOUSING_MARGIN
 housing_y = py0 + GROUP_LEN/2 - housing_len/2
 housing_x = EDGE_X - HOUSING_W/2
 housing_z = -HOUSING_H
 
-main = Part.makeBox(HOUSING_W, housing_len, HOUSING_H)
-main.translate(App.Vector(housing_x, housing_y, housing_z))
-
-w1 = Part.makeBox(WING_THICK, WING_EXTRA, WING_HEIGHT)
-w1.translate(App.Vector(housing_x, housing_y - WING_EXTRA, housing_z))
-
-w2 = Part.makeBox(WING_THICK, WING_EXTRA, WING_HEIGHT)
-w2.translate(App.Vector(housing_x, housing_y + housing_len, housing_z))
-
-hshape = main.fuse(w1).fuse(w2)
+hshape = graph.build("HeaderHousing", header_housing, x=housing_x, y=housing_y, z=housing_z,
+                     length=housing_len, w=HOUSING_W, h=HOUSING_H, wing=WING_EXTRA, axis="y")
 
 hobj = DOC.addObject("Part::Feature", "HeaderHousing")
 hobj.Shape = hshape
@@ -170,9 +199,7 @@ pin_center_y = py0 + GROUP_LEN / 2
 MH_X = EDGE_X + 5.0
 MH_Y = pin_center_y
 
-mh = Part.makeCylinder(MH_R, E)
-mh.translate(App.Vector(MH_X, MH_Y, 0))
-pcb_obj.Shape = pcb_obj.Shape.cut(mh)
+drills.append((MH_X, MH_Y, MH_DIAM))
 
 # ============================
 #   POTENCIOMETRO
@@ -185,13 +212,6 @@ POT_X = MH_X + 6.5
 POT_Y = MH_Y - POT_L/2 - 2.5
 POT_Z = E
 
-p = Part.makeBox(POT_W, POT_L, POT_H)
-p.translate(App.Vector(POT_X, POT_Y, POT_Z))
-
-pobj = DOC.addObject("Part::Feature", "Potentiometer")
-pobj.Shape = p
-safe_color(pobj, (0.15, 0.80, 0.85))
-
 # ============================
 #   "X" DEL PERILLERO
 # ============================
@@ -211,41 +231,24 @@ SLOT_D = AXLE_DEPTH
 # cara superior del pot
 top_z = POT_Z + POT_H
 
-# cilindro de la cavidad
-base_hole = Part.makeCylinder(AXLE_R, SLOT_D)
-base_hole.translate(App.Vector(cx, cy, top_z - SLOT_D))
-
-# ranura vertical
-slot_ns = Part.makeBox(SLOT_L, SLOT_W, SLOT_D)
-slot_ns.translate(App.Vector(cx - SLOT_L/2, cy - SLOT_W/2, top_z - SLOT_D))
+# cavidad + ranuras vertical y horizontal
+x_cut = graph.build("PotX", build_pot_x, cx=cx, cy=cy, top_z=top_z, axle_r=AXLE_R,
+                    slot_w=SLOT_W, slot_l=SLOT_L, depth=SLOT_D)
 
-# ranura horizontal
-slot_ew = Part.makeBox(SLOT_W, SLOT_L, SLOT_D)
-slot_ew.translate(App.Vector(cx - SLOT_W/2, cy - SLOT_L/2, top_z - SLOT_D))
-
-# unión y corte
-x_cut = base_hole.fuse(slot_ns).fuse(slot_ew)
-pobj.Shape = pobj.Shape.cut(x_cut)
+# cuerpo con la "X" tallada (depende de PotX por su clave)
+pobj = DOC.addObject("Part::Feature", "Potentiometer")
+pobj.Shape = graph.build("Potentiometer", build_pot, x=POT_X, y=POT_Y, z=POT_Z,
+                         w=POT_W, l=POT_L, h=POT_H, x_cut=x_cut)
+safe_color(pobj, (0.15, 0.80, 0.85))
 pobj.purgeTouched()
 
 # ============================
 #   COLOR BLANCO PARA LA "X" (relleno superficial)
 # ============================
 
-# Hacemos una copia del volumen de corte
-fill = x_cut.copy()
-
-# Lo limitamos a una lámina muy fina (0.25 mm) en la base del hueco
-# Usa el plano Z del fondo del corte
-fill = fill.common(
-    Part.makeBox(
-        100, 100, 0.25,
-        App.Vector(0, 0, top_z - SLOT_D)   # superficie del hueco
-    )
-)
-
+# Lámina muy fina (0.25 mm) en la base del hueco (plano Z del fondo del corte)
 fill_obj = DOC.addObject("Part::Feature", "X_Fill")
-fill_obj.Shape = fill
+fill_obj.Shape = graph.build("X_Fill", build_fill, x_cut=x_cut, z=top_z - SLOT_D, thick=0.25)
 safe_color(fill_obj, (1.0, 1.0, 1.0))  # blanco
 
 
@@ -258,55 +261,41 @@ L_HORIZONTAL = 6        # cuánto sobresale hacia adelante
 # ============================
 #   PUERTO SUPERIOR (SONDA) – HOLES, PADS, PINES EN L
 # ============================
-SONDA_PINS = 2
-SONDA_PITCH = 2.54
-s_px = L - 2.0
-s_group = (SONDA_PINS - 1) * SONDA_PITCH
-s_py0 = (A - s_group) / 2
+SONDA = header(SPEC, "sonda")
+SONDA_XY = header_positions(SPEC, SONDA)
+SONDA_PINS = len(SONDA_XY)
+SONDA_PITCH = SONDA["pitch"]
+s_px = SONDA_XY[0][0]
+s_py0 = SONDA_XY[0][1]
 
 # --- holes ---
-for i in range(SONDA_PINS):
-    cy = s_py0 + i * SONDA_PITCH
-    h = Part.makeCylinder(HOLE_R, E)
-    h.translate(App.Vector(s_px, cy, 0))
-    pcb_obj.Shape = pcb_obj.Shape.cut(h)
+drills += [(x, cy, SONDA["drill"]) for x, cy in SONDA_XY]
+
+# --- corte único de todos los agujeros de la PCB ---
+pcb_obj.Shape = graph.build("PCB", drilled_board, L=L, A=A, E=E, drills=drills)
+
+# --- prototipos: mismo anillo (otro tono) y pin en L construido una vez ---
+sonda_pad_proto = make_prototype(DOC, "SondaPad_Proto", ring.copy())
+safe_color(sonda_pad_proto, (0.82, 0.78, 0.66))
+
+# vertical hacia arriba (origen en la esquina inferior del pin) + horizontal
+l_pin = graph.build("SondaPin", build_l_pin, thick=L_PIN_THICK, vertical=L_VERTICAL,
+                    horizontal=L_HORIZONTAL)
+sonda_pin_proto = make_prototype(DOC, "SondaPin_Proto", l_pin)
+safe_color(sonda_pin_proto, (0.92, 0.86, 0.32))
 
 # --- pads ---
 for i in range(SONDA_PINS):
     cy = s_py0 + i * SONDA_PITCH
 
-    o = Part.makeCylinder(PAD_R, PAD_H)
-    ii = Part.makeCylinder(INNER_R, PAD_H)
-    ring = o.cut(ii)
-    ring.translate(App.Vector(s_px, cy, E))
-
-    pad = DOC.addObject("Part::Feature", f"SondaPad_{i+1}")
-    pad.Shape = ring
-    safe_color(pad, (0.82, 0.78, 0.66))
+    place(DOC, sonda_pad_proto, f"SondaPad_{i+1}", App.Vector(s_px, cy, E))
 
 # --- pins en L (sin dimensiones negativas)
-    # vertical hacia arriba
     vx = s_px - L_PIN_THICK/2
     vy = cy - L_PIN_THICK/2
     vz = E - 3   # partir desde la superficie del PCB
 
-    v = Part.makeBox(L_PIN_THICK, L_PIN_THICK, L_VERTICAL)
-    v.translate(App.Vector(vx, vy, vz))
-
-    # horizontal hacia la derecha (en la parte alta)
-    hx = vx + L_PIN_THICK - 0.65
-    hy = vy
-    hz = vz + L_VERTICAL - L_PIN_THICK/2
-
-    h = Part.makeBox(L_HORIZONTAL, L_PIN_THICK, L_PIN_THICK)
-    h.translate(App.Vector(hx, hy, hz))
-
-
-    bent = v.fuse(h)
-
-    pin = DOC.addObject("Part::Feature", f"SondaPin_{i+1}")
-    pin.Shape = bent
-    safe_color(pin, (0.92, 0.86, 0.32))
+    place(DOC, sonda_pin_proto, f"SondaPin_{i+1}", App.Vector(vx, vy, vz))
 
 # ============================
 #   JST-XH HEMBRA 2P – HOUSING (orientado a los pines L)
@@ -326,57 +315,8 @@ xh_x = s_px + L_HORIZONTAL - 5.65    # pega a los pines L
 xh_y = s_py0 - (XH_W/2) + (SONDA_PITCH/2)
 xh_z = E
 
-# Cuerpo
-xh_body = Part.makeBox(XH_L, XH_W, XH_H)
-xh_body.translate(App.Vector(xh_x, xh_y, xh_z))
-
-# Cavidad interna (vacío que se abre hacia +X)
-inner = Part.makeBox(
-    XH_L - XH_WALL,
-    XH_W - 2*XH_WALL,
-    XH_H - 1.2
-)
-inner.translate(App.Vector(
-    xh_x + XH_WALL,        # cavidad abre hacia adelante (+X)
-    xh_y + XH_WALL,
-    xh_z + 1.2
-))
-
-# Boca frontal (abierta hacia los pines)
-slot = Part.makeBox(
-    XH_SLOT_D,
-    XH_SLOT_W,
-    XH_SLOT_H
-)
-slot.translate(App.Vector(
-    xh_x + XH_L - XH_SLOT_D,
-    xh_y + (XH_W - XH_SLOT_W)/2,
-    xh_z + (XH_H - XH_SLOT_H)/2
-))
-
-# Pestañas laterales (izquierda/derecha en Y)
-tab_left = Part.makeBox(1.0, 1.6, 2.0)
-tab_left.translate(App.Vector(
-    xh_x + 2.0,
-    xh_y - 1.6,
-    xh_z + 2.0
-))
-
-tab_right = Part.makeBox(1.0, 1.6, 2.0)
-tab_right.translate(App.Vector(
-    xh_x + 2.0,
-    xh_y + XH_W,
-    xh_z + 2.0
-))
-
-# Unión final
-xh_final = (
-    xh_body
-    .cut(inner)   # cavidad interna
-    .cut(slot)    # boca frontal
-    .fuse(tab_left)
-    .fuse(tab_right)
-)
+xh_final = graph.build("JST_XH_2P", build_jst_xh, x=xh_x, y=xh_y, z=xh_z, l=XH_L, w=XH_W,
+                       h=XH_H, wall=XH_WALL, slot_w=XH_SLOT_W, slot_h=XH_SLOT_H, slot_d=XH_SLOT_D)
 
 xh_obj = DOC.addObject("Part::Feature", "JST_XH_2P")
 xh_obj.Shape = xh_final
@@ -386,7 +326,7 @@ safe_color(xh_obj, (0.92, 0.92, 0.92))
 # ============================
 #   RECOMPUTE
 # ============================
-DOC.recompute()
+timed("recompute", DOC.Name, DOC.recompute)
 
 # ============================
 #   EXPORT
@@ -394,10 +334,14 @@ DOC.recompute()
 fcstd_path = os.path.join(BUILD_DIR, "hd38.FCStd")
 stl_path  = os.path.join(BUILD_DIR, "hd38.stl")
 
-DOC.saveAs(fcstd_path)
-Import.export([pcb_obj], stl_path)
+timed("saveAs", os.path.basename(fcstd_path), DOC.saveAs, fcstd_path)
+save_colors(DOC, fcstd_path)
+write_bundle(DOC, fcstd_path)
+write_stl(stl_path, [pcb_obj], TessCache.beside(fcstd_path))
+write_trace("hd38", BUILD_DIR)
 
 print("✔ HD-38 v1.1 generada:")
+print("   Features:", graph.summary())
 print("   FCStd:", fcstd_path)
 print("   STL :", stl_path)
 
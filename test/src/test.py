@@ -1,13 +1,17 @@
 import FreeCAD as App
 import Part
-import Import
 import os
+import sys
 
 # === Resolver rutas ===
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 BUILD_DIR = os.path.abspath(os.path.join(BASE_DIR, "..", "build"))
 os.makedirs(BUILD_DIR, exist_ok=True)
 
+# Helpers compartidos (gen/)
+sys.path.insert(0, os.path.abspath(os.path.join(BASE_DIR, "..", "..", "gen")))
+from mesh_cache import TessCache, write_stl
+
 # --- Crear documento ---
 doc = App.newDocument("TestCLI")
 
@@ -34,6 +38,6 @@ doc.saveAs(fcstd_path)
 # --- Exportar STL ---
 stl_path = os.path.join(BUILD_DIR, "cubo.stl")
 print("Exportando STL en:", stl_path)
-Import.export([obj], stl_path)
+write_stl(stl_path, [obj], TessCache.beside(fcstd_path))
 
 print("✔ Completado correctamente.")
@@ -1,9 +1,7 @@
 import FreeCAD as App
 import Part
-import Import
 import os
-
-import Draft
+import sys
 
 
 # ============================
@@ -15,57 +13,84 @@ if GUI:
     import FreeCADGui as Gui
 
 # --------------------------------------
-# COLOR SEGURO
+# PATHS
 # --------------------------------------
-def safe_color(obj, rgb):
-    if "Color" not in obj.PropertiesList:
-        obj.addProperty("App::PropertyColor", "Color", "Base", "Object color")
-    obj.Color = tuple(rgb)
-
-    if "DiffuseColor" not in obj.PropertiesList:
-        obj.addProperty("App::PropertyColorList", "DiffuseColor", "Base", "Face colors")
-    obj.DiffuseColor = [tuple(rgb)]
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# MODULE_BUILD_DIR: salida alternativa (variantes de gen/sweep.py)
+BUILD_DIR = os.environ.get("MODULE_BUILD_DIR") or os.path.abspath(os.path.join(BASE_DIR, "..", "build"))
+os.makedirs(BUILD_DIR, exist_ok=True)
 
-    if GUI and hasattr(obj, "ViewObject"):
-        obj.ViewObject.ShapeColor = tuple(rgb)
-        obj.ViewObject.DiffuseColor = [tuple(rgb)]
+# Helpers compartidos (gen/)
+sys.path.insert(0, os.path.abspath(os.path.join(BASE_DIR, "..", "..", "gen")))
+from boolean_cut import HoleSet
+from mesh_cache import TessCache, write_stl
+from profiling import span, timed, write_trace
+from colors import safe_color, save_colors
+from brep_bundle import write_bundle
+from board_spec import load_spec, header, header_positions
+from features import FeatureGraph, drilled_board, pad_ring, label_block
+from labels import font_hash
+from instancing import make_prototype, place
 
 # --------------------------------------
-# PATHS
+# FEATURES
 # --------------------------------------
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-BUILD_DIR = os.path.abspath(os.path.join(BASE_DIR, "..", "build"))
-os.makedirs(BUILD_DIR, exist_ok=True)
+# Cada builder recibe todas sus entradas como argumentos: la FeatureGraph
+# reutiliza su BREP de build/.features/ mientras esas entradas no cambien.
+
+def build_usb(pos, size, cavity, windows, window_z, window_h):
+    """Blindaje del USB-A: caja, cavidad frontal y ventanas superiores."""
+    usblen, usbw, usbh = size
+    cav_len, cav_w, cav_h = cavity
+    base = App.Vector(*pos)
+
+    usb_solid = Part.makeBox(usblen, usbw, usbh, base)
+
+    # coordenadas relativas dentro del USB: la cavidad empieza en la boca (X+)
+    offset = App.Vector(usblen - cav_len, (usbw - cav_w) / 2, (usbh - cav_h) / 2)
+    usb_final = usb_solid.cut(Part.makeBox(cav_len, cav_w, cav_h, base + offset))
+
+    # ventanas (x, y, largo, ancho) cortadas en un solo boolean
+    holes = HoleSet(window_h, z=window_z)
+    for x, y, length, width in windows:
+        holes.slot(x, y, length, width)
+    return holes.cut(usb_final)
+
+
+graph = FeatureGraph(BUILD_DIR)
 
 # --------------------------------------
 # PCB
 # --------------------------------------
-L = 30.0
-A = 15.0
-E = 1.6
+# Placa y headers declarados en src/board.json (compartido con el footprint)
+SPEC = load_spec(BASE_DIR)
+L = SPEC["board"]["length"]
+A = SPEC["board"]["width"]
+E = SPEC["board"]["thickness"]
 pcb_color = (0.03, 0.03, 0.03)
 
 DOC = App.newDocument("USB_TTL_BASE")
 
-pcb = Part.makeBox(L, A, E)
+# la shape (con los agujeros pasantes) se asigna tras colocar los pines
 pcb_obj = DOC.addObject("Part::Feature", "PCB")
-pcb_obj.Shape = pcb
 safe_color(pcb_obj, pcb_color)
 
 # --------------------------------------
 # HEADER DE 6 PINES
 # --------------------------------------
-PIN_NAMES = ["VCC", "GND", "TX", "RX", "RTS", "DTR"]
+HEADER = header(SPEC, "main")
+PIN_NAMES = HEADER["names"]
 N_PINS = len(PIN_NAMES)
 
 PIN_SIZE = 0.64
 PIN_LEN  = 11.0
-PIN_PITCH = 2.00
-EDGE_X = 3.0
+PIN_PITCH = HEADER["pitch"]
+PIN_XY = header_positions(SPEC, HEADER)
+EDGE_X = HEADER["at"]
 GROUP_LEN = (N_PINS - 1) * PIN_PITCH
-py0 = (A - GROUP_LEN) / 2
+py0 = PIN_XY[0][1]
 
-HOLE_DIAM = 0.9
+HOLE_DIAM = HEADER["drill"]
 HOLE_R = HOLE_DIAM / 2
 PAD_OD = 1.6
 PAD_R = PAD_OD / 2
@@ -76,40 +101,35 @@ pinmeta = DOC.addObject("App::FeaturePython", "PinMeta")
 pinmeta.addProperty("App::PropertyStringList", "Names", "Pinout", "Pin names")
 pinmeta.Names = PIN_NAMES
 
-# --- holes + pads + pins ---
-for i in range(N_PINS):
-    cx = EDGE_X
-    cy = py0 + i * PIN_PITCH
+# --- prototipos: anillo y pin se construyen una vez y se instancian ---
+ring = graph.build("Pad", pad_ring, r_out=PAD_R, r_in=INNER_R, h=PAD_H)
+pad_proto = make_prototype(DOC, "Pad_Proto", ring)
+safe_color(pad_proto, (0.80, 0.75, 0.65))
 
-    # agujero pasante
-    h = Part.makeCylinder(HOLE_R, E)
-    h.translate(App.Vector(cx, cy, 0))
-    pcb_obj.Shape = pcb_obj.Shape.cut(h)
+pin_proto = make_prototype(DOC, "Pin_Proto", Part.makeBox(PIN_SIZE, PIN_SIZE, PIN_LEN))
+safe_color(pin_proto, (0.90, 0.85, 0.30))
 
-    # pad superior
-    outer = Part.makeCylinder(PAD_R, PAD_H)
-    inner = Part.makeCylinder(INNER_R, PAD_H)
-    ring = outer.cut(inner)
-    ring.translate(App.Vector(cx, cy, E))
+# --- holes + pads + pins ---
+drills = []
+for i, (cx, cy) in enumerate(PIN_XY):
+    # agujero pasante (se corta al terminar el bucle)
+    drills.append((cx, cy, HOLE_DIAM))
 
-    pad = DOC.addObject("Part::Feature", f"Pad_{PIN_NAMES[i]}")
-    pad.Shape = ring
-    safe_color(pad, (0.80, 0.75, 0.65))
+    # pad superior
+    place(DOC, pad_proto, f"Pad_{PIN_NAMES[i]}", App.Vector(cx, cy, E))
 
     # pin box
     px = cx - PIN_SIZE/2
     py = cy - PIN_SIZE/2
     pz = -(PIN_LEN - E - 1.5)
 
-    pin = Part.makeBox(PIN_SIZE, PIN_SIZE, PIN_LEN)
-    pin.translate(App.Vector(px, py, pz))
-
-    po = DOC.addObject("Part::Feature", f"Pin_{PIN_NAMES[i]}")
-    po.Shape = pin
-    safe_color(po, (0.90, 0.85, 0.30))
+    po = place(DOC, pin_proto, f"Pin_{PIN_NAMES[i]}", App.Vector(px, py, pz))
     po.addProperty("App::PropertyString", "PinName", "PinData", "Pin name")
     po.PinName = PIN_NAMES[i]
 
+# corte único de todos los agujeros pasantes
+pcb_obj.Shape = graph.build("PCB", drilled_board, L=L, A=A, E=E, drills=drills)
+
 # --------------------------------------
 # USB-A MALE (cavidad en el frente correcto)
 # --------------------------------------
@@ -117,28 +137,15 @@ for i in range(N_PINS):
 usblen, usbw, usbh = 19, 11, 4
 usb_pos = App.Vector(24, 2, 1.6)
 
-# Sólido del USB
-usb_solid = Part.makeBox(usblen, usbw, usbh)
-usb_solid.translate(usb_pos)
-
 # CAVIDAD: parte desde la cara frontal (X = usb_pos.x + usblen)
 cav_len = 12      # profundidad hacia adentro
 cav_w   = 10.9       # ancho
 cav_h   = 3.8     # alto
 
-# coordenadas relativas dentro del USB
-cav_x = usblen - cav_len            # empieza en la boca (lado X+)
-cav_y = (usbw - cav_w) / 2
-cav_z = (usbh - cav_h) / 2
-
-cavity = Part.makeBox(cav_len, cav_w, cav_h)
-cavity.translate(usb_pos + App.Vector(cav_x, cav_y, cav_z))
-
-# aplicar corte
-usb_final = usb_solid.cut(cavity)
+usb_cavity = (cav_len, cav_w, cav_h)
 
+# la shape (cavidad + ventanas) se asigna en HOLES SUPERIORES
 usb = DOC.addObject("Part::Feature", "USB_A_Male")
-usb.Shape = usb_final
 safe_color(usb, (0.8,0.8,0.85))
 
 # --------------------------------------
@@ -211,26 +218,16 @@ ih_x = 12     # desplazar o ajustar según tu insulator
 # centrado en ancho del USB
 ih_y_center = usbw / 2 
 
-# coordenadas de cada hole
-# primer hole
-h1 = Part.makeBox(ih_len, ih_w, ih_h)
-h1.translate(usb_pos + App.Vector(
-    ih_x,
-    ih_y_center - ih_w - ih_gap/2,
-    usbh - ih_h - 0.2 + 2  # justo sobre la chapa superior
-))
-
-# segundo hole
-h2 = Part.makeBox(ih_len, ih_w, ih_h)
-h2.translate(usb_pos + App.Vector(
-    ih_x,
-    ih_y_center + ih_gap/2,
-    usbh - ih_h - 0.2 + 2
-))
+# coordenadas de cada hole: primero y segundo
+windows = [
+    (usb_pos.x + ih_x, usb_pos.y + ih_y_center - ih_w - ih_gap/2, ih_len, ih_w),
+    (usb_pos.x + ih_x, usb_pos.y + ih_y_center + ih_gap/2, ih_len, ih_w),
+]
 
-# cortar del blindaje
-usb.Shape = usb.Shape.cut(h1)
-usb.Shape = usb.Shape.cut(h2)
+# blindaje con cavidad y ventanas (justo sobre la chapa superior)
+usb.Shape = graph.build("USB_A_Male", build_usb, pos=usb_pos, size=(usblen, usbw, usbh),
+                        cavity=usb_cavity, windows=windows,
+                        window_z=usb_pos.z + usbh - ih_h - 0.2 + 2, window_h=ih_h)
 
 
 # --------------------------------------
@@ -270,92 +267,82 @@ pin_index = 1
 # Offset interno para centrar pads
 side_inner_offset = (chip_size - ((pins_per_side - 1) * pitch)) / 2
 
+# pines de los lados X e Y: un prototipo por orientación
+qfn_x_proto = make_prototype(DOC, "QFN_PinX_Proto", Part.makeBox(pin_len, pin_w, pin_h))
+safe_color(qfn_x_proto, (0.85, 0.82, 0.55))
+qfn_y_proto = make_prototype(DOC, "QFN_PinY_Proto", Part.makeBox(pin_w, pin_len, pin_h))
+safe_color(qfn_y_proto, (0.85, 0.82, 0.55))
+
 # ------------------------------
 # LADO +X
 # ------------------------------
-for i in range(pins_per_side):
-    px = chip_x + chip_size
-    py = chip_y + side_inner_offset + i*pitch - pin_w/2
-    pz = chip_z
-
-    pin = Part.makeBox(pin_len, pin_w, pin_h)
-    pin.translate(App.Vector(px, py, pz))
+with span("qfn_pins", "+X"):
+    for i in range(pins_per_side):
+        px = chip_x + chip_size
+        py = chip_y + side_inner_offset + i*pitch - pin_w/2
+        pz = chip_z
 
-    obj = DOC.addObject("Part::Feature", f"QFN_Pin_{pin_index}")
-    obj.Shape = pin
-    safe_color(obj, (0.85, 0.82, 0.55))
+        obj = place(DOC, qfn_x_proto, f"QFN_Pin_{pin_index}", App.Vector(px, py, pz))
 
-    obj.addProperty("App::PropertyString", "PinName", "PinData", "QFN Pin")
-    obj.PinName = f"P{pin_index}"
+        obj.addProperty("App::PropertyString", "PinName", "PinData", "QFN Pin")
+        obj.PinName = f"P{pin_index}"
 
-    pins_objs.append(obj)
-    pin_index += 1
+        pins_objs.append(obj)
+        pin_index += 1
 
 
 # ------------------------------
 # LADO -X
 # ------------------------------
-for i in range(pins_per_side):
-    px = chip_x - pin_len
-    py = chip_y + side_inner_offset + i*pitch - pin_w/2
-    pz = chip_z
+with span("qfn_pins", "-X"):
+    for i in range(pins_per_side):
+        px = chip_x - pin_len
+        py = chip_y + side_inner_offset + i*pitch - pin_w/2
+        pz = chip_z
 
-    pin = Part.makeBox(pin_len, pin_w, pin_h)
-    pin.translate(App.Vector(px, py, pz))
+        obj = place(DOC, qfn_x_proto, f"QFN_Pin_{pin_index}", App.Vector(px, py, pz))
 
-    obj = DOC.addObject("Part::Feature", f"QFN_Pin_{pin_index}")
-    obj.Shape = pin
-    safe_color(obj, (0.85, 0.82, 0.55))
+        obj.addProperty("App::PropertyString", "PinName", "PinData", "QFN Pin")
+        obj.PinName = f"P{pin_index}"
 
-    obj.addProperty("App::PropertyString", "PinName", "PinData", "QFN Pin")
-    obj.PinName = f"P{pin_index}"
-
-    pins_objs.append(obj)
-    pin_index += 1
+        pins_objs.append(obj)
+        pin_index += 1
 
 
 # ------------------------------
 # LADO +Y
 # ------------------------------
-for i in range(pins_per_side):
-    px = chip_x + side_inner_offset + i*pitch - pin_w/2
-    py = chip_y + chip_size
-    pz = chip_z
-
-    pin = Part.makeBox(pin_w, pin_len, pin_h)
-    pin.translate(App.Vector(px, py, pz))
+with span("qfn_pins", "+Y"):
+    for i in range(pins_per_side):
+        px = chip_x + side_inner_offset + i*pitch - pin_w/2
+        py = chip_y + chip_size
+        pz = chip_z
 
-    obj = DOC.addObject("Part::Feature", f"QFN_Pin_{pin_index}")
-    obj.Shape = pin
-    safe_color(obj, (0.85, 0.82, 0.55))
+        obj = place(DOC, qfn_y_proto, f"QFN_Pin_{pin_index}", App.Vector(px, py, pz))
 
-    obj.addProperty("App::PropertyString", "PinName", "PinData", "QFN Pin")
-    obj.PinName = f"P{pin_index}"
+        obj.addProperty("App::PropertyString", "PinName", "PinData", "QFN Pin")
+        obj.PinName = f"P{pin_index}"
 
-    pins_objs.append(obj)
-    pin_index += 1
+        pins_objs.append(obj)
+        pin_index += 1
 
 
 # ------------------------------
 # LADO -Y
 # ------------------------------
-for i in range(pins_per_side):
-    px = chip_x + side_inner_offset + i*pitch - pin_w/2
-    py = chip_y - pin_len
-    pz = chip_z
+with span("qfn_pins", "-Y"):
+    for i in range(pins_per_side):
+        px = chip_x + side_inner_offset + i*pitch - pin_w/2
+        py = chip_y - pin_len
+        pz = chip_z
 
-    pin = Part.makeBox(pin_w, pin_len, pin_h)
-    pin.translate(App.Vector(px, py, pz))
+        obj = place(DOC, qfn_y_proto, f"QFN_Pin_{pin_index}", App.Vector(px, py, pz))
 
-    obj = DOC.addObject("Part::Feature", f"QFN_Pin_{pin_index}")
-    obj.Shape = pin
-    safe_color(obj, (0.85, 0.82, 0.55))
+        obj.addProperty("App::PropertyString", "PinName", "PinData", "QFN Pin")
+        obj.PinName = f"P{pin_index}"
 
-    obj.addProperty("App::PropertyString", "PinName", "PinData", "QFN Pin")
-    obj.PinName = f"P{pin_index}"
-
-    pins_objs.append(obj)
-    pin_index += 1
+        pins_objs.append(obj)
+        pin_index += 1
 
 
 # --------------------------------------
@@ -377,27 +364,15 @@ labels = [
     ("DTR", "Text_DTR")
 ]
 
-for i, (text, name) in enumerate(labels):
-    pos = App.Vector(4, y0 + i*dy, E)
-
-    txt = Draft.makeShapeString(
-        String=text,
-        FontFile=FONT,
-        Size=1,
-        Tracking=0
-    )
-    txt.Placement.Base = pos
-    DOC.recompute()
+# Todos los textos se componen con glifos cacheados y se extruyen juntos
+texts = [(text, (4, y0 + i*dy, E), 0) for i, (text, name) in enumerate(labels)]
 
-    solid = txt.Shape.extrude(App.Vector(0, 0, 0.01))
+obj = DOC.addObject("Part::Feature", "Labels")
+obj.Shape = graph.build("Labels", label_block, font=FONT, size=1, height=0.01, texts=texts,
+                        font_sha=font_hash(FONT))
 
-    obj = DOC.addObject("Part::Feature", name)
-    obj.Shape = solid
-
-    # serigrafía blanca
-    safe_color(obj, (0.99, 0.99, 0.99))
-
-DOC.recompute()
+# serigrafía blanca
+safe_color(obj, (0.99, 0.99, 0.99))
 
 
 # --------------------------------------
@@ -430,15 +405,19 @@ DOC.recompute()
 # --------------------------------------
 # FINAL
 # --------------------------------------
-DOC.recompute()
+timed("recompute", DOC.Name, DOC.recompute)
 
 fcstd_path = os.path.join(BUILD_DIR, "usb_ttl.FCStd")
 stl_path   = os.path.join(BUILD_DIR, "usb_ttl.stl")
 
-DOC.saveAs(fcstd_path)
-Import.export([pcb_obj], stl_path)
+timed("saveAs", os.path.basename(fcstd_path), DOC.saveAs, fcstd_path)
+save_colors(DOC, fcstd_path)
+write_bundle(DOC, fcstd_path)
+write_stl(stl_path, [pcb_obj], TessCache.beside(fcstd_path))
+write_trace("usb_ttl", BUILD_DIR)
 
 print("✔ TTL-USB base generada:")
+print("   Features:", graph.summary())
 print("   FCStd:", fcstd_path)
 print("   STL :", stl_path)
 